@@ -43,6 +43,9 @@ class Settings(BaseSettings):
         alias="DATABASE_URL"
     )
     database_url_sync: Optional[str] = Field(default=None, alias="DATABASE_URL_SYNC")
+    db_pool_size: int = Field(default=10, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=20, alias="DB_MAX_OVERFLOW")
+    db_pool_recycle_seconds: int = Field(default=1800, alias="DB_POOL_RECYCLE")
 
     # === REDIS ===
     redis_url: str = Field(
@@ -60,6 +63,8 @@ class Settings(BaseSettings):
     # === EXTERNAL APIs ===
     # Apify - Instagram Scraping
     apify_token: str = Field(default="", alias="APIFY_TOKEN")
+    async_scrapers: bool = Field(default=False, alias="ASYNC_SCRAPERS")
+    watcher_parallelism: int = Field(default=4, alias="WATCHER_PARALLELISM")
 
     # Meta Graph API - Instagram Business (optional, for downloader fallback)
     meta_access_token: Optional[str] = Field(default=None, alias="META_ACCESS_TOKEN")
@@ -98,10 +103,27 @@ class Settings(BaseSettings):
     # OpenAI - Strategy Generation
     openai_api_key: str = Field(default="", alias="OPENAI_API_KEY")
     openai_model: str = Field(default="gpt-4o", alias="OPENAI_MODEL")
+    openai_rpm_limit: int = Field(default=500, alias="OPENAI_RPM_LIMIT")
+    # Strategist: uma chamada para varios videos (True) ou uma por video em paralelo
+    strategist_batch_generation: bool = Field(default=True, alias="STRATEGIST_BATCH_GENERATION")
+    # Cache persistente (SQLite) das respostas do Strategist para prompts repetidos
+    strategist_cache_path: Path = Field(
+        default=Path("data/cache/strategist_llm.sqlite"), alias="STRATEGIST_CACHE_PATH"
+    )
+    strategist_cache_ttl_seconds: int = Field(
+        default=7 * 24 * 3600, alias="STRATEGIST_CACHE_TTL_SECONDS"
+    )
 
     # Fal.ai - Veo 3.1 Video Generation
     fal_key: str = Field(default="", alias="FAL_KEY")
     veo_mode: Literal["test", "production"] = Field(default="test", alias="VEO_MODE")
+    veo_max_concurrent: int = Field(default=4, alias="VEO_MAX_CONCURRENT")
+
+    # FFmpeg - encoder H.264 usado quando o video precisa ser reencodado
+    # (auto = NVENC/QSV se funcionarem nesta maquina, senao libx264)
+    ffmpeg_encoder: Literal["auto", "libx264", "h264_nvenc", "h264_qsv"] = Field(
+        default="auto", alias="FFMPEG_ENCODER"
+    )
 
     # ElevenLabs - Premium TTS (optional)
     elevenlabs_api_key: Optional[str] = Field(default=None, alias="ELEVENLABS_API_KEY")
@@ -181,6 +203,9 @@ class Settings(BaseSettings):
     temp_path: Path = Field(default=Path("data/temp"), alias="TEMP_PATH")
     music_path: Path = Field(default=Path("assets/music"), alias="MUSIC_PATH")
     video_output_dir: Path = Field(default=Path("data/videos"), alias="VIDEO_OUTPUT_DIR")
+    # Arquivos intermediarios do Producer (tmpfs/RAM por padrao, com fallback para disco)
+    producer_tmp_dir: Path = Field(default=Path("/dev/shm/viralforge"), alias="PRODUCER_TMP_DIR")
+    producer_tmp_min_free_mb: int = Field(default=1024, alias="PRODUCER_TMP_MIN_FREE_MB")
 
     # === COST CONFIGURATION (USD) ===
     cost_veo_test: Decimal = Decimal("0.25")
@@ -191,7 +216,11 @@ class Settings(BaseSettings):
     cost_elevenlabs_per_1k_chars: Decimal = Decimal("0.30")
     cost_apify_per_1k: Decimal = Decimal("2.30")
 
-    @field_validator("data_path", "temp_path", "music_path", "video_output_dir", mode="before")
+    @field_validator(
+        "data_path", "temp_path", "music_path", "video_output_dir", "producer_tmp_dir",
+        "strategist_cache_path",
+        mode="before",
+    )
     @classmethod
     def parse_path(cls, v):
         """Converte string para Path."""
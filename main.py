@@ -7,8 +7,10 @@ from typing import Optional
 import click
 
 from config.settings import get_settings
+from src.core.logging_config import setup_logging
 
 settings = get_settings()
+setup_logging(settings.log_level)
 
 
 @click.group()
@@ -150,10 +152,10 @@ def analyze_pending(limit: int, provider: Optional[str]):
 @click.option("--niche", "-n", help="Nicho alvo")
 def strategy(video_id: int, niche: Optional[str]):
     """Gera estrategia a partir de um video analisado."""
-    from src.agents import strategist_agent
+    from src.agents import get_strategist_agent
 
     try:
-        result = strategist_agent.generate(video_id, niche=niche)
+        result = get_strategist_agent().generate(video_id, niche=niche)
         click.echo(f"✅ Estrategia gerada!")
         click.echo(f"   ID: {result.strategy_id}")
         click.echo(f"   Titulo: {result.title}")
@@ -169,10 +171,10 @@ def strategy(video_id: int, niche: Optional[str]):
 @click.option("--limit", "-l", default=3, help="Numero de estrategias")
 def strategy_batch(niche: str, limit: int):
     """Gera estrategias a partir dos melhores videos de um nicho."""
-    from src.agents import strategist_agent
+    from src.agents import get_strategist_agent
 
     click.echo(f"📝 Gerando {limit} estrategias para nicho '{niche}'...")
-    results = strategist_agent.generate_from_best_videos(niche=niche, limit=limit)
+    results = get_strategist_agent().generate_from_best_videos(niche=niche, limit=limit)
 
     total_cost = sum(r.cost_usd for r in results)
 
@@ -0,0 +1,46 @@
+"""Add partial and GIN indexes for content queue lookups.
+
+Revision ID: 20261017_004
+Revises: 20261017_003
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_004"
+down_revision: Union[str, None] = "20261017_003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create indexes backing get_due_content and list_scheduled."""
+    op.create_index(
+        "ix_content_queue_due",
+        "content_queue",
+        [sa.text("priority DESC"), "scheduled_at"],
+        postgresql_where=sa.text("status = 'scheduled'"),
+    )
+    op.create_index(
+        "ix_content_queue_active",
+        "content_queue",
+        ["scheduled_at"],
+        postgresql_where=sa.text("status IN ('scheduled', 'processing', 'ready')"),
+    )
+    op.create_index(
+        "ix_content_queue_target_platforms",
+        "content_queue",
+        ["target_platforms"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Drop content queue lookup indexes."""
+    op.drop_index("ix_content_queue_target_platforms", table_name="content_queue")
+    op.drop_index("ix_content_queue_active", table_name="content_queue")
+    op.drop_index("ix_content_queue_due", table_name="content_queue")
@@ -0,0 +1,31 @@
+"""Add composite index for performance report queries.
+
+Revision ID: 20261017_003
+Revises: 20261017_002
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_003"
+down_revision: Union[str, None] = "20261017_002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create (platform, measured_at, views DESC) index on performance_metrics."""
+    op.create_index(
+        "ix_pm_platform_measured_views",
+        "performance_metrics",
+        ["platform", "measured_at", sa.text("views DESC")],
+    )
+
+
+def downgrade() -> None:
+    """Drop the report index."""
+    op.drop_index("ix_pm_platform_measured_views", table_name="performance_metrics")
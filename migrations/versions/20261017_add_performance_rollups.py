@@ -0,0 +1,60 @@
+"""Add hourly performance metric rollups.
+
+Revision ID: 20261017_001
+Revises: 20251228_002
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_001"
+down_revision: Union[str, None] = "20251228_002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create performance_metric_rollups and backfill it from raw metrics."""
+    op.create_table(
+        "performance_metric_rollups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("content_id", sa.Integer(), sa.ForeignKey("content_queue.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("platform", postgresql.ENUM("instagram", "tiktok", "youtube", "all", name="platform", create_type=False), nullable=False),
+        sa.Column("bucket", sa.DateTime(), nullable=False),
+        sa.Column("views", sa.BigInteger(), default=0),
+        sa.Column("engagement", sa.BigInteger(), default=0),
+        sa.Column("engagement_rate_sum", sa.Numeric(12, 4), default=0),
+        sa.Column("metric_count", sa.Integer(), default=0),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now()),
+        sa.UniqueConstraint("content_id", "platform", "bucket", name="uq_pm_rollup_content_bucket"),
+    )
+    op.create_index("ix_performance_metric_rollups_bucket", "performance_metric_rollups", ["bucket"])
+
+    op.execute(
+        """
+        INSERT INTO performance_metric_rollups
+            (content_id, platform, bucket, views, engagement, engagement_rate_sum, metric_count)
+        SELECT
+            content_id,
+            platform,
+            date_trunc('hour', measured_at),
+            COALESCE(SUM(views), 0),
+            COALESCE(SUM(likes + comments + shares + saves), 0),
+            COALESCE(SUM(COALESCE(engagement_rate, 0)), 0),
+            COUNT(*)
+        FROM performance_metrics
+        WHERE content_id IS NOT NULL AND measured_at IS NOT NULL
+        GROUP BY content_id, platform, date_trunc('hour', measured_at)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop performance_metric_rollups."""
+    op.drop_index("ix_performance_metric_rollups_bucket", table_name="performance_metric_rollups")
+    op.drop_table("performance_metric_rollups")
@@ -0,0 +1,42 @@
+"""Make performance_metrics.engagement_rate a generated column.
+
+Revision ID: 20261017_002
+Revises: 20261017_001
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_002"
+down_revision: Union[str, None] = "20261017_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ENGAGEMENT_RATE_EXPR = (
+    "(COALESCE(likes, 0) + COALESCE(comments, 0) + COALESCE(shares, 0) + COALESCE(saves, 0))"
+    "::double precision / NULLIF(views, 0)"
+)
+
+
+def upgrade() -> None:
+    """Replace engagement_rate with a STORED generated column computed by Postgres."""
+    op.drop_column("performance_metrics", "engagement_rate")
+    op.add_column(
+        "performance_metrics",
+        sa.Column(
+            "engagement_rate",
+            sa.Float(),
+            sa.Computed(ENGAGEMENT_RATE_EXPR, persisted=True),
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Restore engagement_rate as a regular NUMERIC(5,4) column."""
+    op.drop_column("performance_metrics", "engagement_rate")
+    op.add_column("performance_metrics", sa.Column("engagement_rate", sa.Numeric(5, 4)))
+    op.execute(f"UPDATE performance_metrics SET engagement_rate = {ENGAGEMENT_RATE_EXPR}")
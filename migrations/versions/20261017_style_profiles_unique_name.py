@@ -0,0 +1,36 @@
+"""Make style profile names unique for upserts.
+
+Revision ID: 20261017_005
+Revises: 20261017_004
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_005"
+down_revision: Union[str, None] = "20261017_004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Replace the plain name index with a unique constraint."""
+    # Nomes repetidos (anteriores ao upsert) ganham o id como sufixo
+    op.execute(
+        sa.text(
+            "UPDATE style_profiles SET name = left(name, 88) || ' #' || id "
+            "WHERE id NOT IN (SELECT min(id) FROM style_profiles GROUP BY name)"
+        )
+    )
+    op.drop_index("ix_style_profiles_name", table_name="style_profiles")
+    op.create_unique_constraint("uq_style_profiles_name", "style_profiles", ["name"])
+
+
+def downgrade() -> None:
+    """Restore the plain name index."""
+    op.drop_constraint("uq_style_profiles_name", "style_profiles", type_="unique")
+    op.create_index("ix_style_profiles_name", "style_profiles", ["name"])
@@ -3,7 +3,7 @@
 from src.agents.analyst_agent import AnalystAgent, AnalystResult, get_analyst_agent
 from src.agents.producer_agent import ProducerAgent, ProducerResult, producer_agent
 from src.agents.scheduler_agent import ContentScheduler, get_scheduler
-from src.agents.strategist_agent import StrategistAgent, StrategistResult, strategist_agent
+from src.agents.strategist_agent import StrategistAgent, StrategistResult, get_strategist_agent
 from src.agents.trend_hunter_agent import TrendHunterAgent, TrendHunterResult, get_trend_hunter
 from src.agents.style_cloner_agent import StyleClonerAgent, StyleClonerResult, get_style_cloner
 from src.agents.performance_tracker_agent import PerformanceTrackerAgent, PerformanceTrackerResult, get_performance_tracker
@@ -22,7 +22,7 @@ __all__ = [
     # Strategist
     "StrategistAgent",
     "StrategistResult",
-    "strategist_agent",
+    "get_strategist_agent",
     # Producer
     "ProducerAgent",
     "ProducerResult",
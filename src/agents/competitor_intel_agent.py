@@ -1,11 +1,13 @@
 """Competitor Intel Agent - Monitora e analisa concorrentes."""
 
+import logging
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import Optional
 from uuid import uuid4
 
+import numpy as np
 from sqlalchemy import and_, func, select
 from sqlalchemy.orm import Session
 
@@ -14,6 +16,7 @@ from src.core.database import get_sync_db
 from src.db.models.trends import Competitor, CompetitorAnalysis, Platform
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -149,7 +152,7 @@ class CompetitorIntelAgent:
             elif platform == Platform.YOUTUBE:
                 return self._analyze_youtube_competitor(username, max_posts)
         except Exception as e:
-            print(f"[CompetitorIntel] Erro analisando {username}: {e}")
+            logger.exception("[CompetitorIntel] Erro analisando %s: %s", username, e)
 
         return None
 
@@ -256,9 +259,9 @@ class CompetitorIntelAgent:
             )
 
         except ImportError:
-            print("[CompetitorIntel] instagram_scraper nao disponivel")
+            logger.warning("[CompetitorIntel] instagram_scraper nao disponivel")
         except Exception as e:
-            print(f"[CompetitorIntel] Erro Instagram: {e}")
+            logger.exception("[CompetitorIntel] Erro Instagram: %s", e)
 
         return None
 
@@ -322,9 +325,9 @@ class CompetitorIntelAgent:
             )
 
         except ImportError:
-            print("[CompetitorIntel] tiktok_scraper nao disponivel")
+            logger.warning("[CompetitorIntel] tiktok_scraper nao disponivel")
         except Exception as e:
-            print(f"[CompetitorIntel] Erro TikTok: {e}")
+            logger.exception("[CompetitorIntel] Erro TikTok: %s", e)
 
         return None
 
@@ -385,9 +388,9 @@ class CompetitorIntelAgent:
             )
 
         except ImportError:
-            print("[CompetitorIntel] youtube_scraper nao disponivel")
+            logger.warning("[CompetitorIntel] youtube_scraper nao disponivel")
         except Exception as e:
-            print(f"[CompetitorIntel] Erro YouTube: {e}")
+            logger.exception("[CompetitorIntel] Erro YouTube: %s", e)
 
         return None
 
@@ -418,10 +421,10 @@ class CompetitorIntelAgent:
 
             competitors = list(db.execute(query).scalars().all())
 
-            print(f"[CompetitorIntel] Analisando {len(competitors)} concorrentes...")
+            logger.info("[CompetitorIntel] Analisando %d concorrentes...", len(competitors))
 
             for competitor in competitors:
-                print(f"[CompetitorIntel] Analisando {competitor.username}...")
+                logger.info("[CompetitorIntel] Analisando %s...", competitor.username)
 
                 snapshot = self.analyze_competitor(
                     competitor.username,
@@ -534,12 +537,17 @@ class CompetitorIntelAgent:
                 total_competitors=0,
             )
 
-        # Medias dos concorrentes
-        avg_followers = sum(s.followers for s in snapshots) / len(snapshots)
-        avg_engagement = sum(s.avg_engagement_rate for s in snapshots) / len(snapshots)
+        # Medias dos concorrentes (uma passada vetorizada por coluna)
+        n = len(snapshots)
+        followers = np.fromiter((s.followers for s in snapshots), dtype=np.int64, count=n)
+        engagement = np.fromiter(
+            (s.avg_engagement_rate for s in snapshots), dtype=np.float64, count=n
+        )
+        avg_followers = float(followers.mean())
+        avg_engagement = float(engagement.mean())
 
         # Leader
-        leader = max(snapshots, key=lambda x: x.followers)
+        leader = snapshots[int(followers.argmax())]
 
         recommendations = []
 
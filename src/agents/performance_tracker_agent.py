@@ -1,22 +1,96 @@
 """Performance Tracker Agent - Monitora e analisa performance de conteudo."""
 
+import asyncio
+import calendar
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from decimal import Decimal
-from typing import Optional
+from functools import partial
+from heapq import nlargest
+from operator import itemgetter
+from typing import Any, Callable, Iterator, NamedTuple, Optional
 from uuid import uuid4
 
+import numpy as np
 from sqlalchemy import and_, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
 from config.settings import get_settings
+from src.core.cache import TTLCache
 from src.core.database import get_sync_db
-from src.db.models.trends import ContentQueue, ContentStatus, PerformanceMetric, Platform
-
+from src.db.models.trends import (
+    ContentQueue,
+    ContentStatus,
+    PerformanceMetric,
+    PerformanceMetricRollup,
+    Platform,
+)
+
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
-
-@dataclass
+# Linhas acumuladas antes de cada executemany em PerformanceMetric
+METRICS_INSERT_BATCH_SIZE = 1000
+
+# Linhas por lote ao iterar resultados em streaming (yield_per)
+STREAM_BATCH_SIZE = 1000
+
+# Chamadas simultaneas aos scrapers por plataforma
+SCRAPER_MAX_WORKERS = 8
+
+# Resultados de relatorio reaproveitados entre chamadas (chave: days, platform).
+# Sao descartados quando uma coleta grava novas metricas.
+_report_cache = TTLCache(maxsize=32, ttl=300)
+_posting_times_cache = TTLCache(maxsize=32, ttl=1800)
+
+# Limiares de engagement_rate por tier (do maior para o menor); abaixo de todos e "flop"
+PERFORMANCE_TIERS = (
+    (0.1, "viral"),  # >10%
+    (0.05, "high"),  # >5%
+    (0.02, "average"),  # >2%
+    (0.01, "low"),  # >1%
+)
+
+# Nomes dos dias indexados por ISO weekday (1 = Monday), montados uma vez
+ISO_DAY_NAMES = {i + 1: name for i, name in enumerate(calendar.day_name)}
+
+# Engajamento total por linha, para agregacoes no banco
+TOTAL_ENGAGEMENT = (
+    PerformanceMetric.likes
+    + PerformanceMetric.comments
+    + PerformanceMetric.shares
+    + PerformanceMetric.saves
+)
+
+# Colunas necessarias para montar ContentPerformance (sem hidratar o ORM)
+CONTENT_PERFORMANCE_COLUMNS = (
+    PerformanceMetric.content_id,
+    PerformanceMetric.platform,
+    PerformanceMetric.measured_at,
+    PerformanceMetric.views,
+    PerformanceMetric.likes,
+    PerformanceMetric.comments,
+    PerformanceMetric.shares,
+    PerformanceMetric.saves,
+    PerformanceMetric.engagement_rate,
+)
+
+
+class MetricSource(NamedTuple):
+    """Expressoes SQL para agregar metricas a partir do rollup ou da tabela bruta."""
+    timestamp: Any
+    views: Any
+    engagement: Any
+    engagement_rate_sum: Any
+    count: Any
+    filters: list
+
+
+@dataclass(slots=True)
 class PerformanceInsight:
     """Insight de performance."""
     category: str  # timing, content, engagement, growth
@@ -27,7 +101,7 @@ class PerformanceInsight:
     data: dict = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class ContentPerformance:
     """Performance de um conteudo."""
     content_id: int
@@ -44,7 +118,7 @@ class ContentPerformance:
     performance_tier: str = "average"  # viral, high, average, low, flop
 
 
-@dataclass
+@dataclass(slots=True)
 class PerformanceReport:
     """Relatorio de performance."""
     period_start: datetime
@@ -59,7 +133,7 @@ class PerformanceReport:
     trends: dict = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class PerformanceTrackerResult:
     """Resultado do Performance Tracker."""
     run_id: str
@@ -84,6 +158,11 @@ class PerformanceTrackerAgent:
     ) -> int:
         """Coleta metricas de posts publicados.
 
+        Toda a coleta roda em uma unica sessao/transacao: os posts publicados
+        sao lidos uma vez, as chamadas aos scrapers de todas as plataformas
+        rodam em paralelo (ver _fetch_rows) e as escritas ficam na thread
+        chamadora, com um unico commit no final.
+
         Args:
             platform: Plataforma especifica ou None para todas
             days: Ultimos N dias
@@ -100,213 +179,328 @@ class PerformanceTrackerAgent:
         else:
             platforms = [Platform.INSTAGRAM, Platform.TIKTOK, Platform.YOUTUBE]
 
-        for p in platforms:
-            try:
-                if p == Platform.INSTAGRAM:
-                    collected += self._collect_instagram_metrics(start_date)
-                elif p == Platform.TIKTOK:
-                    collected += self._collect_tiktok_metrics(start_date)
-                elif p == Platform.YOUTUBE:
-                    collected += self._collect_youtube_metrics(start_date)
-            except Exception as e:
-                print(f"[PerformanceTracker] Erro coletando {p.value}: {e}")
-
-        return collected
-
-    def _collect_instagram_metrics(self, since: datetime) -> int:
-        """Coleta metricas do Instagram via scraper real."""
-        collected = 0
         db = get_sync_db()
-
         try:
-            # Busca posts publicados
-            query = select(ContentQueue).where(
-                ContentQueue.status == ContentStatus.PUBLISHED,
-                ContentQueue.published_at >= since,
-            )
-
-            posts = list(db.execute(query).scalars().all())
-
-            for post in posts:
-                published_urls = post.published_urls or {}
-                insta_url = published_urls.get("instagram")
-
-                if not insta_url:
-                    continue
-
-                try:
-                    from src.tools.instagram_scraper import instagram_scraper
-
-                    # Coleta metricas reais via scraper
-                    metrics = instagram_scraper.get_post_metrics(insta_url)
-
-                    if metrics:
-                        perf_metric = PerformanceMetric(
-                            content_id=post.id,
-                            platform=Platform.INSTAGRAM,
-                            post_url=insta_url,
-                            views=metrics.get("views", 0),
-                            likes=metrics.get("likes", 0),
-                            comments=metrics.get("comments", 0),
-                            shares=metrics.get("shares", 0),
-                            saves=metrics.get("saves", 0),
-                        )
-
-                        # Calcula engagement rate
-                        total_engagement = (
-                            perf_metric.likes +
-                            perf_metric.comments +
-                            perf_metric.shares +
-                            perf_metric.saves
-                        )
-                        if perf_metric.views > 0:
-                            perf_metric.engagement_rate = Decimal(
-                                str(total_engagement / perf_metric.views)
-                            )
-
-                        db.add(perf_metric)
-                        collected += 1
-                        print(f"[PerformanceTracker] Instagram {post.id}: {metrics.get('views', 0)} views")
-
-                except Exception as e:
-                    print(f"[PerformanceTracker] Erro Instagram post {post.id}: {e}")
+            fetchers = self._load_fetchers(platforms)
+            platforms = list(fetchers)
+
+            # no_autoflush independe da configuracao do sessionmaker
+            with db.begin(), db.no_autoflush:
+                query = select(ContentQueue.id, ContentQueue.published_urls).where(
+                    ContentQueue.status == ContentStatus.PUBLISHED,
+                    ContentQueue.published_at >= start_date,
+                )
 
-            db.commit()
+                targets = []
+                for post in db.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE)):
+                    published_urls = post.published_urls or {}
+                    for p in platforms:
+                        url = published_urls.get(p.value)
+                        if url:
+                            targets.append((p, post.id, url))
+
+                rows: list[dict] = []
+                for row in self._fetch_rows(fetchers, targets):
+                    rows.append(row)
+                    collected += 1
+                    if len(rows) >= METRICS_INSERT_BATCH_SIZE:
+                        self._flush_metric_rows(db, rows)
+
+                self._flush_metric_rows(db, rows)
+                if collected:
+                    self._refresh_rollups(db)
+
+            if collected:
+                _report_cache.clear()
+                _posting_times_cache.clear()
 
         except Exception as e:
-            db.rollback()
-            print(f"[PerformanceTracker] Erro: {e}")
+            logger.exception("[PerformanceTracker] Erro coletando metricas: %s", e)
+            collected = 0
         finally:
             db.close()
 
         return collected
 
-    def _collect_tiktok_metrics(self, since: datetime) -> int:
-        """Coleta metricas do TikTok via scraper real."""
-        collected = 0
-        db = get_sync_db()
+    def _load_fetchers(
+        self,
+        platforms: list[Platform],
+    ) -> dict[Platform, Callable[[int, str], Optional[dict]]]:
+        """Importa os scrapers uma vez por coleta e retorna o fetcher de cada plataforma.
 
-        try:
-            query = select(ContentQueue).where(
-                ContentQueue.status == ContentStatus.PUBLISHED,
-                ContentQueue.published_at >= since,
-            )
+        Os imports ficam aqui (e nao no topo do modulo) porque src.tools importa
+        este agent via performance_tools.
+        """
+        fetchers = {}
 
-            posts = list(db.execute(query).scalars().all())
+        if Platform.INSTAGRAM in platforms:
+            from src.tools.instagram_scraper import instagram_scraper
+            fetchers[Platform.INSTAGRAM] = partial(
+                self._fetch_instagram_metric, instagram_scraper
+            )
+        if Platform.TIKTOK in platforms:
+            from src.tools.tiktok_scraper import tiktok_scraper
+            fetchers[Platform.TIKTOK] = partial(self._fetch_tiktok_metric, tiktok_scraper)
+        if Platform.YOUTUBE in platforms:
+            from src.tools.youtube_scraper import youtube_scraper
+            fetchers[Platform.YOUTUBE] = partial(self._fetch_youtube_metric, youtube_scraper)
 
-            for post in posts:
-                published_urls = post.published_urls or {}
-                tiktok_url = published_urls.get("tiktok")
+        return fetchers
 
-                if not tiktok_url:
+    def _fetch_rows(
+        self,
+        fetchers: dict[Platform, Callable[[int, str], Optional[dict]]],
+        targets: list[tuple[Platform, int, str]],
+    ) -> Iterator[dict]:
+        """Executa os fetchers de cada alvo e entrega as linhas coletadas.
+
+        Com ASYNC_SCRAPERS ativo usa asyncio.gather; caso contrario, ou quando
+        chamado de dentro de um event loop (onde asyncio.run falha), o pool de
+        threads. Erros de um post sao logados e nao interrompem os demais.
+        """
+        if settings.async_scrapers:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                yield from asyncio.run(self._fetch_rows_async(fetchers, targets))
+                return
+            logger.debug("[PerformanceTracker] Event loop ja ativo, coletando com threads")
+
+        max_workers = SCRAPER_MAX_WORKERS * len(fetchers)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(fetchers[p], content_id, url): (p, content_id)
+                for p, content_id, url in targets
+            }
+            for future in as_completed(futures):
+                try:
+                    row = future.result()
+                except Exception as e:
+                    p, content_id = futures[future]
+                    logger.warning(
+                        "[PerformanceTracker] Erro %s post %s: %s", p.value, content_id, e
+                    )
                     continue
 
-                try:
-                    from src.tools.tiktok_scraper import tiktok_scraper
-
-                    # Coleta metricas reais via scraper
-                    video_info = tiktok_scraper.get_video_info(tiktok_url)
-
-                    if video_info:
-                        perf_metric = PerformanceMetric(
-                            content_id=post.id,
-                            platform=Platform.TIKTOK,
-                            post_id=video_info.video_id,
-                            post_url=tiktok_url,
-                            views=video_info.views_count,
-                            likes=video_info.likes_count,
-                            comments=video_info.comments_count,
-                            shares=video_info.shares_count,
-                            saves=video_info.saves_count,
-                        )
+                if row:
+                    yield row
 
-                        # Calcula engagement
-                        total_engagement = (
-                            perf_metric.likes +
-                            perf_metric.comments +
-                            perf_metric.shares +
-                            perf_metric.saves
-                        )
-                        if perf_metric.views > 0:
-                            perf_metric.engagement_rate = Decimal(
-                                str(total_engagement / perf_metric.views)
-                            )
+    async def _fetch_rows_async(
+        self,
+        fetchers: dict[Platform, Callable[[int, str], Optional[dict]]],
+        targets: list[tuple[Platform, int, str]],
+    ) -> list[dict]:
+        """Coleta todos os alvos com asyncio.gather, limitado por plataforma.
+
+        Os clientes dos scrapers (Apify, yt-dlp) sao bloqueantes, entao cada
+        chamada roda via asyncio.to_thread; o Semaphore por plataforma limita
+        as chamadas simultaneas a SCRAPER_MAX_WORKERS.
+        """
+        semaphores = {p: asyncio.Semaphore(SCRAPER_MAX_WORKERS) for p in fetchers}
 
-                        db.add(perf_metric)
-                        collected += 1
-                        print(f"[PerformanceTracker] TikTok {post.id}: {video_info.views_count} views")
+        async def fetch(p: Platform, content_id: int, url: str) -> Optional[dict]:
+            async with semaphores[p]:
+                return await asyncio.to_thread(fetchers[p], content_id, url)
 
-                except Exception as e:
-                    print(f"[PerformanceTracker] Erro TikTok post {post.id}: {e}")
+        results = await asyncio.gather(
+            *(fetch(p, content_id, url) for p, content_id, url in targets),
+            return_exceptions=True,
+        )
 
-            db.commit()
+        rows = []
+        for (p, content_id, _), result in zip(targets, results):
+            if isinstance(result, Exception):
+                logger.warning(
+                    "[PerformanceTracker] Erro %s post %s: %s", p.value, content_id, result
+                )
+            elif result:
+                rows.append(result)
+        return rows
 
-        except Exception as e:
-            db.rollback()
-        finally:
-            db.close()
+    def _fetch_instagram_metric(
+        self,
+        instagram_scraper: Any,
+        content_id: int,
+        url: str,
+    ) -> Optional[dict]:
+        """Busca metricas de um post do Instagram e monta a linha de PerformanceMetric."""
+        # Coleta metricas reais via scraper
+        metrics = instagram_scraper.get_post_metrics(url)
+        if not metrics:
+            return None
+
+        row = {
+            "content_id": content_id,
+            "platform": Platform.INSTAGRAM,
+            "post_url": url,
+            "views": metrics.get("views", 0),
+            "likes": metrics.get("likes", 0),
+            "comments": metrics.get("comments", 0),
+            "shares": metrics.get("shares", 0),
+            "saves": metrics.get("saves", 0),
+        }
 
-        return collected
+        logger.debug("[PerformanceTracker] Instagram %s: %s views", content_id, row["views"])
+        return row
 
-    def _collect_youtube_metrics(self, since: datetime) -> int:
-        """Coleta metricas do YouTube via yt-dlp."""
-        collected = 0
-        db = get_sync_db()
+    def _fetch_tiktok_metric(
+        self,
+        tiktok_scraper: Any,
+        content_id: int,
+        url: str,
+    ) -> Optional[dict]:
+        """Busca metricas de um video do TikTok e monta a linha de PerformanceMetric."""
+        # Coleta metricas reais via scraper
+        video_info = tiktok_scraper.get_video_info(url)
+        if not video_info:
+            return None
+
+        row = {
+            "content_id": content_id,
+            "platform": Platform.TIKTOK,
+            "post_id": video_info.video_id,
+            "post_url": url,
+            "views": video_info.views_count,
+            "likes": video_info.likes_count,
+            "comments": video_info.comments_count,
+            "shares": video_info.shares_count,
+            "saves": video_info.saves_count,
+        }
 
-        try:
-            query = select(ContentQueue).where(
-                ContentQueue.status == ContentStatus.PUBLISHED,
-                ContentQueue.published_at >= since,
-            )
+        logger.debug("[PerformanceTracker] TikTok %s: %s views", content_id, row["views"])
+        return row
 
-            posts = list(db.execute(query).scalars().all())
+    def _fetch_youtube_metric(
+        self,
+        youtube_scraper: Any,
+        content_id: int,
+        url: str,
+    ) -> Optional[dict]:
+        """Busca metricas de um video do YouTube e monta a linha de PerformanceMetric."""
+        # Coleta metricas reais via yt-dlp
+        video_info = youtube_scraper.get_video_info(url)
+        if not video_info:
+            return None
+
+        row = {
+            "content_id": content_id,
+            "platform": Platform.YOUTUBE,
+            "post_id": video_info.video_id,
+            "post_url": url,
+            "views": video_info.view_count,
+            "likes": video_info.like_count,
+            "comments": video_info.comment_count,
+        }
 
-            for post in posts:
-                published_urls = post.published_urls or {}
-                youtube_url = published_urls.get("youtube")
+        logger.debug("[PerformanceTracker] YouTube %s: %s views", content_id, row["views"])
+        return row
 
-                if not youtube_url:
-                    continue
+    def _flush_metric_rows(self, db: Session, rows: list[dict]) -> None:
+        """Insere as linhas acumuladas de PerformanceMetric em um unico executemany."""
+        if not rows:
+            return
+        db.bulk_insert_mappings(PerformanceMetric, rows)
+        rows.clear()
 
-                try:
-                    from src.tools.youtube_scraper import youtube_scraper
-
-                    # Coleta metricas reais via yt-dlp
-                    video_info = youtube_scraper.get_video_info(youtube_url)
-
-                    if video_info:
-                        perf_metric = PerformanceMetric(
-                            content_id=post.id,
-                            platform=Platform.YOUTUBE,
-                            post_id=video_info.video_id,
-                            post_url=youtube_url,
-                            views=video_info.view_count,
-                            likes=video_info.like_count,
-                            comments=video_info.comment_count,
-                        )
+    def _refresh_rollups(self, db: Session) -> None:
+        """Recalcula, a partir das metricas brutas, os buckets de rollup da hora atual.
 
-                        # Calcula engagement
-                        total_engagement = perf_metric.likes + perf_metric.comments
-                        if perf_metric.views > 0:
-                            perf_metric.engagement_rate = Decimal(
-                                str(total_engagement / perf_metric.views)
-                            )
+        As metricas desta coleta recebem measured_at = now() da transacao, entao
+        so o bucket corrente muda; o upsert o recalcula por completo e e
+        idempotente.
+        """
+        bucket = func.date_trunc("hour", PerformanceMetric.measured_at)
+        source = (
+            select(
+                PerformanceMetric.content_id,
+                PerformanceMetric.platform,
+                bucket,
+                func.coalesce(func.sum(PerformanceMetric.views), 0),
+                func.coalesce(func.sum(TOTAL_ENGAGEMENT), 0),
+                func.coalesce(func.sum(func.coalesce(PerformanceMetric.engagement_rate, 0)), 0),
+                func.count(PerformanceMetric.id),
+            )
+            .where(
+                PerformanceMetric.content_id.is_not(None),
+                PerformanceMetric.measured_at >= func.date_trunc("hour", func.now()),
+            )
+            .group_by(PerformanceMetric.content_id, PerformanceMetric.platform, bucket)
+        )
 
-                        db.add(perf_metric)
-                        collected += 1
-                        print(f"[PerformanceTracker] YouTube {post.id}: {video_info.view_count} views")
+        stmt = pg_insert(PerformanceMetricRollup).from_select(
+            [
+                "content_id",
+                "platform",
+                "bucket",
+                "views",
+                "engagement",
+                "engagement_rate_sum",
+                "metric_count",
+            ],
+            source,
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_pm_rollup_content_bucket",
+            set_={
+                "views": stmt.excluded.views,
+                "engagement": stmt.excluded.engagement,
+                "engagement_rate_sum": stmt.excluded.engagement_rate_sum,
+                "metric_count": stmt.excluded.metric_count,
+                "updated_at": func.now(),
+            },
+        )
+        db.execute(stmt)
 
-                except Exception as e:
-                    print(f"[PerformanceTracker] Erro YouTube post {post.id}: {e}")
+    def _metric_source(
+        self,
+        db: Session,
+        period_start: datetime,
+        platform: Optional[Platform],
+    ) -> MetricSource:
+        """Escolhe de onde agregar metricas por periodo: rollup horario ou tabela bruta.
+
+        Usa o rollup quando ele cobre a metrica bruta mais recente do periodo;
+        caso contrario (rollup defasado ou vazio) cai para performance_metrics.
+        O inicio do periodo e alinhado a hora cheia nas duas fontes (a
+        granularidade do rollup), entao ambas cobrem exatamente o mesmo intervalo.
+        """
+        period_start = period_start.replace(minute=0, second=0, microsecond=0)
+        raw_filters = [
+            PerformanceMetric.measured_at >= period_start,
+            PerformanceMetric.measured_at.is_not(None),
+        ]
+        rollup_filters = [
+            PerformanceMetricRollup.bucket >= period_start,
+        ]
+        if platform:
+            raw_filters.append(PerformanceMetric.platform == platform)
+            rollup_filters.append(PerformanceMetricRollup.platform == platform)
 
-            db.commit()
+        latest_raw = db.scalar(select(func.max(PerformanceMetric.measured_at)).where(*raw_filters))
+        latest_bucket = db.scalar(
+            select(func.max(PerformanceMetricRollup.bucket)).where(*rollup_filters)
+        )
 
-        except Exception as e:
-            db.rollback()
-        finally:
-            db.close()
+        if latest_raw is not None and latest_bucket is not None and (
+            latest_bucket >= latest_raw.replace(minute=0, second=0, microsecond=0)
+        ):
+            return MetricSource(
+                timestamp=PerformanceMetricRollup.bucket,
+                views=func.sum(PerformanceMetricRollup.views),
+                engagement=func.sum(PerformanceMetricRollup.engagement),
+                engagement_rate_sum=func.sum(PerformanceMetricRollup.engagement_rate_sum),
+                count=func.sum(PerformanceMetricRollup.metric_count),
+                filters=rollup_filters,
+            )
 
-        return collected
+        return MetricSource(
+            timestamp=PerformanceMetric.measured_at,
+            views=func.sum(PerformanceMetric.views),
+            engagement=func.sum(TOTAL_ENGAGEMENT),
+            engagement_rate_sum=func.sum(func.coalesce(PerformanceMetric.engagement_rate, 0)),
+            count=func.count(PerformanceMetric.id),
+            filters=raw_filters,
+        )
 
     def generate_report(
         self,
@@ -322,22 +516,41 @@ class PerformanceTrackerAgent:
         Returns:
             PerformanceReport
         """
+        key = (days, platform)
+        report = _report_cache.get(key)
+        if report is None:
+            report = self._build_report(days, platform)
+            _report_cache.set(key, report)
+        return report
+
+    def _build_report(
+        self,
+        days: int,
+        platform: Optional[Platform],
+    ) -> PerformanceReport:
+        """Monta o relatorio de performance a partir do banco."""
         period_start = datetime.now() - timedelta(days=days)
         period_end = datetime.now()
 
         db = get_sync_db()
         try:
-            # Query base
-            query = select(PerformanceMetric).where(
-                PerformanceMetric.measured_at >= period_start
-            )
-
+            filters = [PerformanceMetric.measured_at >= period_start]
             if platform:
-                query = query.where(PerformanceMetric.platform == platform)
-
-            metrics = list(db.execute(query).scalars().all())
-
-            if not metrics:
+                filters.append(PerformanceMetric.platform == platform)
+
+            # Agregados calculados no banco
+            total_posts, total_views, total_engagement, avg_engagement = db.execute(
+                select(
+                    func.count(PerformanceMetric.id),
+                    func.coalesce(func.sum(PerformanceMetric.views), 0),
+                    func.coalesce(func.sum(TOTAL_ENGAGEMENT), 0),
+                    func.coalesce(
+                        func.avg(func.coalesce(PerformanceMetric.engagement_rate, 0)), 0
+                    ),
+                ).where(*filters)
+            ).one()
+
+            if not total_posts:
                 return PerformanceReport(
                     period_start=period_start,
                     period_end=period_end,
@@ -358,46 +571,52 @@ class PerformanceTrackerAgent:
                     ],
                 )
 
-            # Calcula agregados
-            total_views = sum(m.views for m in metrics)
-            total_engagement = sum(m.total_engagement for m in metrics)
-            avg_engagement = (
-                sum(float(m.engagement_rate or 0) for m in metrics) / len(metrics)
+            total_views = int(total_views)
+            total_engagement = int(total_engagement)
+            avg_engagement = float(avg_engagement)
+
+            # Passada unica em streaming para tiers e views por plataforma
+            tiers: Counter[str] = Counter()
+            platform_views: Counter[str] = Counter()
+            metrics = db.execute(
+                select(
+                    PerformanceMetric.platform,
+                    PerformanceMetric.views,
+                    PerformanceMetric.engagement_rate,
+                )
+                .where(*filters)
+                .execution_options(yield_per=STREAM_BATCH_SIZE)
             )
-
-            # Classifica performance
-            performances = []
-            for m in metrics:
-                tier = self._classify_performance(m)
-                performances.append(ContentPerformance(
-                    content_id=m.content_id or 0,
-                    title=f"Post {m.content_id}",
-                    platform=m.platform.value,
-                    published_at=m.measured_at,
-                    views=m.views,
-                    likes=m.likes,
-                    comments=m.comments,
-                    shares=m.shares,
-                    saves=m.saves,
-                    engagement_rate=float(m.engagement_rate or 0),
-                    performance_tier=tier,
-                ))
-
-            # Ordena
-            performances.sort(key=lambda x: x.views, reverse=True)
-            best = performances[:5]
-            worst = sorted(performances, key=lambda x: x.views)[:5]
+            for chunk in metrics.partitions():
+                self._accumulate_chunk(chunk, tiers, platform_views)
+
+            # Top-K direto no banco
+            base_query = select(*CONTENT_PERFORMANCE_COLUMNS).where(*filters)
+            best = [
+                self._to_content_performance(m)
+                for m in db.execute(
+                    base_query.order_by(PerformanceMetric.views.desc()).limit(5)
+                )
+            ]
+            worst = [
+                self._to_content_performance(m)
+                for m in db.execute(
+                    base_query.order_by(PerformanceMetric.views.asc()).limit(5)
+                )
+            ]
 
             # Gera insights
-            insights = self._generate_insights(metrics, performances)
+            insights = self._generate_insights(
+                total_posts, total_views, avg_engagement, tiers, platform_views
+            )
 
             # Trends
-            trends = self._analyze_trends(metrics)
+            trends = self._analyze_trends(db, period_start, platform)
 
             return PerformanceReport(
                 period_start=period_start,
                 period_end=period_end,
-                total_posts=len(metrics),
+                total_posts=total_posts,
                 total_views=total_views,
                 total_engagement=total_engagement,
                 avg_engagement_rate=avg_engagement,
@@ -410,35 +629,75 @@ class PerformanceTrackerAgent:
         finally:
             db.close()
 
-    def _classify_performance(self, metric: PerformanceMetric) -> str:
+    def _to_content_performance(self, metric: Row) -> ContentPerformance:
+        """Converte uma metrica em ContentPerformance."""
+        return ContentPerformance(
+            content_id=metric.content_id or 0,
+            title=f"Post {metric.content_id}",
+            platform=metric.platform.value,
+            published_at=metric.measured_at,
+            views=metric.views,
+            likes=metric.likes,
+            comments=metric.comments,
+            shares=metric.shares,
+            saves=metric.saves,
+            engagement_rate=float(metric.engagement_rate or 0),
+            performance_tier=self._classify_performance(metric),
+        )
+
+    def _classify_performance(self, metric: Row) -> str:
         """Classifica a performance de um conteudo."""
         engagement_rate = float(metric.engagement_rate or 0)
 
-        if engagement_rate > 0.1:  # >10%
-            return "viral"
-        elif engagement_rate > 0.05:  # >5%
-            return "high"
-        elif engagement_rate > 0.02:  # >2%
-            return "average"
-        elif engagement_rate > 0.01:  # >1%
-            return "low"
-        else:
-            return "flop"
+        for threshold, tier in PERFORMANCE_TIERS:
+            if engagement_rate > threshold:
+                return tier
+        return "flop"
+
+    def _accumulate_chunk(
+        self,
+        chunk: list[Row],
+        tiers: Counter[str],
+        platform_views: Counter[str],
+    ) -> None:
+        """Soma tiers e views por plataforma de um lote com operacoes vetorizadas."""
+        n = len(chunk)
+        views = np.fromiter((m.views or 0 for m in chunk), dtype=np.int64, count=n)
+        rates = np.fromiter(
+            (float(m.engagement_rate or 0) for m in chunk), dtype=np.float64, count=n
+        )
+
+        labels = np.select(
+            [rates > threshold for threshold, _ in PERFORMANCE_TIERS],
+            [tier for _, tier in PERFORMANCE_TIERS],
+            default="flop",
+        )
+        names, counts = np.unique(labels, return_counts=True)
+        tiers.update(dict(zip(names.tolist(), counts.tolist())))
+
+        platforms, inverse = np.unique(
+            [m.platform.value for m in chunk], return_inverse=True
+        )
+        sums = np.bincount(inverse, weights=views, minlength=len(platforms))
+        platform_views.update(
+            dict(zip(platforms.tolist(), sums.astype(np.int64).tolist()))
+        )
 
     def _generate_insights(
         self,
-        metrics: list[PerformanceMetric],
-        performances: list[ContentPerformance],
+        total_posts: int,
+        total_views: int,
+        avg_engagement: float,
+        tiers: Counter[str],
+        platform_views: Counter[str],
     ) -> list[PerformanceInsight]:
-        """Gera insights baseados nos dados."""
+        """Gera insights baseados nos dados agregados."""
         insights = []
 
-        if not metrics:
+        if not total_posts:
             return insights
 
         # Insight de engajamento
-        avg_engagement = sum(float(m.engagement_rate or 0) for m in metrics) / len(metrics)
-
         if avg_engagement > 0.05:
             insights.append(PerformanceInsight(
                 category="engagement",
@@ -458,8 +717,7 @@ class PerformanceTrackerAgent:
             ))
 
         # Insight de views
-        total_views = sum(m.views for m in metrics)
-        avg_views = total_views / len(metrics)
+        avg_views = total_views / total_posts
 
         insights.append(PerformanceInsight(
             category="reach",
@@ -470,57 +728,64 @@ class PerformanceTrackerAgent:
         ))
 
         # Insight de performance tiers
-        tiers = {}
-        for p in performances:
-            tiers[p.performance_tier] = tiers.get(p.performance_tier, 0) + 1
-
-        viral_count = tiers.get("viral", 0) + tiers.get("high", 0)
-        if viral_count >= len(performances) * 0.3:
+        viral_count = tiers["viral"] + tiers["high"]
+        if viral_count >= total_posts * 0.3:
             insights.append(PerformanceInsight(
                 category="content",
                 title="Alta taxa de viralizacao",
-                description=f"{viral_count} de {len(performances)} posts com alta performance",
+                description=f"{viral_count} de {total_posts} posts com alta performance",
                 impact="high",
                 action="Continue com a estrategia atual",
             ))
 
         # Insight de plataforma
-        platform_views = {}
-        for m in metrics:
-            p = m.platform.value
-            platform_views[p] = platform_views.get(p, 0) + m.views
-
         if platform_views:
-            best_platform = max(platform_views, key=platform_views.get)
+            best_platform = platform_views.most_common(1)[0][0]
             insights.append(PerformanceInsight(
                 category="platform",
                 title=f"Melhor plataforma: {best_platform}",
                 description=f"{best_platform.title()} gerando mais alcance",
                 impact="medium",
                 action=f"Priorize conteudo para {best_platform}",
-                data={"platform_views": platform_views},
+                data={"platform_views": dict(platform_views)},
             ))
 
         return insights
 
-    def _analyze_trends(self, metrics: list[PerformanceMetric]) -> dict:
+    def _analyze_trends(
+        self,
+        db: Session,
+        period_start: datetime,
+        platform: Optional[Platform],
+    ) -> dict:
         """Analisa tendencias nos dados."""
-        if len(metrics) < 3:
-            return {"data_points": len(metrics), "trend": "insufficient_data"}
-
-        # Agrupa por dia
-        by_day = {}
-        for m in metrics:
-            day = m.measured_at.date() if m.measured_at else None
-            if day:
-                if day not in by_day:
-                    by_day[day] = {"views": 0, "engagement": 0, "count": 0}
-                by_day[day]["views"] += m.views
-                by_day[day]["engagement"] += m.total_engagement
-                by_day[day]["count"] += 1
+        source = self._metric_source(db, period_start, platform)
+
+        # Agrupa por dia no banco
+        day_col = func.date_trunc("day", source.timestamp)
+        rows = db.execute(
+            select(
+                day_col.label("day"),
+                func.coalesce(source.views, 0),
+                func.coalesce(source.engagement, 0),
+                func.coalesce(source.count, 0),
+            )
+            .where(*source.filters)
+            .group_by(day_col)
+            .order_by(day_col)
+        ).all()
+
+        by_day = {
+            day.date(): {"views": int(views), "engagement": int(engagement), "count": int(count)}
+            for day, views, engagement, count in rows
+        }
+        data_points = sum(data["count"] for data in by_day.values())
+
+        if data_points < 3:
+            return {"data_points": data_points, "trend": "insufficient_data"}
 
         # Calcula tendencia
-        sorted_days = sorted(by_day.keys())
+        sorted_days = list(by_day.keys())
         if len(sorted_days) >= 2:
             first_half = sorted_days[:len(sorted_days)//2]
             second_half = sorted_days[len(sorted_days)//2:]
@@ -539,7 +804,7 @@ class PerformanceTrackerAgent:
             trend = "insufficient_data"
 
         return {
-            "data_points": len(metrics),
+            "data_points": data_points,
             "trend": trend,
             "growth_rate": growth,
             "daily_breakdown": {
@@ -561,62 +826,55 @@ class PerformanceTrackerAgent:
         Returns:
             Dict com melhores horarios
         """
+        key = (days, platform)
+        best_times = _posting_times_cache.get(key)
+        if best_times is None:
+            best_times = self._compute_best_posting_times(platform, days)
+            _posting_times_cache.set(key, best_times)
+        return best_times
+
+    def _compute_best_posting_times(
+        self,
+        platform: Optional[Platform],
+        days: int,
+    ) -> dict:
+        """Calcula medias de engajamento por hora e dia da semana no banco."""
         period_start = datetime.now() - timedelta(days=days)
 
         db = get_sync_db()
         try:
-            query = select(PerformanceMetric).where(
-                PerformanceMetric.measured_at >= period_start
-            )
-            if platform:
-                query = query.where(PerformanceMetric.platform == platform)
-
-            metrics = list(db.execute(query).scalars().all())
-
-            if not metrics:
+            source = self._metric_source(db, period_start, platform)
+            avg_engagement = source.engagement_rate_sum / func.nullif(source.count, 0)
+
+            # Agrupa por hora e por dia da semana no banco
+            hour_col = func.extract("hour", source.timestamp)
+            hour_rows = db.execute(
+                select(hour_col, avg_engagement, source.count)
+                .where(*source.filters)
+                .group_by(hour_col)
+            ).all()
+
+            if not hour_rows:
                 return {"best_hours": [], "best_days": [], "insufficient_data": True}
 
-            # Agrupa por hora
-            by_hour = {}
-            by_day = {}
-
-            for m in metrics:
-                if not m.measured_at:
-                    continue
-
-                hour = m.measured_at.hour
-                day = m.measured_at.strftime("%A")
-                engagement = float(m.engagement_rate or 0)
-
-                if hour not in by_hour:
-                    by_hour[hour] = {"total_engagement": 0, "count": 0}
-                by_hour[hour]["total_engagement"] += engagement
-                by_hour[hour]["count"] += 1
-
-                if day not in by_day:
-                    by_day[day] = {"total_engagement": 0, "count": 0}
-                by_day[day]["total_engagement"] += engagement
-                by_day[day]["count"] += 1
+            day_col = func.extract("isodow", source.timestamp)
+            day_rows = db.execute(
+                select(day_col, avg_engagement)
+                .where(*source.filters)
+                .group_by(day_col)
+            ).all()
 
             # Calcula medias e ordena
-            hour_avgs = {
-                h: data["total_engagement"] / data["count"]
-                for h, data in by_hour.items()
-                if data["count"] > 0
-            }
-            best_hours = sorted(hour_avgs.keys(), key=lambda h: hour_avgs[h], reverse=True)[:5]
+            hour_avgs = {int(h): float(avg or 0) for h, avg, _ in hour_rows}
+            best_hours = [h for h, _ in nlargest(5, hour_avgs.items(), key=itemgetter(1))]
 
-            day_avgs = {
-                d: data["total_engagement"] / data["count"]
-                for d, data in by_day.items()
-                if data["count"] > 0
-            }
-            best_days = sorted(day_avgs.keys(), key=lambda d: day_avgs[d], reverse=True)[:3]
+            day_avgs = {ISO_DAY_NAMES[int(d)]: float(avg or 0) for d, avg in day_rows}
+            best_days = [d for d, _ in nlargest(3, day_avgs.items(), key=itemgetter(1))]
 
             return {
                 "best_hours": [{"hour": h, "avg_engagement": round(hour_avgs[h], 4)} for h in best_hours],
                 "best_days": [{"day": d, "avg_engagement": round(day_avgs[d], 4)} for d in best_days],
-                "sample_size": len(metrics),
+                "sample_size": int(sum(count for _, _, count in hour_rows)),
             }
 
         finally:
@@ -645,12 +903,12 @@ class PerformanceTrackerAgent:
 
         # Coleta metricas
         if collect:
-            print("[PerformanceTracker] Coletando metricas...")
+            logger.info("[PerformanceTracker] Coletando metricas...")
             metrics_collected = self.collect_metrics(platform, days)
-            print(f"[PerformanceTracker] Coletadas {metrics_collected} metricas")
+            logger.info("[PerformanceTracker] Coletadas %d metricas", metrics_collected)
 
         # Gera relatorio
-        print("[PerformanceTracker] Gerando relatorio...")
+        logger.info("[PerformanceTracker] Gerando relatorio...")
         report = self.generate_report(days, platform)
         reports_generated = 1
         insights_found = len(report.insights)
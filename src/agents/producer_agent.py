@@ -1,18 +1,21 @@
 """Producer Agent - Responsavel por produzir videos completos."""
 
 import asyncio
+import logging
+import shutil
 import tempfile
+import time
 from dataclasses import dataclass
-from datetime import datetime
 from decimal import Decimal
 from pathlib import Path
 from typing import Optional
 from uuid import uuid4
 
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.orm import raiseload
 
 from config.settings import get_settings
-from src.core.database import get_sync_db
+from src.core.database import sync_db_session
 from src.db.models import (
     GeneratedStrategy,
     ProducedVideo,
@@ -22,8 +25,20 @@ from src.db.models import (
 )
 from src.tools import budget_tools, ffmpeg_tools, storage_tools, tts_tools, veo_tools
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
+BYTES_PER_MB = Decimal(1024 * 1024)
+
+# Proxima estrategia aprovada livre (fila de producao), montada uma vez
+NEXT_APPROVED_STMT = (
+    select(GeneratedStrategy)
+    .where(GeneratedStrategy.status == StrategyStatus.APPROVED.value)
+    .order_by(GeneratedStrategy.created_at)
+    .limit(1)
+    .with_for_update(skip_locked=True)
+)
+
 
 @dataclass
 class ProducerResult:
@@ -44,10 +59,10 @@ class ProducerAgent:
 
     Pipeline:
     1. Geracao de TTS (narracao)
-    2. Geracao de clips Veo
-    3. Concatenacao dos clips
-    4. Mixagem final (video + narracao + musica)
-    5. Upload para MinIO
+    2. Geracao de clips Veo (em paralelo com o TTS)
+    3. Concatenacao dos clips e mixagem final (video + narracao + musica),
+       em uma unica passada do FFmpeg
+    4. Upload para MinIO
     """
 
     def __init__(self):
@@ -63,6 +78,7 @@ class ProducerAgent:
         strategy_id: int,
         mode: Optional[str] = None,
         music_track: Optional[str] = None,
+        claimed: bool = False,
     ) -> ProducerResult:
         """Produz video completo a partir de uma estrategia.
 
@@ -70,180 +86,249 @@ class ProducerAgent:
             strategy_id: ID da estrategia
             mode: Modo Veo (test/production)
             music_track: Nome do arquivo de musica (opcional)
+            claimed: Estrategia ja reservada (IN_PRODUCTION) por produce_next_approved
 
         Returns:
             ProducerResult com resultado da producao
         """
         run_id = str(uuid4())
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         mode = mode or settings.veo_mode
 
-        db = get_sync_db()
-        try:
-            # Busca estrategia
-            strategy = db.get(GeneratedStrategy, strategy_id)
-            if not strategy:
-                raise ValueError(f"Estrategia {strategy_id} nao encontrada")
-
-            if strategy.status not in [StrategyStatus.DRAFT.value, StrategyStatus.APPROVED.value]:
-                raise ValueError(f"Estrategia nao esta pronta para producao (status: {strategy.status})")
-
-            # Verifica budget
-            can_produce, msg = self.budget.can_produce_video(
-                num_scenes=strategy.scene_count,
-                script_chars=strategy.total_script_length,
-                veo_mode=mode,
-            )
-            if not can_produce:
-                raise RuntimeError(msg)
-
-            # Cria registro de producao
-            production = ProducedVideo(
-                strategy_id=strategy_id,
-                status=ProductionStatus.PENDING.value,
-            )
-            db.add(production)
-
-            # Cria metrica de run
-            run_metric = RunMetrics(
-                run_id=run_id,
-                task_name="producer_production",
-                agent_name="producer",
-            )
-            db.add(run_metric)
-
-            # Atualiza status da estrategia
-            strategy.status = StrategyStatus.IN_PRODUCTION.value
-            db.commit()
-            db.refresh(production)
-
-            print(f"[Producer] Iniciando producao #{production.id} para estrategia '{strategy.title}'")
-
-            with tempfile.TemporaryDirectory() as tmp_dir:
-                tmp_path = Path(tmp_dir)
+        with sync_db_session() as db:
+            try:
+                # Busca estrategia: todos os campos usados na producao sao colunas
+                # carregadas nesta query; relacionamentos nunca sao lazy-loaded
+                strategy = db.execute(
+                    select(GeneratedStrategy)
+                    .options(raiseload("*"))
+                    .where(GeneratedStrategy.id == strategy_id)
+                ).scalar_one_or_none()
+                if not strategy:
+                    raise ValueError(f"Estrategia {strategy_id} nao encontrada")
+
+                ready_statuses = [StrategyStatus.DRAFT.value, StrategyStatus.APPROVED.value]
+                if claimed:
+                    ready_statuses.append(StrategyStatus.IN_PRODUCTION.value)
+
+                if strategy.status not in ready_statuses:
+                    raise ValueError(f"Estrategia nao esta pronta para producao (status: {strategy.status})")
+
+                scene_count = strategy.scene_count
+
+                # Verifica budget
+                can_produce, msg = self.budget.can_produce_video(
+                    num_scenes=scene_count,
+                    script_chars=strategy.total_script_length,
+                    veo_mode=mode,
+                )
+                if not can_produce:
+                    raise RuntimeError(msg)
 
-                # 1. Gera TTS
-                print("[Producer] Gerando narracao TTS...")
-                production.status = ProductionStatus.GENERATING_TTS.value
-                db.commit()
+                # Cria registro de producao
+                production = ProducedVideo(
+                    strategy_id=strategy_id,
+                    status=ProductionStatus.PENDING.value,
+                )
+                db.add(production)
 
-                tts_result = await self._generate_tts(strategy, tmp_path)
-                production.tts_file_path = str(tts_result.file_path)
-                production.tts_provider = tts_result.provider
-                production.narration_duration_seconds = Decimal(str(tts_result.duration_seconds))
-                production.tts_cost_usd = Decimal(str(tts_result.cost_usd))
+                # Cria metrica de run
+                run_metric = RunMetrics(
+                    run_id=run_id,
+                    task_name="producer_production",
+                    agent_name="producer",
+                )
+                db.add(run_metric)
 
-                # 2. Gera clips Veo
-                print(f"[Producer] Gerando {strategy.scene_count} clips Veo ({mode})...")
-                production.status = ProductionStatus.GENERATING_VIDEO.value
+                # Atualiza status da estrategia
+                strategy.status = StrategyStatus.IN_PRODUCTION.value
                 db.commit()
+                db.refresh(production)
 
-                clips_result = await self._generate_clips(strategy, tmp_path, mode)
-                production.clips_paths = [str(c.video_path) for c in clips_result.clips]
-                production.veo_cost_usd = Decimal(str(clips_result.total_cost_usd))
-                production.veo_jobs = [
-                    {"prompt": c.prompt, "path": str(c.video_path)}
-                    for c in clips_result.clips
-                ]
+                logger.info(
+                    "[Producer] Iniciando producao #%s para estrategia '%s'",
+                    production.id,
+                    strategy.title,
+                )
 
-                if clips_result.failed_prompts:
-                    print(f"[Producer] Aviso: {len(clips_result.failed_prompts)} clips falharam")
+                with tempfile.TemporaryDirectory(dir=self._working_dir_root()) as tmp_dir:
+                    tmp_path = Path(tmp_dir)
+
+                    # 1-2. Gera TTS e clips Veo em paralelo (etapas independentes)
+                    logger.info(
+                        "[Producer] Gerando narracao TTS e %s clips Veo (%s)...",
+                        scene_count,
+                        mode,
+                    )
+                    self._publish_status(production.id, ProductionStatus.GENERATING_VIDEO)
+
+                    tts_result, clips_result = await self._generate_media(strategy, tmp_path, mode)
+                    production.tts_file_path = str(tts_result.file_path)
+                    production.tts_provider = tts_result.provider
+                    production.narration_duration_seconds = Decimal.from_float(
+                        tts_result.duration_seconds
+                    ).quantize(Decimal("0.01"))
+                    production.tts_cost_usd = tts_result.cost_usd
+
+                    production.clips_paths = [str(c.video_path) for c in clips_result.clips]
+                    production.veo_cost_usd = clips_result.total_cost_usd
+                    production.veo_jobs = [
+                        {"prompt": c.prompt, "path": str(c.video_path)}
+                        for c in clips_result.clips
+                    ]
+
+                    if clips_result.failed_prompts:
+                        logger.warning(
+                            "[Producer] %s clips falharam", len(clips_result.failed_prompts)
+                        )
+
+                    # 3-4. Concatena clips e mixa audio em uma unica passada do FFmpeg
+                    logger.info("[Producer] Concatenando clips e mixando audio...")
+                    self._publish_status(production.id, ProductionStatus.MIXING)
+
+                    final_path = tmp_path / "final.mp4"
+
+                    music_path = None
+                    if music_track:
+                        music_full_path = settings.music_path / music_track
+                        if music_full_path.exists():
+                            music_path = music_full_path
+                            production.music_track_used = music_track
+                            production.music_volume_used = strategy.music_volume
+
+                    mix_result = self.ffmpeg.concat_and_mix(
+                        clip_paths=[c.video_path for c in clips_result.clips],
+                        narration_path=tts_result.file_path,
+                        output_path=final_path,
+                        music_path=music_path,
+                        music_volume=float(strategy.music_volume),
+                    )
+
+                    # 4. Upload para MinIO, em paralelo com a leitura dos metadados
+                    logger.info("[Producer] Fazendo upload para storage...")
+                    final_remote_path, video_info = await asyncio.gather(
+                        asyncio.to_thread(
+                            self.storage.upload_production,
+                            final_path,
+                            production.id,
+                            "final",
+                        ),
+                        asyncio.to_thread(self.ffmpeg.get_video_info, final_path),
+                    )
+                    production.final_video_path = final_remote_path
+
+                    # Metadados do video final
+                    production.final_duration_seconds = int(video_info.duration_seconds)
+                    production.final_resolution = f"{video_info.width}x{video_info.height}"
+                    production.final_file_size_mb = (
+                        Decimal(final_path.stat().st_size) / BYTES_PER_MB
+                    ).quantize(Decimal("0.01"))
+
+                # Calcula custo total
+                production.calculate_total_cost()
+                production.status = ProductionStatus.COMPLETED.value
+
+                # Atualiza estrategia
+                strategy.status = StrategyStatus.PRODUCED.value
+
+                # Registra custos
+                if production.tts_cost_usd > 0:
+                    self.budget.register_cost("elevenlabs", production.tts_cost_usd, 1, db)
+                self.budget.register_cost("veo", production.veo_cost_usd, scene_count, db)
+                self.budget.increment_counter("videos_produced", 1, db)
+                self.budget.increment_counter("veo_generations", scene_count, db)
+
+                # Finaliza metrica
+                run_metric.items_processed = 1
+                run_metric.actual_cost_usd = production.total_production_cost_usd
+                run_metric.complete(success=True)
 
-                # 3. Concatena clips
-                print("[Producer] Concatenando clips...")
-                production.status = ProductionStatus.MIXING.value
                 db.commit()
 
-                concatenated_path = tmp_path / "concatenated.mp4"
-                clip_paths = [c.video_path for c in clips_result.clips]
-                self.ffmpeg.concatenate_videos(clip_paths, concatenated_path)
-
-                # 4. Mixa audio
-                print("[Producer] Mixando audio...")
-                final_path = tmp_path / "final.mp4"
-
-                music_path = None
-                if music_track:
-                    music_full_path = settings.music_path / music_track
-                    if music_full_path.exists():
-                        music_path = music_full_path
-                        production.music_track_used = music_track
-                        production.music_volume_used = strategy.music_volume
-
-                mix_result = self.ffmpeg.mix_audio_with_video(
-                    video_path=concatenated_path,
-                    narration_path=tts_result.file_path,
-                    output_path=final_path,
-                    music_path=music_path,
-                    music_volume=float(strategy.music_volume),
-                )
+                production_time = time.perf_counter() - start_time
 
-                # 5. Upload para MinIO
-                print("[Producer] Fazendo upload para storage...")
-                final_remote_path = self.storage.upload_production(
-                    final_path,
+                logger.info(
+                    "[Producer] Producao #%s concluida! Custo: $%s",
                     production.id,
-                    "final",
+                    production.total_production_cost_usd,
                 )
-                production.final_video_path = final_remote_path
-
-                # Metadados do video final
-                video_info = self.ffmpeg.get_video_info(final_path)
-                production.final_duration_seconds = int(video_info.duration_seconds)
-                production.final_resolution = f"{video_info.width}x{video_info.height}"
-                production.final_file_size_mb = Decimal(
-                    str(final_path.stat().st_size / (1024 * 1024))
+
+                return ProducerResult(
+                    run_id=run_id,
+                    production_id=production.id,
+                    strategy_id=strategy_id,
+                    final_video_path=production.final_video_path,
+                    duration_seconds=float(production.final_duration_seconds or 0),
+                    total_cost_usd=float(production.total_production_cost_usd or 0),
+                    production_time_seconds=production_time,
                 )
 
-            # Calcula custo total
-            production.calculate_total_cost()
-            production.status = ProductionStatus.COMPLETED.value
+            except Exception as e:
+                # Registra falha
+                if "production" in locals():
+                    production.status = ProductionStatus.FAILED.value
+                    production.error_message = str(e)
+                if "strategy" in locals():
+                    strategy.status = StrategyStatus.DRAFT.value
+                if "run_metric" in locals():
+                    run_metric.complete(success=False, error=str(e))
+                db.commit()
+                raise
 
-            # Atualiza estrategia
-            strategy.status = StrategyStatus.PRODUCED.value
+    def _working_dir_root(self) -> Optional[str]:
+        """Diretorio base para os arquivos intermediarios da producao.
 
-            # Registra custos
-            if production.tts_cost_usd > 0:
-                self.budget.register_cost("elevenlabs", production.tts_cost_usd, 1, db)
-            self.budget.register_cost("veo", production.veo_cost_usd, strategy.scene_count, db)
-            self.budget.increment_counter("videos_produced", 1, db)
-            self.budget.increment_counter("veo_generations", strategy.scene_count, db)
+        Usa settings.producer_tmp_dir (tmpfs em /dev/shm por padrao) quando ele
+        existe e tem espaco livre suficiente; senao retorna None e o
+        TemporaryDirectory cai no tmp padrao do sistema.
+        """
+        tmp_dir = settings.producer_tmp_dir
+        try:
+            tmp_dir.mkdir(exist_ok=True)
+            free_mb = shutil.disk_usage(tmp_dir).free / (1024 * 1024)
+        except OSError:
+            return None
+
+        if free_mb < settings.producer_tmp_min_free_mb:
+            logger.info(
+                "[Producer] %s com pouco espaco (%.0f MB), usando disco", tmp_dir, free_mb
+            )
+            return None
+        return str(tmp_dir)
 
-            # Finaliza metrica
-            run_metric.items_processed = 1
-            run_metric.actual_cost_usd = production.total_production_cost_usd
-            run_metric.complete(success=True)
+    def _publish_status(self, production_id: int, status: ProductionStatus) -> None:
+        """Publica o status intermediario da producao para quem acompanha o progresso.
 
+        Usa uma sessao curta propria, assim a sessao principal do produce so
+        commita na criacao da producao e no estado final.
+        """
+        with sync_db_session() as db:
+            db.execute(
+                update(ProducedVideo)
+                .where(ProducedVideo.id == production_id)
+                .values(status=status.value)
+            )
             db.commit()
 
-            production_time = (datetime.now() - start_time).total_seconds()
-
-            print(f"[Producer] Producao #{production.id} concluida! "
-                  f"Custo: ${production.total_production_cost_usd}")
+    async def _generate_media(
+        self,
+        strategy: GeneratedStrategy,
+        output_dir: Path,
+        mode: str,
+    ):
+        """Gera narracao TTS e clips Veo concorrentemente.
 
-            return ProducerResult(
-                run_id=run_id,
-                production_id=production.id,
-                strategy_id=strategy_id,
-                final_video_path=production.final_video_path,
-                duration_seconds=float(production.final_duration_seconds or 0),
-                total_cost_usd=float(production.total_production_cost_usd or 0),
-                production_time_seconds=production_time,
-            )
+        Se uma das etapas falhar, a outra e cancelada e o erro e propagado.
+        """
+        tts_task = asyncio.create_task(self._generate_tts(strategy, output_dir))
+        clips_task = asyncio.create_task(self._generate_clips(strategy, output_dir, mode))
 
-        except Exception as e:
-            # Registra falha
-            if "production" in locals():
-                production.status = ProductionStatus.FAILED.value
-                production.error_message = str(e)
-            if "strategy" in locals():
-                strategy.status = StrategyStatus.DRAFT.value
-            if "run_metric" in locals():
-                run_metric.complete(success=False, error=str(e))
-            db.commit()
+        try:
+            return await asyncio.gather(tts_task, clips_task)
+        except BaseException:
+            tts_task.cancel()
+            clips_task.cancel()
             raise
-        finally:
-            db.close()
 
     async def _generate_tts(
         self,
@@ -288,6 +373,7 @@ class ProducerAgent:
             duration=5,  # 5 segundos por clip
             aspect_ratio="9:16",  # Vertical
             mode=mode,
+            max_concurrent=settings.veo_max_concurrent,
         )
 
     def produce_sync(
@@ -295,37 +381,37 @@ class ProducerAgent:
         strategy_id: int,
         mode: Optional[str] = None,
         music_track: Optional[str] = None,
+        claimed: bool = False,
     ) -> ProducerResult:
         """Versao sincrona do produce."""
-        return asyncio.run(self.produce(strategy_id, mode, music_track))
+        return asyncio.run(self.produce(strategy_id, mode, music_track, claimed))
 
     def produce_next_approved(self, mode: Optional[str] = None) -> Optional[ProducerResult]:
         """Produz proxima estrategia aprovada.
 
+        A estrategia e reservada com SELECT ... FOR UPDATE SKIP LOCKED e marcada
+        como IN_PRODUCTION na mesma transacao, entao workers concorrentes nunca
+        produzem a mesma estrategia.
+
         Args:
             mode: Modo Veo
 
         Returns:
             ProducerResult ou None se nao houver estrategia
         """
-        db = get_sync_db()
-        try:
-            # Busca estrategia aprovada
-            stmt = (
-                select(GeneratedStrategy)
-                .where(GeneratedStrategy.status == StrategyStatus.APPROVED.value)
-                .order_by(GeneratedStrategy.created_at)
-                .limit(1)
-            )
-            strategy = db.execute(stmt).scalar_one_or_none()
+        with sync_db_session() as db:
+            # Busca e trava a estrategia aprovada mais antiga livre
+            strategy = db.execute(NEXT_APPROVED_STMT).scalar_one_or_none()
 
             if not strategy:
-                print("[Producer] Nenhuma estrategia aprovada encontrada")
+                logger.info("[Producer] Nenhuma estrategia aprovada encontrada")
                 return None
 
-            return self.produce_sync(strategy.id, mode)
-        finally:
-            db.close()
+            strategy.status = StrategyStatus.IN_PRODUCTION.value
+            strategy_id = strategy.id
+            db.commit()
+
+        return self.produce_sync(strategy_id, mode, claimed=True)
 
     def approve_strategy(self, strategy_id: int) -> GeneratedStrategy:
         """Aprova estrategia para producao.
@@ -336,8 +422,7 @@ class ProducerAgent:
         Returns:
             GeneratedStrategy atualizada
         """
-        db = get_sync_db()
-        try:
+        with sync_db_session() as db:
             strategy = db.get(GeneratedStrategy, strategy_id)
             if not strategy:
                 raise ValueError(f"Estrategia {strategy_id} nao encontrada")
@@ -346,10 +431,8 @@ class ProducerAgent:
             db.commit()
             db.refresh(strategy)
 
-            print(f"[Producer] Estrategia '{strategy.title}' aprovada para producao!")
+            logger.info("[Producer] Estrategia '%s' aprovada para producao!", strategy.title)
             return strategy
-        finally:
-            db.close()
 
 
 # Singleton para uso global
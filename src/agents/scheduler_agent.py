@@ -1,19 +1,37 @@
 """Content Scheduler Agent - Agenda e publica conteudo."""
 
+import asyncio
+import logging
+from bisect import bisect_right
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 from uuid import uuid4
 
-from sqlalchemy import select, update
+from sqlalchemy import lambda_stmt, select, update
 from sqlalchemy.orm import Session
 
 from config.settings import get_settings
-from src.core.database import get_sync_db
+from src.core.database import sync_db_session
 from src.db.models.trends import ContentQueue, ContentStatus, Platform
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# Status considerados "na fila" por list_scheduled
+ACTIVE_STATUSES = (ContentStatus.SCHEDULED, ContentStatus.PROCESSING, ContentStatus.READY)
+
+# Status a partir dos quais publish_content reserva o conteudo (FAILED = nova tentativa)
+PUBLISHABLE_STATUSES = (
+    ContentStatus.DRAFT,
+    ContentStatus.SCHEDULED,
+    ContentStatus.READY,
+    ContentStatus.FAILED,
+)
+
 
 @dataclass
 class ScheduleResult:
@@ -67,6 +85,22 @@ class ContentScheduler:
         ],
     }
 
+    # Indice plataforma -> dia da semana -> horas, montado uma vez
+    TIMES_BY_DAY: dict[Platform, dict[int, tuple[int, ...]]] = {
+        platform: {t["day"]: tuple(t["hours"]) for t in times}
+        for platform, times in OPTIMAL_TIMES.items()
+    }
+
+    # Horarios otimos em minutos desde segunda 00:00, ordenados para busca binaria
+    SLOTS_BY_PLATFORM: dict[Platform, list[int]] = {
+        platform: sorted(
+            day * MINUTES_PER_DAY + hour * 60
+            for day, hours in by_day.items()
+            for hour in hours
+        )
+        for platform, by_day in TIMES_BY_DAY.items()
+    }
+
     def schedule_content(
         self,
         title: str,
@@ -99,9 +133,7 @@ class ContentScheduler:
         Returns:
             ScheduleResult
         """
-        db = get_sync_db()
-
-        try:
+        with sync_db_session() as db:
             # Determina horario
             optimal_used = False
             if not scheduled_at:
@@ -138,30 +170,24 @@ class ContentScheduler:
                 optimal_time_used=optimal_used,
             )
 
-        finally:
-            db.close()
-
     def _get_next_optimal_time(self, platform: Platform) -> datetime:
         """Retorna proximo horario otimo para a plataforma."""
-        now = datetime.now()
-        times = self.OPTIMAL_TIMES.get(platform, self.OPTIMAL_TIMES[Platform.INSTAGRAM])
-
-        # Procura proximo horario
-        for days_ahead in range(7):
-            check_date = now + timedelta(days=days_ahead)
-            day_of_week = check_date.weekday()
+        earliest = datetime.now() + timedelta(minutes=30)  # Pelo menos 30min no futuro
+        slots = self.SLOTS_BY_PLATFORM.get(
+            platform, self.SLOTS_BY_PLATFORM[Platform.INSTAGRAM]
+        )
 
-            day_times = next((t for t in times if t["day"] == day_of_week), None)
-            if not day_times:
-                continue
+        # Posicao de earliest na semana, em minutos desde segunda 00:00
+        week_start = (earliest - timedelta(days=earliest.weekday())).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        offset = (earliest - week_start) / timedelta(minutes=1)
 
-            for hour in day_times["hours"]:
-                scheduled = check_date.replace(hour=hour, minute=0, second=0, microsecond=0)
-                if scheduled > now + timedelta(minutes=30):  # Pelo menos 30min no futuro
-                    return scheduled
+        # Primeiro slot estritamente depois de earliest; se nao houver, volta para a proxima semana
+        idx = bisect_right(slots, offset)
+        slot = slots[idx] if idx < len(slots) else slots[0] + MINUTES_PER_WEEK
 
-        # Fallback: amanha ao meio-dia
-        return (now + timedelta(days=1)).replace(hour=12, minute=0, second=0, microsecond=0)
+        return week_start + timedelta(minutes=slot)
 
     def get_optimal_times(
         self,
@@ -178,23 +204,26 @@ class ContentScheduler:
             Lista de {date, times}
         """
         now = datetime.now()
-        times = self.OPTIMAL_TIMES.get(platform, self.OPTIMAL_TIMES[Platform.INSTAGRAM])
+        times_by_day = self._times_by_day(platform)
         result = []
 
         for days in range(days_ahead):
             check_date = now + timedelta(days=days)
-            day_of_week = check_date.weekday()
 
-            day_times = next((t for t in times if t["day"] == day_of_week), None)
-            if day_times:
+            hours = times_by_day.get(check_date.weekday())
+            if hours:
                 result.append({
                     "date": check_date.strftime("%Y-%m-%d"),
                     "day_name": check_date.strftime("%A"),
-                    "times": [f"{h:02d}:00" for h in day_times["hours"]],
+                    "times": [f"{h:02d}:00" for h in hours],
                 })
 
         return result
 
+    def _times_by_day(self, platform: Platform) -> dict[int, tuple[int, ...]]:
+        """Retorna horas otimas por dia da semana (fallback: Instagram)."""
+        return self.TIMES_BY_DAY.get(platform, self.TIMES_BY_DAY[Platform.INSTAGRAM])
+
     def list_scheduled(
         self,
         status: Optional[ContentStatus] = None,
@@ -211,57 +240,67 @@ class ContentScheduler:
         Returns:
             Lista de ContentQueue
         """
-        db = get_sync_db()
-        try:
-            query = select(ContentQueue)
+        with sync_db_session() as db:
+            # lambda_stmt: cada combinacao de filtros e montada/compilada uma vez
+            # e reaproveitada pelo cache do SQLAlchemy, so os parametros mudam
+            query = lambda_stmt(lambda: select(ContentQueue))
 
             if status:
-                query = query.where(ContentQueue.status == status)
+                query += lambda s: s.where(ContentQueue.status == status)
             else:
-                query = query.where(ContentQueue.status.in_([
-                    ContentStatus.SCHEDULED,
-                    ContentStatus.PROCESSING,
-                    ContentStatus.READY,
-                ]))
+                query += lambda s: s.where(ContentQueue.status.in_(ACTIVE_STATUSES))
 
             if platform:
                 # JSONB contains
-                query = query.where(ContentQueue.target_platforms.contains([platform.value]))
+                platform_filter = ContentQueue.target_platforms.contains([platform.value])
+                query += lambda s: s.where(platform_filter)
 
-            query = query.order_by(ContentQueue.scheduled_at).limit(limit)
+            query += lambda s: s.order_by(ContentQueue.scheduled_at).limit(limit)
 
             return list(db.execute(query).scalars().all())
-        finally:
-            db.close()
 
     def get_due_content(self) -> list[ContentQueue]:
         """Retorna conteudos prontos para publicar (horario passou).
 
+        So leitura: a reserva para publicacao acontece em publish_content.
+
         Returns:
             Lista de ContentQueue
         """
-        db = get_sync_db()
-        try:
+        with sync_db_session() as db:
             query = select(ContentQueue).where(
                 ContentQueue.status == ContentStatus.SCHEDULED,
                 ContentQueue.scheduled_at <= datetime.now(),
             ).order_by(ContentQueue.priority.desc(), ContentQueue.scheduled_at)
 
             return list(db.execute(query).scalars().all())
-        finally:
-            db.close()
 
     def publish_content(self, content_id: int) -> PublishResult:
         """Publica conteudo imediatamente.
 
+        Reserva o conteudo com um UPDATE condicional ao status (como
+        cancel_scheduled): entre chamadas concorrentes so uma o move para
+        PROCESSING e publica. Conteudo ja em publicacao, publicado ou
+        cancelado nao e publicado de novo. Se a publicacao levantar, o
+        conteudo termina FAILED (reagendavel) em vez de ficar em PROCESSING.
+
         Args:
             content_id: ID do conteudo
 
         Returns:
             PublishResult
         """
-        db = get_sync_db()
-        try:
+        with sync_db_session() as db:
+            claimed = db.execute(
+                update(ContentQueue)
+                .where(
+                    ContentQueue.id == content_id,
+                    ContentQueue.status.in_(PUBLISHABLE_STATUSES),
+                )
+                .values(status=ContentStatus.PROCESSING)
+            ).rowcount
+            db.commit()
+
             content = db.get(ContentQueue, content_id)
             if not content:
                 return PublishResult(
@@ -270,23 +309,33 @@ class ContentScheduler:
                     published_urls={},
                     error="Conteudo nao encontrado",
                 )
-
-            # Atualiza status
-            content.status = ContentStatus.PROCESSING
-            db.commit()
+            if not claimed:
+                return PublishResult(
+                    content_id=content_id,
+                    success=False,
+                    published_urls={},
+                    error=f"Conteudo nao publicavel (status {content.status.value})",
+                )
 
             published_urls = {}
             errors = []
 
-            # Publica em cada plataforma
-            for platform_str in content.target_platforms:
-                try:
-                    platform = Platform(platform_str)
-                    url = self._publish_to_platform(content, platform)
-                    if url:
-                        published_urls[platform_str] = url
-                except Exception as e:
-                    errors.append(f"{platform_str}: {e}")
+            # Publica em todas as plataformas concorrentemente
+            platforms = list(content.target_platforms)
+            try:
+                results = asyncio.run(self._publish_to_platforms(content, platforms))
+            except Exception as e:
+                content.status = ContentStatus.FAILED
+                content.error_message = str(e)
+                content.retry_count += 1
+                db.commit()
+                raise
+
+            for platform_str, result in zip(platforms, results):
+                if isinstance(result, BaseException):
+                    errors.append(f"{platform_str}: {result}")
+                elif result:
+                    published_urls[platform_str] = result
 
             # Atualiza registro
             if published_urls:
@@ -307,10 +356,28 @@ class ContentScheduler:
                 error="; ".join(errors) if errors else None,
             )
 
-        finally:
-            db.close()
+    async def _publish_to_platforms(
+        self,
+        content: ContentQueue,
+        platforms: list[str],
+    ) -> list[Optional[str] | BaseException]:
+        """Publica em varias plataformas com asyncio.gather.
 
-    def _publish_to_platform(self, content: ContentQueue, platform: Platform) -> Optional[str]:
+        Retorna, na ordem de platforms, a URL publicada ou a excecao de cada uma.
+        """
+        async def publish(platform_str: str) -> Optional[str]:
+            return await self._publish_to_platform(content, Platform(platform_str))
+
+        return await asyncio.gather(
+            *(publish(p) for p in platforms),
+            return_exceptions=True,
+        )
+
+    async def _publish_to_platform(
+        self,
+        content: ContentQueue,
+        platform: Platform,
+    ) -> Optional[str]:
         """Publica em uma plataforma especifica.
 
         NOTA: Implementacao real requer APIs de cada plataforma.
@@ -321,9 +388,12 @@ class ContentScheduler:
         # - TikTok: TikTok API for Business
         # - YouTube: YouTube Data API
 
-        print(f"[Scheduler] Publicando em {platform.value}...")
-        print(f"  - Video: {content.video_path}")
-        print(f"  - Caption: {content.caption[:50] if content.caption else 'N/A'}...")
+        logger.info(
+            "[Scheduler] Publicando em %s: video=%s caption=%.50s",
+            platform.value,
+            content.video_path,
+            content.caption or "N/A",
+        )
 
         # Simula URL publicada (em producao, seria a URL real do post)
         fake_id = uuid4().hex[:8]
@@ -345,16 +415,18 @@ class ContentScheduler:
         Returns:
             True se cancelado com sucesso
         """
-        db = get_sync_db()
-        try:
-            content = db.get(ContentQueue, content_id)
-            if content and content.status == ContentStatus.SCHEDULED:
-                content.status = ContentStatus.CANCELLED
-                db.commit()
-                return True
-            return False
-        finally:
-            db.close()
+        with sync_db_session() as db:
+            # UPDATE condicional ao status: atomico, sem carregar o objeto
+            result = db.execute(
+                update(ContentQueue)
+                .where(
+                    ContentQueue.id == content_id,
+                    ContentQueue.status == ContentStatus.SCHEDULED,
+                )
+                .values(status=ContentStatus.CANCELLED)
+            )
+            db.commit()
+            return result.rowcount > 0
 
     def reschedule(self, content_id: int, new_time: datetime) -> bool:
         """Reagenda conteudo.
@@ -366,18 +438,21 @@ class ContentScheduler:
         Returns:
             True se reagendado com sucesso
         """
-        db = get_sync_db()
-        try:
-            content = db.get(ContentQueue, content_id)
-            if content and content.status in [ContentStatus.SCHEDULED, ContentStatus.FAILED]:
-                content.scheduled_at = new_time
-                content.status = ContentStatus.SCHEDULED
-                content.optimal_time_used = False
-                db.commit()
-                return True
-            return False
-        finally:
-            db.close()
+        with sync_db_session() as db:
+            result = db.execute(
+                update(ContentQueue)
+                .where(
+                    ContentQueue.id == content_id,
+                    ContentQueue.status.in_([ContentStatus.SCHEDULED, ContentStatus.FAILED]),
+                )
+                .values(
+                    scheduled_at=new_time,
+                    status=ContentStatus.SCHEDULED,
+                    optimal_time_used=False,
+                )
+            )
+            db.commit()
+            return result.rowcount > 0
 
 
 # Factory function
@@ -1,20 +1,29 @@
 """Strategist Agent - Responsavel por gerar estrategias de conteudo usando GPT-4o."""
 
+import asyncio
+import functools
+import hashlib
 import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from datetime import datetime
 from decimal import Decimal
 from typing import Optional
 from uuid import uuid4
 
+import httpx
 import instructor
-from openai import OpenAI
-from pydantic import BaseModel, Field
+from openai import AsyncOpenAI, OpenAI, RateLimitError
+from pydantic import BaseModel, Field, ValidationError
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager, joinedload
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
 from config.settings import get_settings
-from src.core.database import get_sync_db
+from src.core.cache import TTLCache
+from src.core.database import AsyncSessionLocal, get_sync_db
 from src.db.models import (
     GeneratedStrategy,
     PromptVersion,
@@ -23,10 +32,142 @@ from src.db.models import (
     VideoAnalysis,
     ViralVideo,
 )
-from src.tools import budget_tools
+from src.tools import BudgetExceededError, budget_tools
+
+try:
+    import h2  # noqa: F401 - extra http2 do httpx
+except ImportError:  # imagem sem o extra: httpx.Client(http2=True) levantaria ImportError
+    h2 = None
 
 settings = get_settings()
 
+# Limiar de viralidade convertido uma vez para comparar com a coluna Numeric
+_MIN_VIRALITY_SCORE = Decimal(str(settings.min_virality_score))
+
+# json.dumps com kwargs fora do padrao monta um JSONEncoder novo a cada chamada
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def _is_rate_limited(exc: BaseException) -> bool:
+    """Indica 429 da OpenAI (o instructor embrulha o erro original em __cause__)."""
+    return isinstance(exc, RateLimitError) or isinstance(exc.__cause__, RateLimitError)
+
+
+# Estimativa grosseira de caracteres por token (sem tokenizer no projeto)
+_CHARS_PER_TOKEN = 4
+
+
+class _StreamBuffer:
+    """Acumula os deltas de uma resposta em streaming e o uso de tokens do ultimo chunk."""
+
+    def __init__(self):
+        self.parts: list[str] = []
+        self.tokens = 0
+        self._checked = False
+
+    def feed(self, chunk) -> bool:
+        """Consome um chunk; retorna False se a resposta ja e obviamente invalida."""
+        if chunk.usage:
+            self.tokens = chunk.usage.total_tokens
+        if not chunk.choices or not chunk.choices[0].delta.content:
+            return True
+
+        self.parts.append(chunk.choices[0].delta.content)
+        if not self._checked:
+            head = "".join(self.parts).lstrip()
+            if head:
+                # Modo JSON: qualquer coisa que nao seja um objeto nao vai validar
+                self._checked = True
+                return head.startswith("{")
+        return True
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    def abort(self, prompt: str) -> None:
+        """Contabiliza um streaming cancelado antes do chunk final de usage.
+
+        A OpenAI cobra o prompt e o que ja foi gerado, mas o usage so viria no
+        ultimo chunk: estima os tokens pelo tamanho do texto.
+        """
+        if not self.tokens:
+            self.tokens = (len(prompt) + len(self.text)) // _CHARS_PER_TOKEN
+        print(f"[Strategist] Streaming cancelado (resposta nao e JSON), ~{self.tokens} tokens")
+
+
+# === Cache de respostas do LLM ===
+
+_llm_cache_conn: Optional[sqlite3.Connection] = None
+_llm_cache_lock = threading.Lock()
+
+
+def _llm_cache() -> sqlite3.Connection:
+    """Abre (uma vez por processo) o SQLite de cache de respostas do GPT-4o."""
+    global _llm_cache_conn
+
+    if _llm_cache_conn is None:
+        path = settings.strategist_cache_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+            "tokens INTEGER NOT NULL, created_at INTEGER NOT NULL)"
+        )
+        _llm_cache_conn = conn
+    return _llm_cache_conn
+
+
+def _llm_cache_get(key: str) -> Optional[tuple[str, int]]:
+    """Retorna (response, tokens) se a chave existir e estiver dentro do TTL."""
+    min_created_at = int(time.time()) - settings.strategist_cache_ttl_seconds
+    with _llm_cache_lock:
+        return _llm_cache().execute(
+            "SELECT response, tokens FROM llm_cache WHERE key = ? AND created_at >= ?",
+            (key, min_created_at),
+        ).fetchone()
+
+
+def _llm_cache_put(key: str, response: str, tokens: int) -> None:
+    """Grava (ou substitui) a resposta de um prompt."""
+    with _llm_cache_lock:
+        conn = _llm_cache()
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, response, tokens, created_at) "
+            "VALUES (?, ?, ?, ?)",
+            (key, response, tokens, int(time.time())),
+        )
+        conn.commit()
+
+
+# === Versao ativa do prompt ===
+
+# prompt_type -> id da PromptVersion ativa (ou None). A versao ativa muda
+# raramente; guardar so o id evita objetos ORM presos a sessoes antigas.
+_prompt_version_cache = TTLCache(maxsize=4, ttl=300)
+_NOT_CACHED = object()
+
+
+def _lookup_active_prompt_version_id(db: Session, prompt_type: str) -> Optional[int]:
+    """Retorna o id da versao ativa do prompt, consultando o banco so no cache miss."""
+    version_id = _prompt_version_cache.get(prompt_type, _NOT_CACHED)
+    if version_id is _NOT_CACHED:
+        version_id = db.execute(
+            select(PromptVersion.id).where(
+                PromptVersion.prompt_type == prompt_type,
+                PromptVersion.is_active == True,
+            )
+        ).scalar_one_or_none()
+        _prompt_version_cache.set(prompt_type, version_id)
+    return version_id
+
+
+def invalidate_prompt_cache() -> None:
+    """Descarta as versoes de prompt em cache (chamar ao ativar outra versao)."""
+    _prompt_version_cache.clear()
+
 
 # === Schemas de Validacao ===
 
@@ -71,6 +212,12 @@ class StrategyOutput(BaseModel):
     estimated_scenes: int = Field(description="Numero de cenas")
 
 
+class StrategyBatchOutput(BaseModel):
+    """Schema de output da geracao em lote (uma estrategia por video, em ordem)."""
+
+    strategies: list[StrategyOutput] = Field(description="Estrategias, uma por video")
+
+
 @dataclass
 class StrategistResult:
     """Resultado de geracao de estrategia."""
@@ -97,12 +244,14 @@ class StrategistAgent:
     5. Armazenamento no banco
     """
 
-    STRATEGY_PROMPT = """Voce e um estrategista de conteudo viral especializado em videos curtos para Instagram/TikTok.
-Baseado na analise de um video viral, crie uma estrategia de conteudo original que replique os elementos de sucesso.
+    PROMPT_INTRO = """Voce e um estrategista de conteudo viral especializado em videos curtos para Instagram/TikTok.
+Baseado na analise de um video viral, crie uma estrategia de conteudo original que replique os elementos de sucesso."""
 
-## Analise do Video de Referencia
+    BATCH_PROMPT_INTRO = """Abaixo estao as analises de {count} videos virais. Para CADA video, crie uma estrategia de conteudo original que replique os elementos de sucesso daquele video.
 
-**Metricas de Sucesso:**
+Retorne um JSON no formato {{"strategies": [...]}} com exatamente uma estrategia por video, na mesma ordem dos videos. Cada estrategia segue a estrutura descrita nas instrucoes."""
+
+    ANALYSIS_TEMPLATE = """**Metricas de Sucesso:**
 - Views: {views}
 - Likes: {likes}
 - Virality Score: {virality_score}
@@ -121,193 +270,271 @@ Baseado na analise de um video viral, crie uma estrategia de conteudo original q
 {transcription}
 
 **Nicho:**
-{niche}
-
-## Instrucoes
+{niche}"""
 
-Crie uma estrategia de conteudo ORIGINAL (nao copie o video, mas replique os elementos de sucesso).
-O video final deve ter aproximadamente 30 segundos no formato vertical (9:16).
+    INSTRUCTIONS = """## Instrucoes
 
-Retorne um JSON com a seguinte estrutura EXATA:
+- Estrategia ORIGINAL: replique os elementos de sucesso, nao o conteudo
+- Video de ~30 segundos, vertical (9:16)
+- Scripts em portugues brasileiro
+- 4-6 cenas Veo de 3-10 segundos cada, cobrindo ~30 segundos
+- visual_description detalhada o bastante para a AI gerar o video
+- Responda APENAS com o JSON, nesta estrutura:
 
-```json
-{{
-    "title": "titulo atrativo do video",
-    "concept": "conceito geral do video em 1-2 frases",
+{
+    "title": "titulo atrativo",
+    "concept": "conceito em 1-2 frases",
     "target_niche": "nicho alvo especifico",
-
-    "hook_script": "roteiro completo do hook (0-3 segundos) - texto para narracao",
-    "development_script": "roteiro do desenvolvimento (3-25 segundos) - texto para narracao",
-    "cta_script": "roteiro do CTA (25-30 segundos) - texto para narracao",
-
+    "hook_script": "narracao do hook (0-3s)",
+    "development_script": "narracao do desenvolvimento (3-25s)",
+    "cta_script": "narracao do CTA (25-30s)",
     "veo_prompts": [
-        {{
+        {
             "scene_number": 1,
             "duration_seconds": 3,
-            "visual_description": "descricao visual detalhada para geracao de video AI",
+            "visual_description": "descricao visual para geracao de video AI",
             "camera_movement": "estatico|zoom in|zoom out|pan left|pan right|tracking",
-            "mood": "clima/atmosfera da cena"
-        }},
-        // ... mais cenas (4-6 total para 30 segundos)
+            "mood": "clima da cena"
+        }
     ],
-
     "suggested_hashtags": ["hashtag1", "hashtag2", "hashtag3"],
-    "suggested_caption": "caption otimizada para engajamento",
-    "best_posting_time": "horario sugerido (ex: 19h-21h)",
-    "suggested_music": "estilo de musica de fundo recomendado",
-
+    "suggested_caption": "caption para engajamento",
+    "best_posting_time": "ex: 19h-21h",
+    "suggested_music": "estilo de musica de fundo",
     "estimated_scenes": 5
-}}
-```
-
-IMPORTANTE:
-- Retorne APENAS o JSON, sem texto adicional
-- Os scripts devem ser em portugues brasileiro
-- Cada cena Veo deve ter 3-10 segundos
-- Total de cenas: 4-6 para cobrir ~30 segundos
-- Visual descriptions devem ser detalhadas para AI gerar video
-- Foque em replicar os ELEMENTOS de sucesso, nao o conteudo
+}
 """
 
+    # Instrucoes e schema sao fixos e vao na mensagem de sistema, montada uma
+    # vez: o prefixo identico entre chamadas aproveita o prompt caching da
+    # OpenAI. A mensagem do usuario leva so a analise (parte dinamica).
+    SYSTEM_MESSAGE = PROMPT_INTRO + "\n\n" + INSTRUCTIONS
+    PROMPT_HEAD = "## Analise do Video de Referencia\n\n"
+
+    # Limite de tokens de saida por estrategia (o lote escala por video).
+    # Uma estrategia de 5 cenas fica em ~800-1200 tokens.
+    MAX_TOKENS_PER_STRATEGY = 1400
+
+    HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+    HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+    HTTP2 = h2 is not None
+
     def __init__(self):
         """Inicializa Strategist Agent."""
         if not settings.openai_api_key:
             raise RuntimeError("OPENAI_API_KEY nao configurado")
 
-        self.client = instructor.from_openai(OpenAI(api_key=settings.openai_api_key))
+        # Modo JSON: a OpenAI responde com response_format=json_object (JSON puro,
+        # sem cercas markdown) e o instructor valida com model_validate_json
+        # HTTP/2 (se h2 estiver instalado): as chamadas concorrentes de um lote
+        # multiplexam poucas conexoes; sem ele, HTTP/1.1 com o mesmo pool
+        self.openai = OpenAI(
+            api_key=settings.openai_api_key,
+            http_client=httpx.Client(
+                http2=self.HTTP2, limits=self.HTTP_LIMITS, timeout=self.HTTP_TIMEOUT
+            ),
+        )
+        self.aopenai = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            http_client=httpx.AsyncClient(
+                http2=self.HTTP2, limits=self.HTTP_LIMITS, timeout=self.HTTP_TIMEOUT
+            ),
+        )
+        self.client = instructor.from_openai(self.openai, mode=instructor.Mode.JSON)
+        self.aclient = instructor.from_openai(self.aopenai, mode=instructor.Mode.JSON)
         self.budget = budget_tools
 
     def generate(
         self,
         video_id: int,
         niche: Optional[str] = None,
+        db: Optional[Session] = None,
     ) -> StrategistResult:
         """Gera estrategia baseada em um video analisado.
 
         Args:
             video_id: ID do video de referencia
             niche: Nicho alvo (opcional, usa nicho do video)
+            db: Sessao ja aberta pelo chamador (opcional, nao e fechada aqui)
 
         Returns:
             StrategistResult com estrategia gerada
         """
         run_id = str(uuid4())
-        start_time = datetime.now()
+        start_time = time.perf_counter()
 
-        db = get_sync_db()
+        owns_session = db is None
+        if owns_session:
+            db = get_sync_db()
         try:
-            # Busca video e analise
-            video = db.get(ViralVideo, video_id)
-            if not video:
-                raise ValueError(f"Video {video_id} nao encontrado")
-
-            if not video.analysis:
-                raise ValueError(f"Video {video_id} nao foi analisado")
-
-            analysis = video.analysis
-
-            # Verifica qualidade minima
-            if float(analysis.virality_score or 0) < settings.min_virality_score:
-                raise ValueError(
-                    f"Video com virality_score abaixo do minimo "
-                    f"({analysis.virality_score} < {settings.min_virality_score})"
-                )
+            video, analysis, target_niche = self._load_video(db, video_id, niche)
 
             # Cria metrica de run
-            run_metric = RunMetrics(
-                run_id=run_id,
-                task_name="strategist_generation",
-                agent_name="strategist",
-            )
-            db.add(run_metric)
+            run_metric = self._start_run(db, run_id)
 
             # Verifica budget
             can_run, cost, msg = self.budget.check_budget("openai", 1)
             if not can_run:
                 raise RuntimeError(f"Budget insuficiente: {msg}")
 
-            # Determina nicho
-            target_niche = niche or video.profile.niche if video.profile else "geral"
-
             # Gera estrategia com structured output (instructor cuida da validacao)
             print(f"[Strategist] Gerando estrategia para video {video_id}...")
-            validated_output, tokens_used = self._call_gpt4o(video, analysis, target_niche)
-
-            # Busca versao do prompt
-            prompt_version = self._get_prompt_version(db)
-
-            # Calcula custo estimado de producao
-            estimated_cost = self.budget.estimate_production_cost(
-                num_scenes=validated_output.estimated_scenes,
-                script_chars=len(validated_output.hook_script or "")
-                + len(validated_output.development_script or "")
-                + len(validated_output.cta_script or ""),
+            validated_output, tokens_used, cached = self._cached_call_gpt4o(
+                video, analysis, target_niche
             )
 
-            # Cria estrategia
-            strategy = GeneratedStrategy(
-                source_video_id=video_id,
-                prompt_version_id=prompt_version.id if prompt_version else None,
-                title=validated_output.title,
-                concept=validated_output.concept,
-                target_niche=validated_output.target_niche,
-                hook_script=validated_output.hook_script,
-                development_script=validated_output.development_script,
-                cta_script=validated_output.cta_script,
-                full_script=(
-                    f"{validated_output.hook_script} "
-                    f"{validated_output.development_script} "
-                    f"{validated_output.cta_script}"
-                ),
-                veo_prompts=[p.model_dump() for p in validated_output.veo_prompts],
-                suggested_hashtags=validated_output.suggested_hashtags,
-                suggested_caption=validated_output.suggested_caption,
-                best_posting_time=validated_output.best_posting_time,
-                suggested_music=validated_output.suggested_music,
-                estimated_production_cost_usd=Decimal(str(estimated_cost["total_usd"])),
-                tokens_used=tokens_used,
-                generation_cost_usd=Decimal(str(settings.cost_gpt4o_per_strategy)),
-                status=StrategyStatus.DRAFT.value,
+            return self._finish_run(
+                db, run_id, run_metric, video_id, validated_output, tokens_used, cached, start_time
             )
 
-            db.add(strategy)
+        except Exception as e:
+            if "run_metric" in locals():
+                run_metric.complete(success=False, error=str(e))
+                db.commit()
+            raise
+        finally:
+            if owns_session:
+                db.close()
 
-            # Registra custo
-            self.budget.register_cost(
-                "openai", Decimal(str(settings.cost_gpt4o_per_strategy)), 1, db
-            )
-            self.budget.increment_counter("strategies_generated", 1, db)
+    async def agenerate(
+        self,
+        video_id: int,
+        niche: Optional[str] = None,
+    ) -> StrategistResult:
+        """Versao assincrona do generate, para orquestradores com event loop.
 
-            # Finaliza metrica
-            run_metric.items_processed = 1
-            run_metric.actual_cost_usd = Decimal(str(settings.cost_gpt4o_per_strategy))
-            run_metric.complete(success=True)
+        Usa AsyncOpenAI e AsyncSession (uma sessao por chamada), entao a espera
+        pela OpenAI nao bloqueia o loop. As etapas de banco reaproveitam o
+        codigo sincrono via AsyncSession.run_sync.
+        """
+        run_id = str(uuid4())
+        start_time = time.perf_counter()
 
-            db.commit()
-            db.refresh(strategy)
+        async with AsyncSessionLocal() as db:
+            try:
+                video, analysis, target_niche = await db.run_sync(
+                    self._load_video, video_id, niche
+                )
 
-            duration = (datetime.now() - start_time).total_seconds()
+                run_metric = await db.run_sync(self._start_run, run_id)
 
-            print(f"[Strategist] Estrategia '{strategy.title}' criada com sucesso!")
+                can_run, cost, msg = await asyncio.to_thread(
+                    self.budget.check_budget, "openai", 1
+                )
+                if not can_run:
+                    raise RuntimeError(f"Budget insuficiente: {msg}")
 
-            return StrategistResult(
-                run_id=run_id,
-                strategy_id=strategy.id,
-                title=strategy.title,
-                num_scenes=validated_output.estimated_scenes,
-                estimated_cost_usd=estimated_cost["total_usd"],
-                is_valid=True,
-                cost_usd=float(settings.cost_gpt4o_per_strategy),
-                duration_seconds=duration,
+                print(f"[Strategist] Gerando estrategia para video {video_id}...")
+                validated_output, tokens_used, cached = await self._acached_call_gpt4o(
+                    video, analysis, target_niche
+                )
+
+                return await db.run_sync(
+                    self._finish_run,
+                    run_id,
+                    run_metric,
+                    video_id,
+                    validated_output,
+                    tokens_used,
+                    cached,
+                    start_time,
+                )
+
+            except Exception as e:
+                if "run_metric" in locals():
+                    run_metric.complete(success=False, error=str(e))
+                    await db.commit()
+                raise
+
+    def _load_video(
+        self,
+        db: Session,
+        video_id: int,
+        niche: Optional[str],
+    ) -> tuple[ViralVideo, VideoAnalysis, str]:
+        """Busca video e analise, valida qualidade minima e resolve o nicho.
+
+        Returns:
+            Tuple (video, analysis, target_niche)
+        """
+        # analysis e profile sao to-one: vem no mesmo SELECT (sem lazy loads)
+        video = db.execute(
+            select(ViralVideo)
+            .options(joinedload(ViralVideo.analysis), joinedload(ViralVideo.profile))
+            .where(ViralVideo.id == video_id)
+        ).scalar_one_or_none()
+        if not video:
+            raise ValueError(f"Video {video_id} nao encontrado")
+
+        if not video.analysis:
+            raise ValueError(f"Video {video_id} nao foi analisado")
+
+        analysis = video.analysis
+
+        # Verifica qualidade minima
+        if float(analysis.virality_score or 0) < settings.min_virality_score:
+            raise ValueError(
+                f"Video com virality_score abaixo do minimo "
+                f"({analysis.virality_score} < {settings.min_virality_score})"
             )
 
-        except Exception as e:
-            if "run_metric" in locals():
-                run_metric.complete(success=False, error=str(e))
-                db.commit()
-            raise
-        finally:
-            db.close()
+        # Determina nicho
+        target_niche = niche or video.profile.niche if video.profile else "geral"
+
+        return video, analysis, target_niche
+
+    def _start_run(self, db: Session, run_id: str) -> RunMetrics:
+        """Cria a metrica de run da geracao."""
+        run_metric = RunMetrics(
+            run_id=run_id,
+            task_name="strategist_generation",
+            agent_name="strategist",
+        )
+        db.add(run_metric)
+        return run_metric
+
+    def _finish_run(
+        self,
+        db: Session,
+        run_id: str,
+        run_metric: RunMetrics,
+        video_id: int,
+        validated_output: StrategyOutput,
+        tokens_used: int,
+        cached: bool,
+        start_time: float,
+    ) -> StrategistResult:
+        """Salva a estrategia gerada, registra custos e fecha a metrica de run."""
+        generation_cost = Decimal("0") if cached else settings.cost_gpt4o_per_strategy
+
+        strategy, estimated_cost = self._create_strategy(
+            db, video_id, validated_output, tokens_used, generation_cost
+        )
+
+        # Finaliza metrica
+        run_metric.items_processed = 1
+        run_metric.actual_cost_usd = generation_cost
+        run_metric.complete(success=True)
+
+        # Registra custo (resposta vinda do cache nao gerou chamada a OpenAI) e
+        # contador; o mesmo commit grava estrategia e metrica
+        costs = [] if cached else [("openai", generation_cost, 1)]
+        self.budget.register_costs_bulk(costs, {"strategies_generated": 1}, db)
+
+        duration = time.perf_counter() - start_time
+
+        print(f"[Strategist] Estrategia '{strategy.title}' criada com sucesso!")
+
+        return StrategistResult(
+            run_id=run_id,
+            strategy_id=strategy.id,
+            title=strategy.title,
+            num_scenes=validated_output.estimated_scenes,
+            estimated_cost_usd=float(estimated_cost["total_usd"]),
+            is_valid=True,
+            cost_usd=float(generation_cost),
+            duration_seconds=duration,
+        )
 
     def generate_from_best_videos(
         self,
@@ -325,94 +552,530 @@ IMPORTANTE:
         """
         db = get_sync_db()
         try:
-            # Busca melhores videos analisados do nicho
-            stmt = (
-                select(ViralVideo)
-                .join(VideoAnalysis)
-                .where(
-                    ViralVideo.is_analyzed == True,
-                    VideoAnalysis.virality_score >= Decimal(str(settings.min_virality_score)),
-                    VideoAnalysis.replicability_score >= Decimal("0.6"),
-                )
-                .order_by(VideoAnalysis.virality_score.desc())
-                .limit(limit * 2)  # Busca mais para ter margem
-            )
-            videos = db.execute(stmt).scalars().all()
+            videos_without_strategy = self._select_videos_without_strategy(db, limit)
 
-            # Filtra videos que ainda nao tem estrategia
-            videos_without_strategy = [
-                v for v in videos if not v.strategies
-            ][:limit]
+            if not videos_without_strategy:
+                return []
 
-            results = []
-            for video in videos_without_strategy:
-                try:
-                    # Verifica budget
-                    status = self.budget.get_daily_status()
-                    if status["budget"]["exceeded"]:
-                        print("[Strategist] Budget excedido, parando geracao")
-                        break
+            # Verifica budget uma vez para o lote inteiro
+            status = self.budget.get_daily_status()
+            if status["budget"]["exceeded"]:
+                print("[Strategist] Budget excedido, parando geracao")
+                return []
 
-                    result = self.generate(video.id, niche=niche)
-                    results.append(result)
+            can_run, _, msg = self.budget.check_budget("openai", len(videos_without_strategy))
+            if not can_run:
+                print(f"[Strategist] Budget insuficiente para o lote: {msg}")
+                return []
 
+            if settings.strategist_batch_generation:
+                try:
+                    return self._generate_batch(db, videos_without_strategy, niche)
                 except Exception as e:
-                    print(f"[Strategist] Erro ao gerar estrategia para video {video.id}: {e}")
+                    db.rollback()
+                    print(f"[Strategist] Erro na geracao em lote, gerando video a video: {e}")
 
-            return results
+            return self._generate_concurrently(
+                [video.id for video in videos_without_strategy], niche, db
+            )
         finally:
             db.close()
 
-    def _call_gpt4o(
+    async def agenerate_from_best_videos(
+        self,
+        niche: str,
+        limit: int = 3,
+    ) -> list[StrategistResult]:
+        """Versao assincrona do generate_from_best_videos.
+
+        Dispara um agenerate por video com asyncio.gather (cada um com sua
+        AsyncSession), limitado a OPENAI_RPM_LIMIT / 60 chamadas simultaneas.
+        """
+        async with AsyncSessionLocal() as db:
+            videos = await db.run_sync(self._select_videos_without_strategy, limit)
+        video_ids = [video.id for video in videos]
+
+        if not video_ids:
+            return []
+
+        status = await asyncio.to_thread(self.budget.get_daily_status)
+        if status["budget"]["exceeded"]:
+            print("[Strategist] Budget excedido, parando geracao")
+            return []
+
+        semaphore = asyncio.Semaphore(max(1, settings.openai_rpm_limit // 60))
+
+        async def generate_one(video_id: int) -> StrategistResult:
+            async with semaphore:
+                return await self.agenerate(video_id, niche)
+
+        outcomes = await asyncio.gather(
+            *(generate_one(video_id) for video_id in video_ids),
+            return_exceptions=True,
+        )
+
+        results = []
+        for video_id, outcome in zip(video_ids, outcomes):
+            if isinstance(outcome, BaseException):
+                print(f"[Strategist] Erro ao gerar estrategia para video {video_id}: {outcome}")
+            else:
+                results.append(outcome)
+
+        return results
+
+    def _select_videos_without_strategy(self, db: Session, limit: int) -> list[ViralVideo]:
+        """Busca os melhores videos analisados que ainda nao tem estrategia."""
+        stmt = (
+            select(ViralVideo)
+            .join(VideoAnalysis)
+            # analysis vem do proprio JOIN
+            .options(contains_eager(ViralVideo.analysis))
+            .where(
+                ViralVideo.is_analyzed == True,
+                VideoAnalysis.virality_score >= _MIN_VIRALITY_SCORE,
+                VideoAnalysis.replicability_score >= Decimal("0.6"),
+                # NOT EXISTS: o filtro de "sem estrategia" fica no banco
+                ~ViralVideo.strategies.any(),
+            )
+            .order_by(VideoAnalysis.virality_score.desc())
+            .limit(limit)
+        )
+        return list(db.scalars(stmt))
+
+    def _generate_concurrently(
+        self,
+        video_ids: list[int],
+        niche: str,
+        db: Session,
+    ) -> list[StrategistResult]:
+        """Gera uma estrategia por video, com as chamadas ao GPT-4o em paralelo.
+
+        Cada generate() em thread abre sua propria sessao (Session nao e
+        thread-safe); com uma unica thread, reaproveita a sessao do chamador.
+        O numero de threads segue o limite de requests por minuto da conta
+        (OPENAI_RPM_LIMIT / 60). Erros de um video sao logados e nao
+        interrompem os demais.
+
+        Cada generate() confere o budget antes de chamar o GPT-4o e registra
+        o custo com incremento atomico, entao o gasto dos outros workers ja
+        concluidos entra na conta. Se o budget estourar, os videos ainda na
+        fila sao cancelados.
+        """
+        max_workers = min(len(video_ids), max(1, settings.openai_rpm_limit // 60))
+
+        results = []
+        if max_workers == 1:
+            for video_id in video_ids:
+                try:
+                    results.append(self.generate(video_id, niche, db=db))
+                except Exception as e:
+                    db.rollback()
+                    print(f"[Strategist] Erro ao gerar estrategia para video {video_id}: {e}")
+            return results
+
+        # Registros do dia criados antes: os workers so incrementam
+        self.budget.ensure_today_rows()
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(self.generate, video_id, niche): video_id
+                for video_id in video_ids
+            }
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                try:
+                    results.append(future.result())
+                except BudgetExceededError as e:
+                    print(f"[Strategist] Budget excedido, cancelando videos restantes: {e}")
+                    for pending in futures:
+                        pending.cancel()
+                except Exception as e:
+                    print(f"[Strategist] Erro ao gerar estrategia para video {futures[future]}: {e}")
+
+        return results
+
+    def _generate_batch(
+        self,
+        db: Session,
+        videos: list[ViralVideo],
+        niche: str,
+    ) -> list[StrategistResult]:
+        """Gera estrategias para varios videos com uma unica chamada ao GPT-4o.
+
+        Args:
+            db: Sessao do banco
+            videos: Videos analisados, sem estrategia
+            niche: Nicho alvo
+
+        Returns:
+            Lista de StrategistResult, na ordem dos videos
+        """
+        run_id = str(uuid4())
+        start_time = time.perf_counter()
+
+        print(f"[Strategist] Gerando {len(videos)} estrategias em uma unica chamada...")
+        outputs, tokens_used = self._call_gpt4o_batch(
+            [(video, video.analysis, niche) for video in videos]
+        )
+
+        run_metric = RunMetrics(
+            run_id=run_id,
+            task_name="strategist_generation",
+            agent_name="strategist",
+        )
+        db.add(run_metric)
+
+        generation_cost = settings.cost_gpt4o_per_strategy
+        total_cost = generation_cost * len(outputs)
+        created = [
+            self._create_strategy(
+                db, video.id, output, tokens_used // len(outputs), generation_cost
+            )
+            for video, output in zip(videos, outputs)
+        ]
+
+        run_metric.items_processed = len(outputs)
+        run_metric.actual_cost_usd = total_cost
+        run_metric.complete(success=True)
+
+        # Um unico commit para todas as estrategias, custos, contador e metrica
+        try:
+            self.budget.register_costs_bulk(
+                [("openai", total_cost, len(outputs))],
+                {"strategies_generated": len(outputs)},
+                db,
+            )
+        except BudgetExceededError as e:
+            # As estrategias ja foram gravadas; nao cair no fallback video a video
+            print(f"[Strategist] {e}")
+
+        duration = time.perf_counter() - start_time
+
+        print(f"[Strategist] {len(created)} estrategias criadas com sucesso!")
+
+        return [
+            StrategistResult(
+                run_id=run_id,
+                strategy_id=strategy.id,
+                title=strategy.title,
+                num_scenes=output.estimated_scenes,
+                estimated_cost_usd=float(estimated_cost["total_usd"]),
+                is_valid=True,
+                cost_usd=float(generation_cost),
+                duration_seconds=duration,
+            )
+            for (strategy, estimated_cost), output in zip(created, outputs)
+        ]
+
+    def _create_strategy(
+        self,
+        db: Session,
+        video_id: int,
+        validated_output: StrategyOutput,
+        tokens_used: int,
+        generation_cost: Decimal,
+    ) -> tuple[GeneratedStrategy, dict]:
+        """Monta a GeneratedStrategy de um output validado e adiciona na sessao (sem commit).
+
+        Returns:
+            Tuple (strategy, estimated_cost)
+        """
+        # Busca versao do prompt
+        prompt_version_id = _lookup_active_prompt_version_id(db, "strategy")
+
+        # Um unico model_dump serializa todas as cenas no pydantic-core
+        veo_prompts = validated_output.model_dump(include={"veo_prompts"})["veo_prompts"]
+        hook = validated_output.hook_script or ""
+        development = validated_output.development_script or ""
+        cta = validated_output.cta_script or ""
+
+        # Calcula custo estimado de producao
+        estimated_cost = self.budget.estimate_production_cost(
+            num_scenes=validated_output.estimated_scenes,
+            script_chars=len(hook) + len(development) + len(cta),
+        )
+
+        strategy = GeneratedStrategy(
+            source_video_id=video_id,
+            prompt_version_id=prompt_version_id,
+            title=validated_output.title,
+            concept=validated_output.concept,
+            target_niche=validated_output.target_niche,
+            hook_script=hook,
+            development_script=development,
+            cta_script=cta,
+            full_script=f"{hook} {development} {cta}",
+            veo_prompts=veo_prompts,
+            suggested_hashtags=validated_output.suggested_hashtags,
+            suggested_caption=validated_output.suggested_caption,
+            best_posting_time=validated_output.best_posting_time,
+            suggested_music=validated_output.suggested_music,
+            estimated_production_cost_usd=estimated_cost["total_usd"],
+            tokens_used=tokens_used,
+            generation_cost_usd=generation_cost,
+            status=StrategyStatus.DRAFT.value,
+        )
+        db.add(strategy)
+
+        return strategy, estimated_cost
+
+    def _cached_call_gpt4o(
         self,
         video: ViralVideo,
         analysis: VideoAnalysis,
         niche: str,
-    ) -> tuple[StrategyOutput, int]:
-        """Chama GPT-4o para geracao de estrategia com structured output via instructor.
+    ) -> tuple[StrategyOutput, int, bool]:
+        """Chama GPT-4o reaproveitando a resposta de um prompt identico ja visto.
+
+        A chave e o SHA-256 de modelo + prompt + mensagem de sistema; a
+        temperatura fica de fora por ser fixa.
 
         Returns:
-            Tuple (validated_output, tokens_used)
+            Tuple (validated_output, tokens_used, cached)
         """
-        prompt = self.STRATEGY_PROMPT.format(
+        prompt = self._build_prompt(video, analysis, niche)
+        key = self._cache_key(prompt)
+
+        hit = _llm_cache_get(key)
+        if hit:
+            response, tokens = hit
+            print(f"[Strategist] Resposta do cache para video {video.id}")
+            return StrategyOutput.model_validate_json(response), tokens, True
+
+        result, tokens = self._call_gpt4o(prompt)
+        _llm_cache_put(key, result.model_dump_json(), tokens)
+        return result, tokens, False
+
+    async def _acached_call_gpt4o(
+        self,
+        video: ViralVideo,
+        analysis: VideoAnalysis,
+        niche: str,
+    ) -> tuple[StrategyOutput, int, bool]:
+        """Versao assincrona do _cached_call_gpt4o (mesmo cache, AsyncOpenAI)."""
+        prompt = self._build_prompt(video, analysis, niche)
+        key = self._cache_key(prompt)
+
+        hit = _llm_cache_get(key)
+        if hit:
+            response, tokens = hit
+            print(f"[Strategist] Resposta do cache para video {video.id}")
+            return StrategyOutput.model_validate_json(response), tokens, True
+
+        result, tokens = await self._acall_gpt4o(prompt)
+        _llm_cache_put(key, result.model_dump_json(), tokens)
+        return result, tokens, False
+
+    def _cache_key(self, prompt: str) -> str:
+        """Chave do cache: SHA-256 de modelo + prompt + mensagem de sistema."""
+        return hashlib.sha256(
+            f"{settings.openai_model}|{prompt}|{self.SYSTEM_MESSAGE}".encode()
+        ).hexdigest()
+
+    def _build_prompt(
+        self,
+        video: ViralVideo,
+        analysis: VideoAnalysis,
+        niche: str,
+    ) -> str:
+        """Monta a mensagem do usuario (analise do video) para o GPT-4o."""
+        return self.PROMPT_HEAD + self._render_analysis(video, analysis, niche)
+
+    def _render_analysis(
+        self,
+        video: ViralVideo,
+        analysis: VideoAnalysis,
+        niche: str,
+    ) -> str:
+        """Renderiza a secao de analise de um video de referencia."""
+        hook_json, development_json, viral_factors_json = self._analysis_json(analysis)
+        return self.ANALYSIS_TEMPLATE.format(
             views=video.views_count,
             likes=video.likes_count,
             virality_score=analysis.virality_score,
             replicability_score=analysis.replicability_score,
-            hook_analysis=json.dumps(analysis.hook_analysis, ensure_ascii=False, indent=2),
-            development_analysis=json.dumps(analysis.development, ensure_ascii=False, indent=2),
-            viral_factors=json.dumps(analysis.viral_factors, ensure_ascii=False, indent=2),
+            hook_analysis=hook_json,
+            development_analysis=development_json,
+            viral_factors=viral_factors_json,
             transcription=video.transcription or "Nao disponivel",
             niche=niche,
         )
 
+    @classmethod
+    def _analysis_json(cls, analysis: VideoAnalysis) -> tuple[str, str, str]:
+        """JSON dos campos da analise usados no prompt, serializado uma vez por instancia.
+
+        Fica guardado em `analysis._json_cache`, reaproveitado quando o mesmo
+        objeto volta a ser renderizado (lote, retentativas, chave do cache).
+        """
+        cached = analysis.__dict__.get("_json_cache")
+        if cached is None:
+            cached = (
+                cls._dump_json(analysis.hook_analysis),
+                cls._dump_json(analysis.development),
+                cls._dump_json(analysis.viral_factors),
+            )
+            analysis._json_cache = cached
+        return cached
+
+    @staticmethod
+    def _dump_json(value) -> str:
+        """Serializa campo JSONB da analise com chaves ordenadas (prompt estavel)."""
+        return _JSON_ENCODER.encode(value)
+
+    def _call_gpt4o_batch(
+        self,
+        videos_and_analyses: list[tuple[ViralVideo, VideoAnalysis, str]],
+    ) -> tuple[list[StrategyOutput], int]:
+        """Chama GPT-4o uma unica vez para gerar uma estrategia por video.
+
+        As instrucoes e o schema vao uma so vez (mensagem de sistema); cada
+        video entra como um bloco `### Video N` com sua analise.
+
+        Returns:
+            Tuple (outputs na ordem dos videos, tokens_used)
+        """
+        sections = "\n\n".join(
+            f"### Video {i}\n\n{self._render_analysis(video, analysis, niche)}"
+            for i, (video, analysis, niche) in enumerate(videos_and_analyses, start=1)
+        )
+        prompt = (
+            f"{self.BATCH_PROMPT_INTRO.format(count=len(videos_and_analyses))}\n\n"
+            f"## Videos de Referencia\n\n"
+            f"{sections}"
+        )
+
+        result, tokens = self._call_gpt4o(
+            prompt,
+            response_model=StrategyBatchOutput,
+            max_tokens=self.MAX_TOKENS_PER_STRATEGY * len(videos_and_analyses),
+        )
+
+        if len(result.strategies) != len(videos_and_analyses):
+            raise ValueError(
+                f"GPT-4o retornou {len(result.strategies)} estrategias "
+                f"para {len(videos_and_analyses)} videos"
+            )
+
+        return result.strategies, tokens
+
+    @retry(
+        retry=retry_if_exception(_is_rate_limited),
+        wait=wait_exponential(multiplier=2, max=60),
+        stop=stop_after_attempt(5),
+        reraise=True,
+    )
+    def _call_gpt4o(
+        self,
+        prompt: str,
+        response_model: type[BaseModel] = StrategyOutput,
+        max_tokens: int = MAX_TOKENS_PER_STRATEGY,
+    ) -> tuple[BaseModel, int]:
+        """Chama GPT-4o em streaming e valida o JSON acumulado com o schema.
+
+        Resposta que nao comeca com um objeto JSON e cancelada no primeiro delta.
+        Se o JSON final nao validar, repete pelo instructor, que faz reask com o erro.
+        Cada fallback custa uma completion extra; os tokens retornados somam o
+        streaming (estimados se cancelado) e a chamada do instructor.
+
+        Returns:
+            Tuple (validated_output, tokens_used)
+        """
+        buffer = _StreamBuffer()
+        stream = self.openai.chat.completions.create(**self._stream_kwargs(prompt, max_tokens))
+        try:
+            for chunk in stream:
+                if not buffer.feed(chunk):
+                    buffer.abort(self.SYSTEM_MESSAGE + prompt)
+                    break
+        finally:
+            stream.close()
+
+        try:
+            return response_model.model_validate_json(buffer.text), buffer.tokens
+        except ValidationError:
+            print("[Strategist] JSON invalido no streaming, repetindo via instructor")
+
         result, completion = self.client.chat.completions.create_with_completion(
-            model=settings.openai_model,
-            response_model=StrategyOutput,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "Voce e um estrategista de conteudo viral.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.7,
-            max_tokens=2500,
-            max_retries=2,
+            **self._completion_kwargs(prompt, response_model, max_tokens)
+        )
+        tokens = completion.usage.total_tokens if completion.usage else 0
+
+        return result, buffer.tokens + tokens
+
+    @retry(
+        retry=retry_if_exception(_is_rate_limited),
+        wait=wait_exponential(multiplier=2, max=60),
+        stop=stop_after_attempt(5),
+        reraise=True,
+    )
+    async def _acall_gpt4o(
+        self,
+        prompt: str,
+        response_model: type[BaseModel] = StrategyOutput,
+        max_tokens: int = MAX_TOKENS_PER_STRATEGY,
+    ) -> tuple[BaseModel, int]:
+        """Versao assincrona do _call_gpt4o (AsyncOpenAI), com o mesmo custo de fallback."""
+        buffer = _StreamBuffer()
+        stream = await self.aopenai.chat.completions.create(
+            **self._stream_kwargs(prompt, max_tokens)
         )
+        try:
+            async for chunk in stream:
+                if not buffer.feed(chunk):
+                    buffer.abort(self.SYSTEM_MESSAGE + prompt)
+                    break
+        finally:
+            await stream.close()
+
+        try:
+            return response_model.model_validate_json(buffer.text), buffer.tokens
+        except ValidationError:
+            print("[Strategist] JSON invalido no streaming, repetindo via instructor")
 
+        result, completion = await self.aclient.chat.completions.create_with_completion(
+            **self._completion_kwargs(prompt, response_model, max_tokens)
+        )
         tokens = completion.usage.total_tokens if completion.usage else 0
 
-        return result, tokens
+        return result, buffer.tokens + tokens
 
-    def _get_prompt_version(self, db: Session) -> Optional[PromptVersion]:
-        """Busca versao ativa do prompt de estrategia."""
-        stmt = select(PromptVersion).where(
-            PromptVersion.prompt_type == "strategy",
-            PromptVersion.is_active == True,
+    def _completion_kwargs(
+        self,
+        prompt: str,
+        response_model: type[BaseModel],
+        max_tokens: int,
+    ) -> dict:
+        """Parametros da chamada ao GPT-4o, comuns aos clientes sync e async."""
+        return {
+            "model": settings.openai_model,
+            "response_model": response_model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": self.SYSTEM_MESSAGE,
+                },
+                {"role": "user", "content": prompt},
+            ],
+            "temperature": 0.7,
+            "max_tokens": max_tokens,
+            "max_retries": 2,
+        }
+
+    def _stream_kwargs(self, prompt: str, max_tokens: int) -> dict:
+        """Parametros da chamada em streaming (cliente OpenAI direto, JSON mode)."""
+        kwargs = self._completion_kwargs(prompt, StrategyOutput, max_tokens)
+        del kwargs["response_model"], kwargs["max_retries"]
+        kwargs.update(
+            response_format={"type": "json_object"},
+            stream=True,
+            stream_options={"include_usage": True},
         )
-        return db.execute(stmt).scalar_one_or_none()
+        return kwargs
 
 
-# Singleton para uso global
-strategist_agent = StrategistAgent()
+# Lazy initialization - instanciado sob demanda (exige OPENAI_API_KEY)
+@functools.cache
+def get_strategist_agent() -> StrategistAgent:
+    """Retorna instancia unica do StrategistAgent (lazy init)."""
+    return StrategistAgent()
@@ -1,17 +1,33 @@
 """Style Cloner Agent - Aprende e replica seu estilo unico."""
 
+import os
 import re
-from dataclasses import dataclass, field
+import threading
+import time
+from bisect import bisect_right
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
 from datetime import datetime
-from decimal import Decimal
+from functools import lru_cache
+from multiprocessing import current_process
 from typing import Optional
 from uuid import uuid4
 
-from sqlalchemy import select
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
+try:
+    import hyperscan
+except ImportError:  # dependencia opcional (extra "textscan")
+    hyperscan = None
+
 from config.settings import get_settings
-from src.core.database import get_sync_db
+from src.core.database import sync_db_session
 from src.db.models.style import StyleAnalysis, StyleProfile, ToneType, ContentRhythm
 
 settings = get_settings()
@@ -65,6 +81,148 @@ CTA_PATTERNS = [
     r"inscreva",
 ]
 
+# Regex compiladas uma vez no import (analyze_text roda para cada caption)
+_CTA_RE = re.compile("|".join(f"(?:{p})" for p in CTA_PATTERNS), re.IGNORECASE)
+_EMOJI_RE = re.compile(
+    "["
+    "\U0001F600-\U0001F64F"
+    "\U0001F300-\U0001F5FF"
+    "\U0001F680-\U0001F6FF"
+    "\U0001F1E0-\U0001F1FF"
+    "\U00002702-\U000027B0"
+    "\U000024C2-\U0001F251"
+    "]+",
+    flags=re.UNICODE
+)
+_HASHTAG_RE = re.compile(r'#\w+')
+_SENT_SPLIT_RE = re.compile(r'[.!?]+')
+
+# Rotulos das faixas do perfil, indexados pela soma das comparacoes com os limites
+# (emoji: 0.5 e 2; sentenca: >= 10 e > 20) ou pelo bisect nas amostras (confianca)
+_EMOJI_FREQUENCIES = ("sparse", "moderate", "heavy")
+_SENTENCE_LENGTHS = ("short", "medium", "long")
+_CONFIDENCE_THRESHOLDS = (5, 15, 30, 50)
+_CONFIDENCE_LEVELS = (0.3, 0.5, 0.7, 0.85, 0.95)
+
+# Sugestoes fixas de apply_style por frequencia de emoji e por tom do perfil
+_EMOJI_SUGGESTIONS = {
+    "heavy": "Adicione emojis (bastante, 3-5 por caption)",
+    "moderate": "Adicione emojis (moderado, 1-2 por caption)",
+}
+_TONE_TIPS = {
+    "formal": "Use linguagem profissional e termos tecnicos",
+    "casual": "Escreva como se estivesse conversando com um amigo",
+    "humorous": "Adicione humor e referencias a memes",
+    "inspirational": "Use frases motivacionais e palavras de encorajamento",
+    "educational": "Estruture como dicas ou passo-a-passo",
+    "provocative": "Use perguntas provocativas e afirmacoes fortes",
+    "storytelling": "Conte uma historia, use narrativa",
+}
+
+# A partir de quantos textos unicos learn_from_captions analisa em processos
+_PARALLEL_MIN_TEXTS = 2000
+
+# Campos do perfil agregado gravados em style_profiles por _save_profile
+_PROFILE_COLUMNS = (
+    "name",
+    "primary_tone",
+    "secondary_tones",
+    "vocabulary_level",
+    "use_emoji",
+    "emoji_frequency",
+    "sentence_length",
+    "uses_questions",
+    "uses_cta",
+    "favorite_hashtags",
+    "hashtag_strategy",
+    "sample_count",
+    "confidence_score",
+    "raw_analysis",
+)
+
+# Colunas de TextAnalysisResult agregadas em _aggregate_analyses. Tom e nivel de
+# vocabulario entram como indices em _TONES / _VOCABULARY_LEVELS
+_TONES = tuple(ToneType)
+_TONE_INDEX = {tone: i for i, tone in enumerate(_TONES)}
+_VOCABULARY_LEVELS = ("simple", "medium", "advanced")
+_VOCABULARY_INDEX = {level: i for i, level in enumerate(_VOCABULARY_LEVELS)}
+_METRICS_DTYPE = np.dtype([
+    ("emojis", np.int32),
+    ("words", np.int32),
+    ("sentences", np.int32),
+    ("questions", np.int32),
+    ("cta", np.uint8),
+    ("tone", np.int8),
+    ("vocabulary", np.int8),
+])
+
+
+def _counts_by_first_seen(column: np.ndarray, labels: tuple) -> dict:
+    """Contagem por rotulo com np.bincount, na ordem da primeira ocorrencia.
+
+    A ordem replica a de um dict preenchido amostra a amostra, que decide os
+    empates do max/most_common no perfil.
+    """
+    counts = np.bincount(column, minlength=len(labels))
+    values, first_seen = np.unique(column, return_index=True)
+    return {labels[v]: int(counts[v]) for v in values[np.argsort(first_seen)]}
+
+
+# Tabela plana palavra-chave -> tom para varrer todas as palavras-chave num unico loop
+_KEYWORD_TONES: dict[str, str] = {
+    kw: tone.value for tone, keywords in TONE_KEYWORDS.items() for kw in keywords
+}
+_KEYWORDS = tuple(_KEYWORD_TONES)
+# Texto mais curto que a menor palavra-chave nao pode conter nenhuma
+_MIN_KW_LEN = min(map(len, _KEYWORDS))
+
+
+def _compile_keyword_db():
+    """Banco Hyperscan com todas as palavras-chave de tom (None sem a dependencia)."""
+    if hyperscan is None:
+        return None
+    db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    db.compile(
+        expressions=[kw.encode() for kw in _KEYWORDS],
+        ids=list(range(len(_KEYWORDS))),
+        flags=hyperscan.HS_FLAG_SINGLEMATCH,
+        literal=True,
+    )
+    return db
+
+
+_KEYWORD_DB = _compile_keyword_db()
+_keyword_scratch = threading.local()
+
+
+def _on_keyword_match(kw_id: int, start: int, end: int, flags: int, found: set) -> None:
+    found.add(kw_id)
+
+
+def _matched_keywords(text_lower: str) -> list[str]:
+    """Palavras-chave de tom contidas no texto, na ordem de TONE_KEYWORDS.
+
+    Com hyperscan, uma unica varredura (SIMD) sobre os bytes UTF-8 acha todas;
+    substring em UTF-8 equivale a substring no str, entao o resultado e o mesmo
+    do `in` por palavra-chave usado sem a dependencia.
+    """
+    if _KEYWORD_DB is None:
+        return [kw for kw in _KEYWORDS if kw in text_lower]
+
+    # Scratch do hyperscan nao pode ser compartilhado entre threads
+    scratch = getattr(_keyword_scratch, "scratch", None)
+    if scratch is None:
+        scratch = _keyword_scratch.scratch = hyperscan.Scratch(_KEYWORD_DB)
+
+    found: set[int] = set()
+    _KEYWORD_DB.scan(
+        text_lower.encode(),
+        match_event_handler=_on_keyword_match,
+        context=found,
+        scratch=scratch,
+    )
+    return [_KEYWORDS[kw_id] for kw_id in sorted(found)]
+
 
 @dataclass
 class TextAnalysisResult:
@@ -83,6 +241,83 @@ class TextAnalysisResult:
     emojis: list[str] = field(default_factory=list)
 
 
+def _analyze_impl(text: str) -> TextAnalysisResult:
+    """Nucleo de StyleClonerAgent.analyze_text (funcao pura, serializavel para processos)."""
+    # Contagem basica
+    words = text.split()
+    word_count = len(words)
+
+    # Conta trechos nao vazios sem criar copias com strip()
+    sentence_count = sum(
+        1 for s in _SENT_SPLIT_RE.split(text) if s and not s.isspace()
+    ) or 1
+    avg_sentence_length = word_count / sentence_count if sentence_count > 0 else 0
+
+    # Emojis (pattern simplificado). isascii() e O(1) no CPython e texto
+    # ASCII nao tem emoji: pula a regex no caso comum de caption sem emoji
+    emojis = [] if text.isascii() else _EMOJI_RE.findall(text)
+    emoji_count = len(emojis)
+
+    # Hashtags
+    hashtags = _HASHTAG_RE.findall(text)
+    hashtag_count = len(hashtags)
+
+    # Perguntas
+    question_count = text.count('?')
+
+    # CTA detection (_CTA_RE ja e case-insensitive, dispensa o texto em minusculas)
+    has_cta = bool(_CTA_RE.search(text))
+
+    # Tom de voz: o `in` por substring precisa do texto em minusculas (inclusive
+    # acentos); str.lower() tem caminho rapido para ASCII e bate o str.translate.
+    # A tabela segue a ordem de TONE_KEYWORDS (desempate do max abaixo)
+    text_lower = text.lower()
+    # dict com .get local: defaultdict(int) sai mais caro para poucas chaves
+    tone_scores = {}
+    if len(text_lower) >= _MIN_KW_LEN:
+        keyword_tones, get_score = _KEYWORD_TONES, tone_scores.get
+        for kw in _matched_keywords(text_lower):
+            tone = keyword_tones[kw]
+            tone_scores[tone] = get_score(tone, 0) + 1
+
+    # Determina tom principal
+    if tone_scores:
+        primary_tone_str = max(tone_scores, key=tone_scores.get)
+        primary_tone = ToneType(primary_tone_str)
+    else:
+        primary_tone = ToneType.CASUAL
+
+    # Nivel de vocabulario
+    # map(len) soma os tamanhos em C, sem generator; split() segue mais rapido que \S+
+    avg_word_length = sum(map(len, words)) / word_count if word_count else 0
+    if avg_word_length > 7:
+        vocabulary_level = "advanced"
+    elif avg_word_length < 5:
+        vocabulary_level = "simple"
+    else:
+        vocabulary_level = "medium"
+
+    return TextAnalysisResult(
+        tone=primary_tone,
+        tone_scores=tone_scores,
+        word_count=word_count,
+        sentence_count=sentence_count,
+        avg_sentence_length=avg_sentence_length,
+        emoji_count=emoji_count,
+        hashtag_count=hashtag_count,
+        question_count=question_count,
+        has_cta=has_cta,
+        vocabulary_level=vocabulary_level,
+        hashtags=[h.lower() for h in hashtags],
+        emojis=emojis,
+    )
+
+
+# Memoizado pelo texto completo: reposts e blocos promocionais repetidos em
+# scrapes grandes caem no cache
+_analyze_text = lru_cache(maxsize=4096)(_analyze_impl)
+
+
 @dataclass
 class StyleClonerResult:
     """Resultado do Style Cloner."""
@@ -101,7 +336,23 @@ class StyleClonerAgent:
 
     def __init__(self):
         """Inicializa o agent."""
-        self.run_id = str(uuid4())
+        self._run_id: Optional[str] = None
+
+    @property
+    def run_id(self) -> str:
+        """ID da execucao, gerado no primeiro learn_* (apply_style nao precisa)."""
+        if self._run_id is None:
+            self._run_id = str(uuid4())
+        return self._run_id
+
+    @contextmanager
+    def _session(self, db: Optional[Session] = None) -> Iterator[Session]:
+        """Reaproveita a sessao do chamador ou abre uma propria para o bloco."""
+        if db is not None:
+            yield db
+            return
+        with sync_db_session() as own_db:
+            yield own_db
 
     def analyze_text(self, text: str) -> TextAnalysisResult:
         """Analisa um texto para extrair caracteristicas de estilo.
@@ -115,78 +366,13 @@ class StyleClonerAgent:
         if not text:
             return TextAnalysisResult(tone=ToneType.CASUAL)
 
-        text_lower = text.lower()
-
-        # Contagem basica
-        words = text.split()
-        word_count = len(words)
-
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        sentence_count = len(sentences) if sentences else 1
-        avg_sentence_length = word_count / sentence_count if sentence_count > 0 else 0
-
-        # Emojis (pattern simplificado)
-        emoji_pattern = re.compile(
-            "["
-            "\U0001F600-\U0001F64F"
-            "\U0001F300-\U0001F5FF"
-            "\U0001F680-\U0001F6FF"
-            "\U0001F1E0-\U0001F1FF"
-            "\U00002702-\U000027B0"
-            "\U000024C2-\U0001F251"
-            "]+",
-            flags=re.UNICODE
-        )
-        emojis = emoji_pattern.findall(text)
-        emoji_count = len(emojis)
-
-        # Hashtags
-        hashtags = re.findall(r'#\w+', text)
-        hashtag_count = len(hashtags)
-
-        # Perguntas
-        question_count = text.count('?')
-
-        # CTA detection
-        has_cta = any(re.search(pattern, text_lower) for pattern in CTA_PATTERNS)
-
-        # Tom de voz
-        tone_scores = {}
-        for tone, keywords in TONE_KEYWORDS.items():
-            score = sum(1 for kw in keywords if kw in text_lower)
-            if score > 0:
-                tone_scores[tone.value] = score
-
-        # Determina tom principal
-        if tone_scores:
-            primary_tone_str = max(tone_scores, key=tone_scores.get)
-            primary_tone = ToneType(primary_tone_str)
-        else:
-            primary_tone = ToneType.CASUAL
-
-        # Nivel de vocabulario
-        avg_word_length = sum(len(w) for w in words) / len(words) if words else 0
-        if avg_word_length > 7:
-            vocabulary_level = "advanced"
-        elif avg_word_length < 5:
-            vocabulary_level = "simple"
-        else:
-            vocabulary_level = "medium"
-
-        return TextAnalysisResult(
-            tone=primary_tone,
-            tone_scores=tone_scores,
-            word_count=word_count,
-            sentence_count=sentence_count,
-            avg_sentence_length=avg_sentence_length,
-            emoji_count=emoji_count,
-            hashtag_count=hashtag_count,
-            question_count=question_count,
-            has_cta=has_cta,
-            vocabulary_level=vocabulary_level,
-            hashtags=[h.lower() for h in hashtags],
-            emojis=emojis,
+        # Copia os containers: o resultado em cache e compartilhado entre chamadas
+        cached = _analyze_text(text)
+        return replace(
+            cached,
+            tone_scores=dict(cached.tone_scores),
+            hashtags=list(cached.hashtags),
+            emojis=list(cached.emojis),
         )
 
     def learn_from_username(
@@ -205,7 +391,7 @@ class StyleClonerAgent:
         Returns:
             StyleClonerResult
         """
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         analyses = []
 
         try:
@@ -244,7 +430,7 @@ class StyleClonerAgent:
             confidence_score=profile.get("confidence_score", 0),
             primary_tone=ToneType(profile.get("primary_tone", "casual")),
             summary=profile,
-            duration_seconds=(datetime.now() - start_time).total_seconds(),
+            duration_seconds=time.perf_counter() - start_time,
         )
 
     def learn_from_captions(
@@ -261,16 +447,14 @@ class StyleClonerAgent:
         Returns:
             StyleClonerResult
         """
-        start_time = datetime.now()
+        start_time = time.perf_counter()
 
-        analyses = []
-        for caption in captions:
-            if caption and len(caption) > 10:
-                result = self.analyze_text(caption)
-                analyses.append({
-                    "text": caption[:500],
-                    "analysis": result,
-                })
+        candidates = [caption for caption in captions if caption and len(caption) > 10]
+        results = self._analyze_many(candidates)
+
+        analyses = [
+            {"text": caption[:500], "analysis": results[caption]} for caption in candidates
+        ]
 
         if not analyses:
             return StyleClonerResult(
@@ -294,9 +478,25 @@ class StyleClonerAgent:
             confidence_score=profile.get("confidence_score", 0),
             primary_tone=ToneType(profile.get("primary_tone", "casual")),
             summary=profile,
-            duration_seconds=(datetime.now() - start_time).total_seconds(),
+            duration_seconds=time.perf_counter() - start_time,
         )
 
+    def _analyze_many(self, texts: list[str]) -> dict[str, TextAnalysisResult]:
+        """Analisa varios textos, em paralelo (processos) quando o lote e grande.
+
+        Abaixo de _PARALLEL_MIN_TEXTS textos unicos a analise serial custa menos
+        que subir o pool. Processos daemon (workers prefork do Celery) nao podem
+        criar filhos, entao tambem ficam no caminho serial.
+        """
+        unique = list(dict.fromkeys(texts))
+        cpus = os.cpu_count() or 1
+
+        if len(unique) < _PARALLEL_MIN_TEXTS or cpus < 2 or current_process().daemon:
+            return {text: self.analyze_text(text) for text in unique}
+
+        with ProcessPoolExecutor(max_workers=cpus) as pool:
+            return dict(zip(unique, pool.map(_analyze_impl, unique, chunksize=64)))
+
     def _learn_from_instagram(self, username: str, max_posts: int) -> list[dict]:
         """Aprende de um perfil do Instagram."""
         analyses = []
@@ -393,32 +593,37 @@ class StyleClonerAgent:
         if not analyses:
             return {"name": name, "confidence_score": 0}
 
-        # Contadores
-        tone_counts = {}
-        total_emojis = 0
-        total_words = 0
-        total_sentences = 0
-        total_questions = 0
-        total_cta = 0
-        all_hashtags = []
-        vocabulary_levels = []
-
-        for item in analyses:
-            analysis = item.get("analysis")
-            if not analysis:
-                continue
-
-            # Tons
-            tone_counts[analysis.tone.value] = tone_counts.get(analysis.tone.value, 0) + 1
-
-            # Metricas
-            total_emojis += analysis.emoji_count
-            total_words += analysis.word_count
-            total_sentences += analysis.sentence_count
-            total_questions += analysis.question_count
-            total_cta += 1 if analysis.has_cta else 0
-            vocabulary_levels.append(analysis.vocabulary_level)
-            all_hashtags.extend(analysis.hashtags)
+        results = [item["analysis"] for item in analyses if item.get("analysis")]
+
+        hashtag_counter = Counter()
+        for analysis in results:
+            hashtag_counter.update(analysis.hashtags)
+
+        # Metricas (uma coluna por campo, reduzidas de forma vetorizada)
+        metrics = np.fromiter(
+            (
+                (
+                    a.emoji_count,
+                    a.word_count,
+                    a.sentence_count,
+                    a.question_count,
+                    a.has_cta,
+                    _TONE_INDEX[a.tone],
+                    _VOCABULARY_INDEX[a.vocabulary_level],
+                )
+                for a in results
+            ),
+            dtype=_METRICS_DTYPE,
+            count=len(results),
+        )
+        tone_counts = _counts_by_first_seen(
+            metrics["tone"], tuple(tone.value for tone in _TONES)
+        )
+        total_emojis = int(metrics["emojis"].sum())
+        total_words = int(metrics["words"].sum())
+        total_sentences = int(metrics["sentences"].sum())
+        total_questions = int(metrics["questions"].sum())
+        total_cta = int(metrics["cta"].sum())
 
         n = len(analyses)
 
@@ -433,49 +638,28 @@ class StyleClonerAgent:
 
         # Frequencia de emoji
         avg_emoji = total_emojis / n
-        if avg_emoji < 0.5:
-            emoji_frequency = "sparse"
-        elif avg_emoji < 2:
-            emoji_frequency = "moderate"
-        else:
-            emoji_frequency = "heavy"
+        emoji_frequency = _EMOJI_FREQUENCIES[(avg_emoji >= 0.5) + (avg_emoji >= 2)]
 
         # Tamanho de sentença
         avg_sentence_len = total_words / total_sentences if total_sentences else 0
-        if avg_sentence_len < 10:
-            sentence_length = "short"
-        elif avg_sentence_len > 20:
-            sentence_length = "long"
-        else:
-            sentence_length = "medium"
+        sentence_length = _SENTENCE_LENGTHS[(avg_sentence_len >= 10) + (avg_sentence_len > 20)]
 
         # Vocabulario (moda)
-        from collections import Counter
-        vocab_counter = Counter(vocabulary_levels)
-        vocabulary_level = vocab_counter.most_common(1)[0][0] if vocab_counter else "medium"
+        vocab_counts = _counts_by_first_seen(metrics["vocabulary"], _VOCABULARY_LEVELS)
+        vocabulary_level = max(vocab_counts, key=vocab_counts.get) if vocab_counts else "medium"
 
         # Hashtags mais usadas
-        hashtag_counter = Counter(all_hashtags)
         favorite_hashtags = [h for h, _ in hashtag_counter.most_common(20)]
 
         # Conta hashtags
-        avg_hashtags = len(all_hashtags) / n if n else 0
+        avg_hashtags = hashtag_counter.total() / n if n else 0
         hashtag_strategy = {
             "avg_count": round(avg_hashtags, 1),
-            "total_unique": len(set(all_hashtags)),
+            "total_unique": len(hashtag_counter),
         }
 
         # Confianca baseada no numero de amostras
-        if n >= 50:
-            confidence = 0.95
-        elif n >= 30:
-            confidence = 0.85
-        elif n >= 15:
-            confidence = 0.7
-        elif n >= 5:
-            confidence = 0.5
-        else:
-            confidence = 0.3
+        confidence = _CONFIDENCE_LEVELS[bisect_right(_CONFIDENCE_THRESHOLDS, n)]
 
         return {
             "name": name,
@@ -500,60 +684,37 @@ class StyleClonerAgent:
             },
         }
 
-    def _save_profile(self, profile_data: dict) -> Optional[int]:
-        """Salva o perfil de estilo no banco."""
-        db = get_sync_db()
-        try:
-            # Verifica se ja existe
-            existing = db.execute(
-                select(StyleProfile).where(StyleProfile.name == profile_data["name"])
-            ).scalar_one_or_none()
-
-            if existing:
-                # Atualiza
-                for key, value in profile_data.items():
-                    if hasattr(existing, key) and key != "id":
-                        setattr(existing, key, value)
-                existing.last_analysis_at = datetime.now()
-                db.commit()
-                return existing.id
-            else:
-                # Cria novo
-                new_profile = StyleProfile(
-                    name=profile_data.get("name"),
-                    primary_tone=profile_data.get("primary_tone", "casual"),
-                    secondary_tones=profile_data.get("secondary_tones", []),
-                    vocabulary_level=profile_data.get("vocabulary_level", "medium"),
-                    use_emoji=profile_data.get("use_emoji", True),
-                    emoji_frequency=profile_data.get("emoji_frequency", "moderate"),
-                    sentence_length=profile_data.get("sentence_length", "medium"),
-                    uses_questions=profile_data.get("uses_questions", True),
-                    uses_cta=profile_data.get("uses_cta", True),
-                    favorite_hashtags=profile_data.get("favorite_hashtags", []),
-                    hashtag_strategy=profile_data.get("hashtag_strategy", {}),
-                    sample_count=profile_data.get("sample_count", 0),
-                    confidence_score=Decimal(str(profile_data.get("confidence_score", 0))),
-                    raw_analysis=profile_data.get("raw_analysis", {}),
-                    last_analysis_at=datetime.now(),
-                    is_active=True,
-                )
-                db.add(new_profile)
+    def _save_profile(self, profile_data: dict, db: Optional[Session] = None) -> Optional[int]:
+        """Salva o perfil de estilo no banco (upsert pelo nome, um unico round-trip)."""
+        values = {col: profile_data[col] for col in _PROFILE_COLUMNS if col in profile_data}
+        values["last_analysis_at"] = datetime.now()
+
+        stmt = pg_insert(StyleProfile).values(**values, is_active=True)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_style_profiles_name",
+            set_={
+                **{col: stmt.excluded[col] for col in values if col != "name"},
+                "updated_at": func.now(),
+            },
+        ).returning(StyleProfile.id)
+
+        with self._session(db) as db:
+            try:
+                profile_id = db.execute(stmt).scalar_one()
                 db.commit()
-                db.refresh(new_profile)
-                return new_profile.id
+                return profile_id
 
-        except Exception as e:
-            db.rollback()
-            print(f"[StyleCloner] Erro ao salvar: {e}")
-            return None
-        finally:
-            db.close()
+            except Exception as e:
+                db.rollback()
+                print(f"[StyleCloner] Erro ao salvar: {e}")
+                return None
 
     def apply_style(
         self,
         content: str,
         profile_id: Optional[int] = None,
         profile_name: Optional[str] = None,
+        db: Optional[Session] = None,
     ) -> dict:
         """Aplica um estilo aprendido a um conteudo.
 
@@ -561,123 +722,125 @@ class StyleClonerAgent:
             content: Conteudo base para estilizar
             profile_id: ID do perfil ou
             profile_name: Nome do perfil
+            db: Sessao ja aberta pelo chamador (opcional)
 
         Returns:
             Dict com conteudo estilizado e sugestoes
         """
-        db = get_sync_db()
-        try:
-            # Busca perfil
-            if profile_id:
-                profile = db.execute(
-                    select(StyleProfile).where(StyleProfile.id == profile_id)
-                ).scalar_one_or_none()
-            elif profile_name:
-                profile = db.execute(
-                    select(StyleProfile).where(StyleProfile.name == profile_name)
-                ).scalar_one_or_none()
-            else:
-                # Busca perfil default
-                profile = db.execute(
-                    select(StyleProfile).where(StyleProfile.is_default == True)
-                ).scalar_one_or_none()
-
-            if not profile:
+        with self._session(db) as db:
+            try:
+                # Busca perfil
+                if profile_id:
+                    profile = db.execute(
+                        select(StyleProfile).where(StyleProfile.id == profile_id)
+                    ).scalar_one_or_none()
+                elif profile_name:
+                    profile = db.execute(
+                        select(StyleProfile).where(StyleProfile.name == profile_name)
+                    ).scalar_one_or_none()
+                else:
+                    # Busca perfil default
+                    profile = db.execute(
+                        select(StyleProfile).where(StyleProfile.is_default == True)
+                    ).scalar_one_or_none()
+
+                if not profile:
+                    return {
+                        "styled_content": content,
+                        "suggestions": [],
+                        "error": "Perfil nao encontrado",
+                    }
+
+                # Gera sugestoes baseadas no perfil
+                suggestions = []
+
+                # Emojis
+                if profile.use_emoji and profile.emoji_frequency != "none":
+                    suggestions.append(
+                        _EMOJI_SUGGESTIONS.get(profile.emoji_frequency, "Adicione emojis")
+                    )
+
+                # Tom
+                tone_tip = _TONE_TIPS.get(profile.primary_tone)
+                if tone_tip:
+                    suggestions.append(tone_tip)
+
+                # CTA
+                if profile.uses_cta:
+                    suggestions.append("Adicione call-to-action (curta, comente, salve)")
+
+                # Perguntas
+                if profile.uses_questions:
+                    suggestions.append("Inclua uma pergunta para gerar engajamento")
+
+                # Hashtags
+                if profile.favorite_hashtags:
+                    top_hashtags = profile.favorite_hashtags[:5]
+                    suggestions.append(f"Use hashtags: {', '.join(top_hashtags)}")
+
                 return {
                     "styled_content": content,
-                    "suggestions": [],
-                    "error": "Perfil nao encontrado",
+                    "profile_name": profile.name,
+                    "profile_tone": profile.primary_tone,
+                    "suggestions": suggestions,
+                    "recommended_hashtags": (
+                        profile.favorite_hashtags[:10] if profile.favorite_hashtags else []
+                    ),
+                    "emoji_frequency": profile.emoji_frequency,
+                    "sentence_length": profile.sentence_length,
                 }
 
-            # Gera sugestoes baseadas no perfil
-            suggestions = []
-
-            # Emojis
-            if profile.use_emoji and profile.emoji_frequency != "none":
-                emoji_suggestion = "Adicione emojis"
-                if profile.emoji_frequency == "heavy":
-                    emoji_suggestion += " (bastante, 3-5 por caption)"
-                elif profile.emoji_frequency == "moderate":
-                    emoji_suggestion += " (moderado, 1-2 por caption)"
-                suggestions.append(emoji_suggestion)
-
-            # Tom
-            tone_tips = {
-                "formal": "Use linguagem profissional e termos tecnicos",
-                "casual": "Escreva como se estivesse conversando com um amigo",
-                "humorous": "Adicione humor e referencias a memes",
-                "inspirational": "Use frases motivacionais e palavras de encorajamento",
-                "educational": "Estruture como dicas ou passo-a-passo",
-                "provocative": "Use perguntas provocativas e afirmacoes fortes",
-                "storytelling": "Conte uma historia, use narrativa",
-            }
-            if profile.primary_tone in tone_tips:
-                suggestions.append(tone_tips[profile.primary_tone])
-
-            # CTA
-            if profile.uses_cta:
-                suggestions.append("Adicione call-to-action (curta, comente, salve)")
-
-            # Perguntas
-            if profile.uses_questions:
-                suggestions.append("Inclua uma pergunta para gerar engajamento")
-
-            # Hashtags
-            if profile.favorite_hashtags:
-                top_hashtags = profile.favorite_hashtags[:5]
-                suggestions.append(f"Use hashtags: {', '.join(top_hashtags)}")
-
-            return {
-                "styled_content": content,
-                "profile_name": profile.name,
-                "profile_tone": profile.primary_tone,
-                "suggestions": suggestions,
-                "recommended_hashtags": profile.favorite_hashtags[:10] if profile.favorite_hashtags else [],
-                "emoji_frequency": profile.emoji_frequency,
-                "sentence_length": profile.sentence_length,
-            }
+            except Exception as e:
+                print(f"[StyleCloner] Erro: {e}")
+                return {
+                    "styled_content": content,
+                    "suggestions": [],
+                    "error": str(e),
+                }
 
-        except Exception as e:
-            print(f"[StyleCloner] Erro: {e}")
-            return {
-                "styled_content": content,
-                "suggestions": [],
-                "error": str(e),
-            }
-        finally:
-            db.close()
-
-    def get_all_profiles(self, active_only: bool = True) -> list[dict]:
+    def get_all_profiles(
+        self,
+        active_only: bool = True,
+        db: Optional[Session] = None,
+    ) -> list[dict]:
         """Retorna todos os perfis de estilo.
 
         Args:
             active_only: Apenas perfis ativos
+            db: Sessao ja aberta pelo chamador (opcional)
 
         Returns:
             Lista de perfis
         """
-        db = get_sync_db()
-        try:
-            query = select(StyleProfile)
+        with self._session(db) as db:
+            # Projecao so das colunas listadas: linhas Core, sem hidratar o ORM
+            query = select(
+                StyleProfile.id,
+                StyleProfile.name,
+                StyleProfile.primary_tone,
+                StyleProfile.confidence_score,
+                StyleProfile.sample_count,
+                StyleProfile.is_default,
+                StyleProfile.created_at,
+            )
             if active_only:
                 query = query.where(StyleProfile.is_active == True)
             query = query.order_by(StyleProfile.created_at.desc())
 
-            profiles = db.execute(query).scalars().all()
             return [
                 {
-                    "id": p.id,
-                    "name": p.name,
-                    "primary_tone": p.primary_tone,
-                    "confidence_score": float(p.confidence_score) if p.confidence_score else 0,
-                    "sample_count": p.sample_count,
-                    "is_default": p.is_default,
-                    "created_at": p.created_at.isoformat() if p.created_at else None,
+                    "id": row.id,
+                    "name": row.name,
+                    "primary_tone": row.primary_tone,
+                    "confidence_score": (
+                        float(row.confidence_score) if row.confidence_score else 0
+                    ),
+                    "sample_count": row.sample_count,
+                    "is_default": row.is_default,
+                    "created_at": row.created_at.isoformat() if row.created_at else None,
                 }
-                for p in profiles
+                for row in db.execute(query)
             ]
-        finally:
-            db.close()
 
 
 # Factory function
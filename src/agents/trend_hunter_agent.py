@@ -1,20 +1,31 @@
 """Trend Hunter Agent - Detecta tendencias em tempo real."""
 
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
-from decimal import Decimal
+from heapq import nlargest
 from typing import Optional
 from uuid import uuid4
 
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import Session
 
 from config.settings import get_settings
+from src.core.cache import to_decimal
 from src.core.database import get_sync_db
 from src.db.models.trends import Trend, TrendStatus, TrendType, Platform
 
 settings = get_settings()
 
+# Hashtags-semente raspadas (em paralelo) em cada plataforma
+INSTAGRAM_SEED_HASHTAGS = ("viral", "reels", "trending", "fyp")
+TIKTOK_SEED_HASHTAGS = ("fyp", "viral", "trending")
+
+# Hashtags genericas ignoradas na contagem (comparadas em minusculas)
+TIKTOK_IGNORED_HASHTAGS = frozenset({"fyp", "viral", "trending", "foryou", "foryoupage"})
+YOUTUBE_IGNORED_HASHTAGS = frozenset({"shorts", "short", "viral"})
+
 
 @dataclass
 class DetectedTrend:
@@ -67,23 +78,29 @@ class TrendHunterAgent:
         start_time = datetime.now()
         platforms = platforms or [Platform.INSTAGRAM, Platform.TIKTOK, Platform.YOUTUBE]
 
+        hunters = {
+            Platform.INSTAGRAM: self._hunt_instagram,
+            Platform.TIKTOK: self._hunt_tiktok,
+            Platform.YOUTUBE: self._hunt_youtube,
+        }
         all_trends = []
 
-        for platform in platforms:
-            print(f"[TrendHunter] Buscando tendencias em {platform.value}...")
-            try:
-                if platform == Platform.INSTAGRAM:
-                    trends = self._hunt_instagram(limit_per_platform)
-                elif platform == Platform.TIKTOK:
-                    trends = self._hunt_tiktok(limit_per_platform)
-                elif platform == Platform.YOUTUBE:
-                    trends = self._hunt_youtube(limit_per_platform)
-                else:
-                    trends = []
-
-                all_trends.extend(trends)
-            except Exception as e:
-                print(f"[TrendHunter] Erro em {platform.value}: {e}")
+        # Scrapers sao chamadas de rede bloqueantes e independentes: as plataformas
+        # rodam em paralelo e os resultados sao juntados na ordem pedida
+        with ThreadPoolExecutor(max_workers=len(platforms)) as pool:
+            futures = []
+            for platform in platforms:
+                print(f"[TrendHunter] Buscando tendencias em {platform.value}...")
+                hunt = hunters.get(platform)
+                futures.append(pool.submit(hunt, limit_per_platform) if hunt else None)
+
+            for platform, future in zip(platforms, futures):
+                if future is None:
+                    continue
+                try:
+                    all_trends.extend(future.result())
+                except Exception as e:
+                    print(f"[TrendHunter] Erro em {platform.value}: {e}")
 
         # Salva no banco
         saved = self._save_trends(all_trends)
@@ -115,13 +132,19 @@ class TrendHunterAgent:
             from src.tools.instagram_scraper import instagram_scraper
 
             # 1. Busca hashtags populares
-            for hashtag in ["viral", "reels", "trending", "fyp"]:
+            with ThreadPoolExecutor(max_workers=len(INSTAGRAM_SEED_HASHTAGS)) as pool:
+                futures = [
+                    pool.submit(instagram_scraper.scrape_hashtag, hashtag, max_posts=50)
+                    for hashtag in INSTAGRAM_SEED_HASHTAGS
+                ]
+
+            for hashtag, future in zip(INSTAGRAM_SEED_HASHTAGS, futures):
                 try:
-                    result = instagram_scraper.scrape_hashtag(hashtag, max_posts=50)
+                    result = future.result()
 
                     # Analisa videos para extrair padroes
                     audios = {}
-                    hashtags_count = {}
+                    hashtags_count = Counter()
 
                     for video in result.videos[:30]:
                         # Conta audios
@@ -140,11 +163,10 @@ class TrendHunterAgent:
                                 audios[audio_id]["total_views"] += video.get("views_count", 0)
 
                         # Conta hashtags
-                        for tag in video.get("hashtags", []):
-                            hashtags_count[tag] = hashtags_count.get(tag, 0) + 1
+                        hashtags_count.update(video.get("hashtags", []))
 
                     # Cria trends de audios populares
-                    for audio_id, data in sorted(audios.items(), key=lambda x: x[1]["count"], reverse=True)[:5]:
+                    for audio_id, data in nlargest(5, audios.items(), key=lambda x: x[1]["count"]):
                         if data["count"] >= 3:  # Minimo 3 videos usando
                             trends.append(DetectedTrend(
                                 name=data["name"],
@@ -157,8 +179,8 @@ class TrendHunterAgent:
                             ))
 
                     # Cria trends de hashtags
-                    for tag, count in sorted(hashtags_count.items(), key=lambda x: x[1], reverse=True)[:5]:
-                        if count >= 5 and tag not in ["viral", "reels", "trending", "fyp"]:
+                    for tag, count in hashtags_count.most_common(5):
+                        if count >= 5 and tag not in INSTAGRAM_SEED_HASHTAGS:
                             trends.append(DetectedTrend(
                                 name=f"#{tag}",
                                 trend_type=TrendType.HASHTAG,
@@ -183,8 +205,16 @@ class TrendHunterAgent:
         try:
             from src.tools.tiktok_scraper import tiktok_scraper
 
-            # 1. Busca sons trending
-            sounds = tiktok_scraper.scrape_trending_sounds(limit=30)
+            # Sons e hashtags trending sao raspados em paralelo
+            with ThreadPoolExecutor(max_workers=len(TIKTOK_SEED_HASHTAGS) + 1) as pool:
+                sounds_future = pool.submit(tiktok_scraper.scrape_trending_sounds, limit=30)
+                futures = [
+                    pool.submit(tiktok_scraper.scrape_hashtag, hashtag, max_videos=30)
+                    for hashtag in TIKTOK_SEED_HASHTAGS
+                ]
+
+            # 1. Sons trending
+            sounds = sounds_future.result()
             for sound in sounds[:10]:
                 trends.append(DetectedTrend(
                     name=sound.title or "Unknown Sound",
@@ -197,18 +227,19 @@ class TrendHunterAgent:
                     description=f"Por {sound.author}" if sound.author else None,
                 ))
 
-            # 2. Busca hashtags trending
-            for hashtag in ["fyp", "viral", "trending"]:
+            # 2. Hashtags trending
+            for hashtag, future in zip(TIKTOK_SEED_HASHTAGS, futures):
                 try:
-                    result = tiktok_scraper.scrape_hashtag(hashtag, max_videos=30)
+                    result = future.result()
 
-                    hashtags_count = {}
+                    hashtags_count = Counter()
                     for video in result.videos:
-                        for tag in video.hashtags:
-                            if tag.lower() not in ["fyp", "viral", "trending", "foryou", "foryoupage"]:
-                                hashtags_count[tag] = hashtags_count.get(tag, 0) + 1
+                        hashtags_count.update(
+                            tag for tag in video.hashtags
+                            if tag.lower() not in TIKTOK_IGNORED_HASHTAGS
+                        )
 
-                    for tag, count in sorted(hashtags_count.items(), key=lambda x: x[1], reverse=True)[:5]:
+                    for tag, count in hashtags_count.most_common(5):
                         if count >= 3:
                             trends.append(DetectedTrend(
                                 name=f"#{tag}",
@@ -238,19 +269,19 @@ class TrendHunterAgent:
             shorts = youtube_scraper.scrape_trending_shorts(limit=30)
 
             # Analisa padroes
-            hashtags_count = {}
-            categories = {}
+            hashtags_count = Counter()
+            categories = Counter()
 
             for short in shorts:
-                for tag in short.hashtags:
-                    if tag.lower() not in ["shorts", "short", "viral"]:
-                        hashtags_count[tag] = hashtags_count.get(tag, 0) + 1
+                hashtags_count.update(
+                    tag for tag in short.hashtags if tag.lower() not in YOUTUBE_IGNORED_HASHTAGS
+                )
 
                 if short.category_name:
-                    categories[short.category_name] = categories.get(short.category_name, 0) + 1
+                    categories[short.category_name] += 1
 
             # Trends de hashtags
-            for tag, count in sorted(hashtags_count.items(), key=lambda x: x[1], reverse=True)[:5]:
+            for tag, count in hashtags_count.most_common(5):
                 if count >= 2:
                     trends.append(DetectedTrend(
                         name=f"#{tag}",
@@ -262,7 +293,7 @@ class TrendHunterAgent:
                     ))
 
             # Trends de categorias/topicos
-            for category, count in sorted(categories.items(), key=lambda x: x[1], reverse=True)[:3]:
+            for category, count in categories.most_common(3):
                 trends.append(DetectedTrend(
                     name=category,
                     trend_type=TrendType.TOPIC,
@@ -278,70 +309,104 @@ class TrendHunterAgent:
         return trends[:limit]
 
     def _save_trends(self, trends: list[DetectedTrend]) -> int:
-        """Salva tendencias no banco."""
+        """Salva tendencias no banco.
+
+        Busca as ja existentes numa unica query por (name, platform, trend_type)
+        e grava atualizacoes e novas em lote. Repeticoes da mesma chave no lote
+        atualizam a linha que a primeira ocorrencia criou e contam uma so vez.
+
+        Mudanca de comportamento: a versao anterior (sessao com autoflush=False)
+        nao via a linha ainda nao gravada e inseria um Trend duplicado por
+        repeticao.
+        """
+        if not trends:
+            return 0
+
         db = get_sync_db()
         saved = 0
+        # Mesmo instante para todas as linhas do lote
+        now = datetime.now()
+        now_iso = now.isoformat()
 
         try:
+            keys = {(t.name, t.platform, t.trend_type) for t in trends}
+            rows = db.execute(
+                select(
+                    Trend.id,
+                    Trend.name,
+                    Trend.platform,
+                    Trend.trend_type,
+                    Trend.status,
+                    Trend.score_history,
+                ).where(tuple_(Trend.name, Trend.platform, Trend.trend_type).in_(keys))
+            )
+
+            # Chave -> mapping para bulk_update_mappings (com id) ou bulk_insert_mappings
+            mappings: dict[tuple, dict] = {}
+            for row in rows:
+                mappings.setdefault((row.name, row.platform, row.trend_type), {
+                    "id": row.id,
+                    "status": row.status,
+                    "score_history": row.score_history,
+                })
+
             for trend in trends:
-                # Verifica se ja existe
-                existing = db.execute(
-                    select(Trend).where(
-                        Trend.name == trend.name,
-                        Trend.platform == trend.platform,
-                        Trend.trend_type == trend.trend_type,
-                    )
-                ).scalar_one_or_none()
-
-                if existing:
+                key = (trend.name, trend.platform, trend.trend_type)
+                mapping = mappings.get(key)
+
+                if mapping is not None:
                     # Atualiza score e historico
-                    existing.current_score = Decimal(str(trend.score))
-                    existing.velocity = Decimal(str(trend.velocity))
-                    existing.volume = trend.volume
-                    existing.last_updated_at = datetime.now()
+                    mapping["current_score"] = to_decimal(trend.score)
+                    mapping["velocity"] = to_decimal(trend.velocity)
+                    mapping["volume"] = trend.volume
+                    if "id" in mapping:
+                        mapping["last_updated_at"] = now
 
                     # Adiciona ao historico
-                    history = existing.score_history or []
+                    history = mapping["score_history"] or []
                     history.append({
-                        "date": datetime.now().isoformat(),
+                        "date": now_iso,
                         "score": trend.score,
                         "volume": trend.volume,
                     })
-                    existing.score_history = history[-30:]  # Mantem ultimos 30
+                    mapping["score_history"] = history[-30:]  # Mantem ultimos 30
 
                     # Atualiza status baseado na velocidade
                     if trend.velocity > 0.3:
-                        existing.status = TrendStatus.RISING
+                        mapping["status"] = TrendStatus.RISING
                     elif trend.velocity > 0.1:
-                        existing.status = TrendStatus.PEAK
+                        mapping["status"] = TrendStatus.PEAK
                     elif trend.velocity < 0:
-                        existing.status = TrendStatus.DECLINING
+                        mapping["status"] = TrendStatus.DECLINING
 
                 else:
                     # Cria novo
-                    new_trend = Trend(
-                        name=trend.name,
-                        trend_type=trend.trend_type,
-                        platform=trend.platform,
-                        description=trend.description,
-                        external_id=trend.external_id,
-                        external_url=trend.external_url,
-                        current_score=Decimal(str(trend.score)),
-                        velocity=Decimal(str(trend.velocity)),
-                        volume=trend.volume,
-                        status=TrendStatus.EMERGING,
-                        is_actionable=trend.score > 50,
-                        related_hashtags=trend.related_hashtags,
-                        example_videos=trend.example_videos,
-                        score_history=[{
-                            "date": datetime.now().isoformat(),
+                    mappings[key] = {
+                        "name": trend.name,
+                        "trend_type": trend.trend_type,
+                        "platform": trend.platform,
+                        "description": trend.description,
+                        "external_id": trend.external_id,
+                        "external_url": trend.external_url,
+                        "current_score": to_decimal(trend.score),
+                        "velocity": to_decimal(trend.velocity),
+                        "volume": trend.volume,
+                        "status": TrendStatus.EMERGING,
+                        "is_actionable": trend.score > 50,
+                        "related_hashtags": trend.related_hashtags,
+                        "example_videos": trend.example_videos,
+                        "score_history": [{
+                            "date": now_iso,
                             "score": trend.score,
                             "volume": trend.volume,
                         }],
-                    )
-                    db.add(new_trend)
+                    }
                     saved += 1
 
+            updates = [m for m in mappings.values() if "id" in m]
+            inserts = [m for m in mappings.values() if "id" not in m]
+            db.bulk_update_mappings(Trend, updates)
+            db.bulk_insert_mappings(Trend, inserts)
             db.commit()
         except Exception as e:
             db.rollback()
@@ -1,6 +1,8 @@
 """Watcher Agent - Responsavel por scraping e pre-filtro de videos virais."""
 
 import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
@@ -11,12 +13,17 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from config.settings import get_settings
+from src.core.cache import to_decimal
 from src.core.database import get_sync_db
 from src.db.models import MonitoredProfile, RunMetrics, RunStatus, ViralVideo
 from src.tools import budget_tools, scraping_tools
 
 settings = get_settings()
 
+# Perfis rodados entre duas leituras do budget no banco em run_all_active_profiles;
+# entre elas o restante e abatido localmente com o custo de cada run
+BUDGET_REFRESH_EVERY = 10
+
 
 @dataclass
 class WatcherResult:
@@ -96,67 +103,73 @@ class WatcherAgent:
             )
 
             # Processa videos coletados
-            videos_saved = 0
             videos_prefiltered = 0
 
+            # Uma unica consulta para os videos ja salvos; o set tambem descarta
+            # platform_id repetido dentro do proprio lote
+            seen_ids = set(db.scalars(
+                select(ViralVideo.platform_id).where(
+                    ViralVideo.platform_id.in_([v.platform_id for v in result.videos])
+                )
+            ))
+            rows = []
+            now = datetime.now()
+
             for scraped_video in result.videos:
                 try:
-                    # Verifica se video ja existe
-                    existing = db.execute(
-                        select(ViralVideo).where(
-                            ViralVideo.platform_id == scraped_video.platform_id
-                        )
-                    ).scalar_one_or_none()
-
-                    if existing:
+                    if scraped_video.platform_id in seen_ids:
                         continue
 
-                    # Cria novo video
-                    video = ViralVideo(
-                        profile_id=profile.id,
-                        platform_id=scraped_video.platform_id,
-                        shortcode=scraped_video.shortcode,
-                        source_url=scraped_video.source_url,
-                        views_count=scraped_video.views_count,
-                        likes_count=scraped_video.likes_count,
-                        comments_count=scraped_video.comments_count,
-                        shares_count=scraped_video.shares_count,
-                        caption=scraped_video.caption,
-                        hashtags=scraped_video.hashtags,
-                        mentions=scraped_video.mentions,
-                        duration_seconds=scraped_video.duration_seconds,
-                        posted_at=scraped_video.posted_at,
-                    )
+                    # Novo video (mapping para bulk_insert_mappings)
+                    video = {
+                        "profile_id": profile.id,
+                        "platform_id": scraped_video.platform_id,
+                        "shortcode": scraped_video.shortcode,
+                        "source_url": scraped_video.source_url,
+                        "views_count": scraped_video.views_count,
+                        "likes_count": scraped_video.likes_count,
+                        "comments_count": scraped_video.comments_count,
+                        "shares_count": scraped_video.shares_count,
+                        "caption": scraped_video.caption,
+                        "hashtags": scraped_video.hashtags,
+                        "mentions": scraped_video.mentions,
+                        "duration_seconds": scraped_video.duration_seconds,
+                        "posted_at": scraped_video.posted_at,
+                    }
 
                     # Calcula viral score estatistico
-                    self._calculate_viral_score(video, profile)
+                    self._calculate_viral_score(video, profile, now)
 
-                    db.add(video)
-                    videos_saved += 1
+                    rows.append(video)
+                    seen_ids.add(scraped_video.platform_id)
 
-                    if video.passes_prefilter:
+                    if video["passes_prefilter"]:
                         videos_prefiltered += 1
 
                 except Exception as e:
                     errors.append(f"Erro ao salvar video {scraped_video.platform_id}: {e}")
 
+            db.bulk_insert_mappings(ViralVideo, rows)
+            videos_saved = len(rows)
+
             # Atualiza perfil
-            profile.last_scraped_at = datetime.now()
+            profile.last_scraped_at = now
             profile.total_videos_collected += videos_saved
 
-            # Registra custo
-            self.budget.register_cost("apify", Decimal(str(result.cost_usd)), videos_saved, db)
-            self.budget.increment_counter("scraping_runs", 1, db)
-            self.budget.increment_counter("videos_collected", videos_saved, db)
-
             # Finaliza metrica
+            cost_usd = to_decimal(result.cost_usd)
             run_metric.items_input = len(result.videos)
             run_metric.items_processed = videos_saved
             run_metric.items_failed = len(errors)
-            run_metric.actual_cost_usd = Decimal(str(result.cost_usd))
+            run_metric.actual_cost_usd = cost_usd
             run_metric.complete(success=len(errors) == 0)
 
-            db.commit()
+            # Registra custo e contadores; o mesmo commit grava videos, perfil e metrica
+            self.budget.register_costs_bulk(
+                [("apify", cost_usd, videos_saved)],
+                {"scraping_runs": 1, "videos_collected": videos_saved},
+                db,
+            )
 
             duration = (datetime.now() - start_time).total_seconds()
 
@@ -194,35 +207,71 @@ class WatcherAgent:
         try:
             # Busca perfis ativos ordenados por prioridade
             stmt = (
-                select(MonitoredProfile)
+                select(MonitoredProfile.id, MonitoredProfile.username)
                 .where(MonitoredProfile.is_active == True)
                 .order_by(MonitoredProfile.priority.desc())
                 .limit(settings.max_daily_scraping_profiles)
             )
-            profiles = db.execute(stmt).scalars().all()
-
-            results = []
-            for profile in profiles:
-                try:
-                    # Verifica budget antes de cada perfil
-                    status = self.budget.get_daily_status()
-                    if status["budget"]["exceeded"]:
-                        print("[Watcher] Budget diario excedido, parando scraping")
-                        break
-
-                    result = self.run(
-                        profile_id=profile.id,
-                        max_videos=max_videos_per_profile,
-                    )
-                    results.append(result)
-
-                except Exception as e:
-                    print(f"[Watcher] Erro no perfil @{profile.username}: {e}")
-
-            return results
+            profiles = db.execute(stmt).all()
         finally:
             db.close()
 
+        budget_lock = threading.Lock()
+        budget_exceeded = False
+        remaining_usd: Optional[float] = None  # None = reler do banco
+        runs_since_refresh = 0
+
+        def has_budget() -> bool:
+            """Verifica o budget antes de cada perfil, relendo o status so quando preciso."""
+            nonlocal budget_exceeded, remaining_usd, runs_since_refresh
+            with budget_lock:
+                if budget_exceeded:
+                    return False
+
+                if remaining_usd is None or runs_since_refresh >= BUDGET_REFRESH_EVERY:
+                    # Releitura periodica capta gastos de outros agents
+                    status = self.budget.get_daily_status()["budget"]
+                    remaining_usd = status["remaining_usd"]
+                    runs_since_refresh = 0
+                    budget_exceeded = status["exceeded"]
+                else:
+                    budget_exceeded = remaining_usd < 0
+
+                if budget_exceeded:
+                    print("[Watcher] Budget diario excedido, parando scraping")
+                    return False
+
+                runs_since_refresh += 1
+                return True
+
+        def run_profile(profile_id: int, username: str) -> Optional[WatcherResult]:
+            nonlocal remaining_usd
+            try:
+                if not has_budget():
+                    return None
+
+                result = self.run(profile_id=profile_id, max_videos=max_videos_per_profile)
+                with budget_lock:
+                    if remaining_usd is not None:
+                        remaining_usd -= result.cost_usd
+                return result
+
+            except Exception as e:
+                print(f"[Watcher] Erro no perfil @{username}: {e}")
+                # Depois de um erro o custo real e desconhecido: rele no proximo perfil
+                with budget_lock:
+                    remaining_usd = None
+                return None
+
+        # Cada run abre a propria sessao; as chamadas ao Apify correm em paralelo
+        # e os resultados voltam na ordem de prioridade dos perfis. Os registros
+        # do dia sao criados antes para os workers so incrementarem
+        self.budget.ensure_today_rows()
+        with ThreadPoolExecutor(max_workers=max(settings.watcher_parallelism, 1)) as pool:
+            results = list(pool.map(lambda p: run_profile(p.id, p.username), profiles))
+
+        return [result for result in results if result is not None]
+
     def _get_profile(
         self,
         db: Session,
@@ -239,9 +288,17 @@ class WatcherAgent:
             return db.execute(stmt).scalar_one_or_none()
         return None
 
-    def _calculate_viral_score(self, video: ViralVideo, profile: MonitoredProfile) -> None:
+    def _calculate_viral_score(
+        self,
+        video: dict,
+        profile: MonitoredProfile,
+        now: datetime,
+    ) -> None:
         """Calcula viral score estatistico do video.
 
+        Preenche os campos de score no mapping do ViralVideo; `now` e o instante
+        de referencia da coleta (o mesmo para todo o lote).
+
         Formula:
         - 40% normalized_views
         - 40% normalized_engagement
@@ -249,35 +306,39 @@ class WatcherAgent:
         """
         # Normaliza views (0-1, cap em 2x a media do nicho)
         avg_views = profile.niche_avg_views or 50000
-        video.normalized_views = Decimal(
-            str(min(video.views_count / (avg_views * 2), 1.0))
-        )
+        normalized_views = to_decimal(min(video["views_count"] / (avg_views * 2), 1.0))
 
         # Normaliza engagement
         avg_engagement = (profile.niche_avg_likes or 5000) + (profile.niche_avg_comments or 500)
-        total_engagement = video.likes_count + video.comments_count
-        video.normalized_engagement = Decimal(
-            str(min(total_engagement / (avg_engagement * 2), 1.0))
-        )
+        total_engagement = video["likes_count"] + video["comments_count"]
+        normalized_engagement = to_decimal(min(total_engagement / (avg_engagement * 2), 1.0))
 
         # Calcula recency (decai ao longo de 7 dias)
-        if video.posted_at:
+        posted_at = video["posted_at"]
+        if posted_at:
             # Usa replace para remover timezone info se presente
-            posted_at_naive = video.posted_at.replace(tzinfo=None) if video.posted_at.tzinfo else video.posted_at
-            days_old = (datetime.now() - posted_at_naive).days
-            video.recency_score = Decimal(str(max(1.0 - (days_old / 7.0), 0.0)))
+            posted_at_naive = posted_at.replace(tzinfo=None) if posted_at.tzinfo else posted_at
+            days_old = (now - posted_at_naive).days
+            recency_score = to_decimal(max(1.0 - (days_old / 7.0), 0.0))
         else:
-            video.recency_score = Decimal("0.5")
+            recency_score = Decimal("0.5")
 
         # Score final
-        video.statistical_viral_score = (
-            video.normalized_views * Decimal("0.4")
-            + video.normalized_engagement * Decimal("0.4")
-            + video.recency_score * Decimal("0.2")
+        statistical_viral_score = (
+            normalized_views * Decimal("0.4")
+            + normalized_engagement * Decimal("0.4")
+            + recency_score * Decimal("0.2")
         )
 
+        video["normalized_views"] = normalized_views
+        video["normalized_engagement"] = normalized_engagement
+        video["recency_score"] = recency_score
+        video["statistical_viral_score"] = statistical_viral_score
+
         # Define se passa no pre-filtro
-        video.passes_prefilter = float(video.statistical_viral_score) >= settings.min_statistical_score
+        video["passes_prefilter"] = (
+            float(statistical_viral_score) >= settings.min_statistical_score
+        )
 
     def add_profile(
         self,
@@ -11,10 +11,13 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from config.settings import get_settings
 from src.api.routes import dashboard, profiles, productions, strategies, videos
+from src.core.logging_config import setup_logging
 from src.core.telemetry import setup_telemetry
 
 settings = get_settings()
 
+setup_logging(settings.log_level)
+
 # OpenTelemetry tracing
 setup_telemetry(
     service_name="viralforge",
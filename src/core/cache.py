@@ -0,0 +1,65 @@
+"""Cache em memoria com expiracao (TTL) para resultados caros de recomputar."""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Optional
+
+
+class TTLCache:
+    """Cache thread-safe com TTL por entrada e tamanho maximo (LRU ao encher)."""
+
+    def __init__(self, maxsize: int = 128, ttl: float = 300.0):
+        """Inicializa o cache.
+
+        Args:
+            maxsize: Numero maximo de entradas
+            ttl: Tempo de vida de cada entrada em segundos
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Retorna o valor se existir e nao tiver expirado."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Armazena um valor, descartando a entrada menos usada se estiver cheio."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove todas as entradas."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+@lru_cache(maxsize=4096, typed=True)
+def to_decimal(value: float) -> Decimal:
+    """Decimal(str(value)) memoizado para floats que se repetem (scores, recency).
+
+    typed=True mantem 1 e 1.0 em entradas separadas, ja que str() difere.
+    """
+    return Decimal(str(value))
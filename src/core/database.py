@@ -1,12 +1,13 @@
 """Configuracao do banco de dados com SQLAlchemy para ViralForge."""
 
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Iterator
+from contextlib import contextmanager
 from typing import Tuple
 
 from sqlalchemy import create_engine
 from sqlalchemy.engine import URL, make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from config.settings import get_settings
 
@@ -55,21 +56,38 @@ def _resolve_connection_urls(database_url: str) -> Tuple[str, str]:
     )
 
 
+def _pool_options(database_url: str) -> dict:
+    """Retorna parametros de pool de conexoes para o driver informado.
+
+    SQLite usa pools proprios (sem overflow), entao so recebe pre_ping.
+    """
+    options = {"pool_pre_ping": True}
+    if not make_url(database_url).drivername.startswith("sqlite"):
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_recycle=settings.db_pool_recycle_seconds,
+        )
+    return options
+
+
 # Resolve URLs sync e async
 sync_url, async_url = _resolve_connection_urls(settings.database_url)
 
 # Engine sincrono (para scripts, migrations e init)
+# get_sync_db() entrega sessoes ligadas a este pool: abrir/fechar sessao
+# apenas empresta/devolve uma conexao ja autenticada.
 sync_engine = create_engine(
     sync_url,
     echo=settings.is_development,
-    pool_pre_ping=True,
+    **_pool_options(sync_url),
 )
 
 # Engine assincrono (para a aplicacao FastAPI)
 async_engine = create_async_engine(
     async_url,
     echo=settings.is_development,
-    pool_pre_ping=True,
+    **_pool_options(async_url),
 )
 
 # Session factories
@@ -98,10 +116,24 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 
 
 def get_sync_db():
-    """Retorna sessao sincrona para uso em scripts e Celery tasks."""
+    """Retorna sessao sincrona (do pool de sync_engine) para scripts e Celery tasks."""
     return SyncSessionLocal()
 
 
+@contextmanager
+def sync_db_session() -> Iterator[Session]:
+    """Sessao sincrona com escopo de bloco: `with sync_db_session() as db:`.
+
+    A conexao volta para o pool de sync_engine ao sair do bloco, inclusive
+    em caso de excecao (transacao pendente e descartada no close).
+    """
+    session = SyncSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
 def init_db() -> None:
     """Inicializa o banco de dados (cria tabelas via SQLAlchemy models)."""
     Base.metadata.create_all(bind=sync_engine)
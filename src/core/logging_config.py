@@ -0,0 +1,75 @@
+"""Logging setup for ViralForge."""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Optional
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+
+
+def setup_logging(level: str = "INFO") -> None:
+    """Configure root logging through a QueueHandler + QueueListener.
+
+    The hot path only enqueues the LogRecord; formatting and stream I/O run
+    on the listener's background thread, so concurrent agents never contend
+    on the stdout lock.
+
+    Args:
+        level: Root log level name (e.g. "INFO", "DEBUG")
+    """
+    global _queue_handler
+
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    )
+
+    root = logging.getLogger()
+    root.setLevel(level.upper())
+    _queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    root.addHandler(_queue_handler)
+
+    _start_listener(stream_handler)
+    atexit.register(shutdown_logging)
+
+    # A forked child (Celery prefork pool, multiprocessing) inherits the
+    # QueueHandler but not the listener thread; without a new listener its
+    # records would pile up in a queue nobody drains.
+    os.register_at_fork(after_in_child=_restart_listener_in_child)
+
+
+def shutdown_logging() -> None:
+    """Stop the listener after it drains the records already queued."""
+    if _listener is not None:
+        _listener.stop()
+
+
+def _start_listener(*handlers: logging.Handler) -> None:
+    """Start a listener thread feeding the queue handler's records to handlers."""
+    global _listener
+
+    _listener = logging.handlers.QueueListener(
+        _queue_handler.queue, *handlers, respect_handler_level=True
+    )
+    _listener.start()
+
+
+def _restart_listener_in_child() -> None:
+    """Give a forked child its own queue and listener thread.
+
+    The inherited queue is replaced rather than reused: it holds the parent's
+    pending records and its internal lock may have been taken mid-put by
+    another parent thread at fork time.
+    """
+    if _listener is None:
+        return
+
+    _queue_handler.queue = queue.SimpleQueue()
+    _start_listener(*_listener.handlers)
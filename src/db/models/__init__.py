@@ -27,6 +27,7 @@ from src.db.models.trends import (
     ContentQueue,
     ContentStatus,
     PerformanceMetric,
+    PerformanceMetricRollup,
     Platform,
     Trend,
     TrendStatus,
@@ -56,6 +57,7 @@ __all__ = [
     "ContentStatus",
     "ContentQueue",
     "PerformanceMetric",
+    "PerformanceMetricRollup",
     "Competitor",
     "CompetitorAnalysis",
     # Analysis
@@ -5,7 +5,7 @@ from decimal import Decimal
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import Boolean, DateTime, Integer, Numeric, String, Text, func
+from sqlalchemy import Boolean, DateTime, Integer, Numeric, String, Text, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -35,6 +35,10 @@ class StyleProfile(Base):
     """Perfil de estilo aprendido pelo sistema."""
 
     __tablename__ = "style_profiles"
+    __table_args__ = (
+        # Alvo do upsert em StyleClonerAgent._save_profile
+        UniqueConstraint("name", name="uq_style_profiles_name"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
@@ -22,6 +22,16 @@ class RunStatus(str, Enum):
     ABORTED = "aborted"
 
 
+# Coluna de custo de cada servico em BudgetTracking
+SERVICE_COST_COLUMNS = {
+    "apify": "apify_cost_usd",
+    "gemini": "gemini_cost_usd",
+    "openai": "openai_cost_usd",
+    "veo": "veo_cost_usd",
+    "elevenlabs": "elevenlabs_cost_usd",
+}
+
+
 class BudgetTracking(Base):
     """Controle de orcamento diario."""
 
@@ -79,15 +89,8 @@ class BudgetTracking(Base):
 
     def add_cost(self, service: str, amount: Decimal) -> None:
         """Adiciona custo a um servico especifico."""
-        service_map = {
-            "apify": "apify_cost_usd",
-            "gemini": "gemini_cost_usd",
-            "openai": "openai_cost_usd",
-            "veo": "veo_cost_usd",
-            "elevenlabs": "elevenlabs_cost_usd",
-        }
-        if service in service_map:
-            attr = service_map[service]
+        if service in SERVICE_COST_COLUMNS:
+            attr = SERVICE_COST_COLUMNS[service]
             current = getattr(self, attr) or Decimal("0")
             setattr(self, attr, current + amount)
             self.total_cost_usd = (self.total_cost_usd or Decimal("0")) + amount
@@ -5,7 +5,23 @@ from decimal import Decimal
 from enum import Enum
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import Boolean, DateTime, Enum as SQLEnum, ForeignKey, Integer, Numeric, String, Text, func
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Computed,
+    DateTime,
+    Enum as SQLEnum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+    text,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -154,6 +170,24 @@ class ContentQueue(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        # get_due_content: status = scheduled, ordenado por prioridade e horario
+        Index(
+            "ix_content_queue_due",
+            priority.desc(),
+            scheduled_at,
+            postgresql_where=text("status = 'scheduled'"),
+        ),
+        # list_scheduled: fila ativa ordenada por horario
+        Index(
+            "ix_content_queue_active",
+            scheduled_at,
+            postgresql_where=text("status IN ('scheduled', 'processing', 'ready')"),
+        ),
+        # Filtro por plataforma (target_platforms @> '["..."]')
+        Index("ix_content_queue_target_platforms", target_platforms, postgresql_using="gin"),
+    )
+
     def __repr__(self) -> str:
         return f"<ContentQueue(title='{self.title[:30]}...', status={self.status})>"
 
@@ -189,8 +223,15 @@ class PerformanceMetric(Base):
     shares: Mapped[int] = mapped_column(Integer, default=0)
     saves: Mapped[int] = mapped_column(Integer, default=0)
 
-    # Metricas calculadas
-    engagement_rate: Mapped[Optional[Decimal]] = mapped_column(Numeric(5, 4))
+    # Metricas calculadas (engagement_rate e gerada pelo Postgres a cada insert/update)
+    engagement_rate: Mapped[Optional[float]] = mapped_column(
+        Float,
+        Computed(
+            "(COALESCE(likes, 0) + COALESCE(comments, 0) + COALESCE(shares, 0)"
+            " + COALESCE(saves, 0))::double precision / NULLIF(views, 0)",
+            persisted=True,
+        ),
+    )
     viral_score: Mapped[Optional[Decimal]] = mapped_column(Numeric(5, 4))
 
     # Metricas de retencao (para videos)
@@ -214,6 +255,11 @@ class PerformanceMetric(Base):
     measured_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
+    # Filtro por periodo/plataforma + ordenacao por views dos relatorios
+    __table_args__ = (
+        Index("ix_pm_platform_measured_views", platform, measured_at, views.desc()),
+    )
+
     def __repr__(self) -> str:
         return f"<PerformanceMetric(platform={self.platform}, views={self.views}, engagement={self.engagement_rate})>"
 
@@ -223,6 +269,40 @@ class PerformanceMetric(Base):
         return self.likes + self.comments + self.shares + self.saves
 
 
+class PerformanceMetricRollup(Base):
+    """Agregado por hora das metricas de performance de cada conteudo.
+
+    Mantido pelo PerformanceTracker ao final de cada coleta; relatorios de
+    tendencia e melhores horarios leem daqui em vez de varrer
+    performance_metrics.
+    """
+
+    __tablename__ = "performance_metric_rollups"
+    __table_args__ = (
+        UniqueConstraint("content_id", "platform", "bucket", name="uq_pm_rollup_content_bucket"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    content_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("content_queue.id", ondelete="CASCADE"), nullable=False
+    )
+    platform: Mapped[Platform] = mapped_column(SQLEnum(Platform), nullable=False)
+
+    # Inicio da hora agregada (date_trunc('hour', measured_at))
+    bucket: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+
+    # Somas das metricas no bucket
+    views: Mapped[int] = mapped_column(BigInteger, default=0)
+    engagement: Mapped[int] = mapped_column(BigInteger, default=0)
+    engagement_rate_sum: Mapped[Decimal] = mapped_column(Numeric(12, 4), default=0)
+    metric_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self) -> str:
+        return f"<PerformanceMetricRollup(content_id={self.content_id}, bucket={self.bucket}, views={self.views})>"
+
+
 class Competitor(Base):
     """Concorrente monitorado."""
 
@@ -14,7 +14,7 @@ from mcp.server.fastmcp import FastMCP
 from sqlalchemy import select
 
 from config.settings import get_settings
-from src.agents import producer_agent, strategist_agent, watcher_agent
+from src.agents import get_strategist_agent, producer_agent, watcher_agent
 from src.agents.analyst_agent import get_analyst_agent
 from src.core.database import get_sync_db
 from src.db.models import (
@@ -426,7 +426,7 @@ async def generate_strategy(video_id: int, niche: Optional[str] = None) -> dict[
     """Gera estrategia de conteudo usando um video analisado como referencia."""
 
     def _run() -> dict[str, Any]:
-        result = strategist_agent.generate(video_id, niche=niche)
+        result = get_strategist_agent().generate(video_id, niche=niche)
         return {
             "run_id": result.run_id,
             "strategy_id": result.strategy_id,
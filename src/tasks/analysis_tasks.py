@@ -2,7 +2,7 @@
 
 from typing import Optional
 
-from src.agents import get_analyst_agent, strategist_agent
+from src.agents import get_analyst_agent, get_strategist_agent
 from src.tasks.celery_app import celery_app
 from src.tools import budget_tools
 
@@ -66,7 +66,7 @@ def generate_strategy(self, video_id: int, niche: str = None):
         niche: Nicho alvo
     """
     try:
-        result = strategist_agent.generate(video_id, niche=niche)
+        result = get_strategist_agent().generate(video_id, niche=niche)
         return {
             "run_id": result.run_id,
             "strategy_id": result.strategy_id,
@@ -92,7 +92,7 @@ def generate_strategies(niche: str = "geral", limit: int = 3):
     if status["budget"]["exceeded"]:
         return {"status": "skipped", "reason": "budget_exceeded"}
 
-    results = strategist_agent.generate_from_best_videos(niche=niche, limit=limit)
+    results = get_strategist_agent().generate_from_best_videos(niche=niche, limit=limit)
 
     return {
         "status": "completed",
@@ -1,9 +1,10 @@
 """Configuracao do Celery para ViralForge."""
 
-from celery import Celery
+from celery import Celery, signals
 from celery.schedules import crontab
 
 from config.settings import get_settings
+from src.core.logging_config import setup_logging, shutdown_logging
 
 settings = get_settings()
 
@@ -83,5 +84,21 @@ celery_app.conf.update(
 )
 
 
+@signals.setup_logging.connect
+def _setup_worker_logging(**kwargs) -> None:
+    """Usa o logging da aplicacao (QueueHandler) no worker em vez do padrao do Celery.
+
+    Roda no processo pai do prefork; cada filho do pool reabre a fila e o
+    listener no fork (ver src.core.logging_config).
+    """
+    setup_logging(settings.log_level)
+
+
+@signals.worker_process_shutdown.connect
+def _flush_worker_logging(**kwargs) -> None:
+    """Drena a fila de log do filho do pool (que sai via os._exit, sem atexit)."""
+    shutdown_logging()
+
+
 if __name__ == "__main__":
     celery_app.start()
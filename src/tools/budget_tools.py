@@ -4,12 +4,13 @@ from datetime import date, datetime
 from decimal import Decimal
 from typing import Literal, Optional
 
-from sqlalchemy import select
+from sqlalchemy import and_, case, func, not_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from config.settings import get_settings
 from src.core.database import get_sync_db
-from src.db.models.tracking import BudgetTracking, DailyCounter
+from src.db.models.tracking import SERVICE_COST_COLUMNS, BudgetTracking, DailyCounter
 
 settings = get_settings()
 
@@ -54,24 +55,12 @@ class BudgetTools:
             should_close = True
 
         try:
-            today = date.today()
-
-            # Busca registro existente
-            stmt = select(BudgetTracking).where(BudgetTracking.date == today)
-            budget = db.execute(stmt).scalar_one_or_none()
-
-            if budget is None:
-                # Cria novo registro
-                budget = BudgetTracking(
-                    date=today,
-                    daily_budget_limit_usd=self.daily_limit,
-                    monthly_budget_limit_usd=self.monthly_limit,
-                )
-                db.add(budget)
-                db.commit()
-                db.refresh(budget)
-
-            return budget
+            return self._get_or_create_today(
+                BudgetTracking,
+                db,
+                daily_budget_limit_usd=self.daily_limit,
+                monthly_budget_limit_usd=self.monthly_limit,
+            )
         finally:
             if should_close:
                 db.close()
@@ -91,22 +80,44 @@ class BudgetTools:
             should_close = True
 
         try:
-            today = date.today()
-
-            stmt = select(DailyCounter).where(DailyCounter.date == today)
-            counter = db.execute(stmt).scalar_one_or_none()
-
-            if counter is None:
-                counter = DailyCounter(date=today)
-                db.add(counter)
-                db.commit()
-                db.refresh(counter)
-
-            return counter
+            return self._get_or_create_today(DailyCounter, db)
         finally:
             if should_close:
                 db.close()
 
+    def ensure_today_rows(self) -> None:
+        """Cria os registros de budget e contador do dia antes de rodar workers em paralelo."""
+        db = get_sync_db()
+        try:
+            self.get_today_budget(db)
+            self.get_today_counter(db)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _get_or_create_today(model, db: Session, **defaults):
+        """Busca o registro do dia em model ou cria, tolerando criacao concorrente.
+
+        Se outro worker inserir a mesma data primeiro, a unique de date falha
+        dentro do savepoint e o registro dele e relido.
+        """
+        today = date.today()
+        stmt = select(model).where(model.date == today)
+        row = db.execute(stmt).scalar_one_or_none()
+        if row is not None:
+            return row
+
+        try:
+            with db.begin_nested():
+                row = model(date=today, **defaults)
+                db.add(row)
+        except IntegrityError:
+            return db.execute(stmt).scalar_one()
+
+        db.commit()
+        db.refresh(row)
+        return row
+
     def check_budget(
         self,
         service: str,
@@ -186,22 +197,61 @@ class BudgetTools:
             should_close = True
 
         try:
-            budget = self.get_today_budget(db)
-
-            # Adiciona custo ao servico correto
-            budget.add_cost(service, cost)
-            budget.api_calls_count += quantity
+            budget = self._apply_costs([(service, cost, quantity)], db)
+            db.commit()
+            db.refresh(budget)
 
             # Verifica se excedeu
             if budget.budget_exceeded and self.abort_on_exceed:
-                db.commit()
                 raise BudgetExceededError(
                     f"Orcamento diario excedido! Total: ${budget.total_cost_usd}"
                 )
 
+            return budget
+        finally:
+            if should_close:
+                db.close()
+
+    def register_costs_bulk(
+        self,
+        costs: list[tuple[str, Decimal, int]],
+        counters: Optional[dict[str, int]] = None,
+        db: Optional[Session] = None,
+    ) -> BudgetTracking:
+        """Registra varios custos e incrementos de contador com um unico commit.
+
+        O commit tambem grava o que o chamador ja adicionou na sessao (ex.:
+        estrategias geradas e a metrica de run).
+
+        Args:
+            costs: Lista de (servico, custo em USD, quantidade de operacoes)
+            counters: Incrementos por nome de contador (opcional)
+            db: Sessao do banco (opcional)
+
+        Returns:
+            BudgetTracking atualizado
+
+        Raises:
+            BudgetExceededError: Se abort_on_exceed=True e limite excedido
+        """
+        should_close = False
+        if db is None:
+            db = get_sync_db()
+            should_close = True
+
+        try:
+            budget = self._apply_costs(costs, db)
+            if counters:
+                self._apply_counters(counters, db)
+
             db.commit()
             db.refresh(budget)
 
+            if budget.budget_exceeded and self.abort_on_exceed:
+                raise BudgetExceededError(
+                    f"Orcamento diario excedido! Total: ${budget.total_cost_usd}"
+                )
+
             return budget
         finally:
             if should_close:
@@ -220,6 +270,22 @@ class BudgetTools:
             amount: Quantidade a incrementar
             db: Sessao do banco
 
+        Returns:
+            DailyCounter atualizado
+        """
+        return self.increment_counters({counter_name: amount}, db)
+
+    def increment_counters(
+        self,
+        counters: dict[str, int],
+        db: Optional[Session] = None,
+    ) -> DailyCounter:
+        """Incrementa varios contadores diarios com um unico UPDATE.
+
+        Args:
+            counters: Incrementos por nome de contador
+            db: Sessao do banco (opcional)
+
         Returns:
             DailyCounter atualizado
         """
@@ -229,8 +295,7 @@ class BudgetTools:
             should_close = True
 
         try:
-            counter = self.get_today_counter(db)
-            counter.increment(counter_name, amount)
+            counter = self._apply_counters(counters, db)
             db.commit()
             db.refresh(counter)
             return counter
@@ -238,6 +303,78 @@ class BudgetTools:
             if should_close:
                 db.close()
 
+    def _apply_costs(
+        self,
+        costs: list[tuple[str, Decimal, int]],
+        db: Session,
+    ) -> BudgetTracking:
+        """Soma custos no budget do dia com UPDATE ... SET col = col + :n (sem commit).
+
+        A soma e feita pelo banco, entao runs concorrentes nao perdem
+        atualizacoes como no read-modify-write de BudgetTracking.add_cost.
+        """
+        budget = self.get_today_budget(db)
+
+        table = BudgetTracking.__table__.c
+        values = {}
+        total = Decimal("0")
+        calls = 0
+        for service, cost, quantity in costs:
+            column = SERVICE_COST_COLUMNS.get(service)
+            if column is not None:
+                values[column] = values.get(column, 0) + cost
+                total += cost
+                calls += 1  # add_cost conta a chamada alem da quantidade
+            calls += quantity
+
+        assignments = {
+            column: func.coalesce(table[column], 0) + amount for column, amount in values.items()
+        }
+        if calls:
+            assignments["api_calls_count"] = func.coalesce(table.api_calls_count, 0) + calls
+        if total:
+            # O SET le os valores antigos da linha: marca excedido so na transicao
+            new_total = func.coalesce(table.total_cost_usd, 0) + total
+            crossed = and_(
+                not_(func.coalesce(table.budget_exceeded, False)),
+                new_total > table.daily_budget_limit_usd,
+            )
+            assignments["total_cost_usd"] = new_total
+            assignments["budget_exceeded"] = case(
+                (crossed, True), else_=table.budget_exceeded
+            )
+            assignments["budget_exceeded_at"] = case(
+                (crossed, datetime.now()), else_=table.budget_exceeded_at
+            )
+
+        if assignments:
+            db.execute(
+                update(BudgetTracking)
+                .where(BudgetTracking.id == budget.id)
+                .values(assignments)
+                .execution_options(synchronize_session=False)
+            )
+        return budget
+
+    def _apply_counters(self, counters: dict[str, int], db: Session) -> DailyCounter:
+        """Soma incrementos no contador do dia com um unico UPDATE atomico (sem commit)."""
+        counter = self.get_today_counter(db)
+
+        table = DailyCounter.__table__.c
+        assignments = {
+            name: func.coalesce(table[name], 0) + amount
+            for name, amount in counters.items()
+            if name in table and amount
+        }
+        if assignments:
+            db.execute(
+                update(DailyCounter)
+                .where(DailyCounter.id == counter.id)
+                .values(assignments)
+                .execution_options(synchronize_session=False)
+            )
+        return counter
+
     def get_daily_status(self) -> dict:
         """Retorna status completo do orcamento diario.
 
@@ -295,14 +432,14 @@ class BudgetTools:
             veo_mode: Modo Veo
 
         Returns:
-            Dict com custos detalhados
+            Dict com custos detalhados (valores em Decimal)
         """
-        veo_cost = float(self.SERVICE_COSTS[f"veo_{veo_mode}"]) * num_scenes
+        veo_cost = self.SERVICE_COSTS[f"veo_{veo_mode}"] * num_scenes
 
         if tts_provider == "edge-tts":
-            tts_cost = 0.0
+            tts_cost = Decimal("0")
         else:
-            tts_cost = float(self.SERVICE_COSTS["elevenlabs"]) * script_chars
+            tts_cost = self.SERVICE_COSTS["elevenlabs"] * script_chars
 
         total = veo_cost + tts_cost
 
@@ -341,7 +478,7 @@ class BudgetTools:
         db = get_sync_db()
         try:
             budget = self.get_today_budget(db)
-            remaining = float(budget.budget_remaining)
+            remaining = budget.budget_remaining
 
             if estimate["total_usd"] > remaining:
                 return False, (
@@ -1,9 +1,11 @@
 """Tools para processamento de audio/video com FFmpeg."""
 
 import json
+import os
 import subprocess
 import tempfile
 from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
 from typing import Optional, Union
 
@@ -13,6 +15,12 @@ from config.settings import get_settings
 
 settings = get_settings()
 
+# Argumentos por encoder H.264; hardware primeiro na deteccao automatica
+HARDWARE_ENCODERS = {
+    "h264_nvenc": ["-c:v", "h264_nvenc", "-preset", "p4"],
+    "h264_qsv": ["-c:v", "h264_qsv", "-preset", "veryfast"],
+}
+
 
 @dataclass
 class VideoInfo:
@@ -51,6 +59,42 @@ class FFmpegTools:
         except (subprocess.CalledProcessError, FileNotFoundError):
             raise RuntimeError("FFmpeg nao esta instalado ou nao esta no PATH")
 
+    @cached_property
+    def video_encoder_args(self) -> list[str]:
+        """Argumentos de encode de video para operacoes que reencodam.
+
+        Com FFMPEG_ENCODER=auto, testa NVENC e QSV com um encode minimo (o
+        encoder pode estar compilado sem GPU disponivel) e cai para libx264
+        usando todos os nucleos.
+        """
+        encoder = settings.ffmpeg_encoder
+        if encoder in HARDWARE_ENCODERS:
+            return HARDWARE_ENCODERS[encoder]
+
+        if encoder == "auto":
+            for name, args in HARDWARE_ENCODERS.items():
+                if self._encoder_works(name):
+                    return args
+
+        return ["-c:v", "libx264", "-preset", "veryfast", "-threads", str(os.cpu_count() or 0)]
+
+    def _encoder_works(self, encoder: str) -> bool:
+        """Verifica se o encoder consegue codificar um frame nesta maquina."""
+        cmd = [
+            "ffmpeg",
+            "-hide_banner",
+            "-f", "lavfi",
+            "-i", "color=size=256x256:duration=0.1",
+            "-c:v", encoder,
+            "-f", "null",
+            "-",
+        ]
+        try:
+            subprocess.run(cmd, capture_output=True, check=True, timeout=15)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+            return False
+        return True
+
     def get_video_info(self, video_path: Union[str, Path]) -> VideoInfo:
         """Obtem informacoes do video usando ffprobe.
 
@@ -125,18 +169,19 @@ class FFmpegTools:
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Cria arquivo de lista para concat
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as f:
-            for vp in video_paths:
-                f.write(f"file '{Path(vp).absolute()}'\n")
-            list_file = f.name
+        list_file = self._write_concat_list(video_paths)
 
         try:
             if transition:
                 # Concatenacao com transicao (mais complexo)
                 self._concat_with_transition(video_paths, output_path, transition)
+            elif not self._share_stream_format(
+                [self.get_video_info(vp) for vp in video_paths]
+            ):
+                # Formatos diferentes: -c copy geraria um arquivo invalido
+                self._concat_reencode(video_paths, output_path)
             else:
-                # Concatenacao simples
+                # Concatenacao simples via concat demuxer, sem reencode
                 cmd = [
                     "ffmpeg",
                     "-f", "concat",
@@ -152,6 +197,62 @@ class FFmpegTools:
 
         return output_path
 
+    def _write_concat_list(self, video_paths: list[Union[str, Path]]) -> str:
+        """Cria o arquivo de lista do concat demuxer e retorna seu caminho."""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as f:
+            for vp in video_paths:
+                f.write(f"file '{Path(vp).absolute()}'\n")
+            return f.name
+
+    def _share_stream_format(self, infos: list[VideoInfo]) -> bool:
+        """Verifica se os videos tem mesmo codec, resolucao e fps (requisito do -c copy)."""
+        formats = {(i.codec, i.width, i.height, round(i.fps, 2)) for i in infos}
+        return len(formats) <= 1
+
+    def _concat_reencode(
+        self,
+        video_paths: list[Union[str, Path]],
+        output_path: Path,
+    ) -> None:
+        """Concatena videos de formatos diferentes com o concat filter (reencode, sem audio)."""
+        inputs, video_filter = self._concat_reencode_filter(video_paths)
+        cmd = [
+            "ffmpeg",
+            *inputs,
+            "-filter_complex", video_filter,
+            "-filter_complex_threads", str(os.cpu_count() or 1),
+            "-map", "[outv]",
+            *self.video_encoder_args,
+            "-y",
+            str(output_path),
+        ]
+        subprocess.run(cmd, capture_output=True, check=True)
+
+    def _concat_reencode_filter(
+        self,
+        video_paths: list[Union[str, Path]],
+    ) -> tuple[list[str], str]:
+        """Monta inputs e filtro que normalizam e concatenam os clips em [outv].
+
+        Todos os clips sao normalizados para a resolucao e fps do primeiro.
+        """
+        target = self.get_video_info(video_paths[0])
+        n = len(video_paths)
+
+        inputs = []
+        for vp in video_paths:
+            inputs += ["-i", str(vp)]
+
+        filter_parts = [
+            f"[{i}:v]scale={target.width}:{target.height}:force_original_aspect_ratio=decrease,"
+            f"pad={target.width}:{target.height}:(ow-iw)/2:(oh-ih)/2,"
+            f"setsar=1,fps={target.fps}[v{i}]"
+            for i in range(n)
+        ]
+        filter_parts.append(f"{''.join(f'[v{i}]' for i in range(n))}concat=n={n}:v=1:a=0[outv]")
+
+        return inputs, ";".join(filter_parts)
+
     def _concat_with_transition(
         self,
         video_paths: list[Union[str, Path]],
@@ -209,48 +310,93 @@ class FFmpegTools:
         video_info = self.get_video_info(video_path)
         duration = video_info.duration_seconds
 
-        if music_path:
-            music_path = Path(music_path)
-            # Mix com video + narracao + musica
-            filter_complex = (
-                f"[1:a]volume={narration_volume}[narr];"
-                f"[2:a]volume={music_volume},aloop=loop=-1:size=44100*{int(duration)}[music];"
-                f"[narr][music]amix=inputs=2:duration=first[aout]"
-            )
+        cmd = [
+            "ffmpeg",
+            "-i", str(video_path),
+            *self._audio_mix_args(
+                narration_path, output_path, duration,
+                music_path, narration_volume, music_volume,
+            ),
+        ]
+        subprocess.run(cmd, capture_output=True, check=True)
 
+        return MixResult(
+            output_path=output_path,
+            duration_seconds=duration,
+            narration_volume=narration_volume,
+            music_volume=music_volume,
+        )
+
+    def concat_and_mix(
+        self,
+        clip_paths: list[Union[str, Path]],
+        narration_path: Union[str, Path],
+        output_path: Union[str, Path],
+        music_path: Optional[Union[str, Path]] = None,
+        narration_volume: float = 1.0,
+        music_volume: float = 0.2,
+    ) -> MixResult:
+        """Concatena clips e mixa narracao/musica em uma unica execucao do FFmpeg.
+
+        Equivale a concatenate_videos + mix_audio_with_video, mas le os clips
+        direto pelo concat demuxer (video em -c copy), sem gerar o video
+        concatenado intermediario. Clips de formatos diferentes sao
+        reencodados pelo concat filter na mesma execucao.
+
+        Args:
+            clip_paths: Clips na ordem de exibicao
+            narration_path: Arquivo de narracao TTS
+            output_path: Caminho de saida
+            music_path: Musica de fundo (opcional)
+            narration_volume: Volume da narracao (0.0-1.0)
+            music_volume: Volume da musica (0.0-1.0)
+
+        Returns:
+            MixResult com informacoes da mixagem
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        infos = [self.get_video_info(cp) for cp in clip_paths]
+        duration = sum(i.duration_seconds for i in infos)
+
+        if not self._share_stream_format(infos):
+            # Formatos diferentes: concat filter + mix no mesmo filter_complex
+            inputs, video_filter = self._concat_reencode_filter(clip_paths)
             cmd = [
                 "ffmpeg",
-                "-i", str(video_path),
-                "-i", str(narration_path),
-                "-i", str(music_path),
-                "-filter_complex", filter_complex,
-                "-map", "0:v",
-                "-map", "[aout]",
-                "-c:v", "copy",
-                "-c:a", "aac",
-                "-b:a", "192k",
-                "-shortest",
-                "-y",
-                str(output_path),
+                *inputs,
+                *self._audio_mix_args(
+                    narration_path, output_path, duration,
+                    music_path, narration_volume, music_volume,
+                    first_audio_input=len(clip_paths),
+                    video_filter=video_filter,
+                ),
             ]
-        else:
-            # Mix com video + narracao apenas
+            subprocess.run(cmd, capture_output=True, check=True)
+            return MixResult(
+                output_path=output_path,
+                duration_seconds=duration,
+                narration_volume=narration_volume,
+                music_volume=music_volume,
+            )
+
+        list_file = self._write_concat_list(clip_paths)
+
+        try:
             cmd = [
                 "ffmpeg",
-                "-i", str(video_path),
-                "-i", str(narration_path),
-                "-filter_complex", f"[1:a]volume={narration_volume}[aout]",
-                "-map", "0:v",
-                "-map", "[aout]",
-                "-c:v", "copy",
-                "-c:a", "aac",
-                "-b:a", "192k",
-                "-shortest",
-                "-y",
-                str(output_path),
+                "-f", "concat",
+                "-safe", "0",
+                "-i", list_file,
+                *self._audio_mix_args(
+                    narration_path, output_path, duration,
+                    music_path, narration_volume, music_volume,
+                ),
             ]
-
-        subprocess.run(cmd, capture_output=True, check=True)
+            subprocess.run(cmd, capture_output=True, check=True)
+        finally:
+            Path(list_file).unlink()
 
         return MixResult(
             output_path=output_path,
@@ -259,6 +405,61 @@ class FFmpegTools:
             music_volume=music_volume,
         )
 
+    def _audio_mix_args(
+        self,
+        narration_path: Union[str, Path],
+        output_path: Path,
+        duration: float,
+        music_path: Optional[Union[str, Path]],
+        narration_volume: float,
+        music_volume: float,
+        first_audio_input: int = 1,
+        video_filter: Optional[str] = None,
+    ) -> list[str]:
+        """Monta os argumentos do FFmpeg apos os inputs de video.
+
+        Adiciona narracao (e musica em loop) como entradas a partir de
+        first_audio_input. Sem video_filter, mapeia o video da entrada 0 em
+        -c copy; com ele, o filtro entra no filter_complex e o video sai de [outv].
+        """
+        narr = first_audio_input
+        if music_path:
+            # Mix com video + narracao + musica
+            inputs = ["-i", str(narration_path), "-i", str(Path(music_path))]
+            audio_filter = (
+                f"[{narr}:a]volume={narration_volume}[narr];"
+                f"[{narr + 1}:a]volume={music_volume},"
+                f"aloop=loop=-1:size=44100*{int(duration)}[music];"
+                f"[narr][music]amix=inputs=2:duration=first[aout]"
+            )
+        else:
+            # Mix com video + narracao apenas
+            inputs = ["-i", str(narration_path)]
+            audio_filter = f"[{narr}:a]volume={narration_volume}[aout]"
+
+        if video_filter:
+            filter_complex = f"{video_filter};{audio_filter}"
+            video_map, video_codec = "[outv]", [
+                "-filter_complex_threads", str(os.cpu_count() or 1),
+                *self.video_encoder_args,
+            ]
+        else:
+            filter_complex = audio_filter
+            video_map, video_codec = "0:v", ["-c:v", "copy"]
+
+        return [
+            *inputs,
+            "-filter_complex", filter_complex,
+            "-map", video_map,
+            "-map", "[aout]",
+            *video_codec,
+            "-c:a", "aac",
+            "-b:a", "192k",
+            "-shortest",
+            "-y",
+            str(output_path),
+        ]
+
     def extract_audio(
         self,
         video_path: Union[str, Path],
@@ -323,6 +524,7 @@ class FFmpegTools:
             "ffmpeg",
             "-i", str(video_path),
             "-vf", f"scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2",
+            *self.video_encoder_args,
             "-c:a", "copy",
             "-y",
             str(output_path),
@@ -363,6 +565,7 @@ class FFmpegTools:
             "ffmpeg",
             "-i", str(video_path),
             "-vf", f"subtitles='{subs_escaped}':force_style='FontSize={font_size},PrimaryColour=&H{self._color_to_ass(font_color)}&'",
+            *self.video_encoder_args,
             "-c:a", "copy",
             "-y",
             str(output_path),
@@ -13,6 +13,10 @@ from config.settings import get_settings
 
 settings = get_settings()
 
+# Uploads maiores que uma parte usam multipart com partes enviadas em paralelo
+MULTIPART_PART_SIZE = 64 * 1024 * 1024
+MULTIPART_PARALLEL_UPLOADS = 4
+
 
 class StorageTools:
     """Gerenciador de storage usando MinIO."""
@@ -69,6 +73,8 @@ class StorageTools:
                 data=f,
                 length=file_size,
                 content_type=content_type,
+                part_size=MULTIPART_PART_SIZE,
+                num_parallel_uploads=MULTIPART_PARALLEL_UPLOADS,
             )
 
         return f"{self.bucket}/{remote_path}"
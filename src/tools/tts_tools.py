@@ -3,6 +3,7 @@
 import asyncio
 import tempfile
 from dataclasses import dataclass
+from decimal import Decimal
 from pathlib import Path
 from typing import Literal, Optional, Union
 
@@ -23,7 +24,7 @@ class TTSResult:
     duration_seconds: float
     provider: str
     characters: int
-    cost_usd: float
+    cost_usd: Decimal
 
 
 class TTSTools:
@@ -122,7 +123,7 @@ class TTSTools:
             duration_seconds=duration,
             provider="edge-tts",
             characters=len(text),
-            cost_usd=0.0,  # edge-tts e gratuito
+            cost_usd=Decimal("0"),  # edge-tts e gratuito
         )
 
     async def _generate_elevenlabs(
@@ -179,9 +180,9 @@ class TTSTools:
         except Exception:
             return 0.0
 
-    def _calculate_elevenlabs_cost(self, characters: int) -> float:
+    def _calculate_elevenlabs_cost(self, characters: int) -> Decimal:
         """Calcula custo do ElevenLabs ($0.30/1000 chars)."""
-        return float(settings.cost_elevenlabs_per_1k_chars * characters / 1000)
+        return settings.cost_elevenlabs_per_1k_chars * characters / 1000
 
     # === Metodos de conveniencia ===
 
@@ -285,7 +286,7 @@ class TTSTools:
         if provider == "edge-tts":
             return 0.0
         elif provider == "elevenlabs":
-            return self._calculate_elevenlabs_cost(len(text))
+            return float(self._calculate_elevenlabs_cost(len(text)))
         else:
             return 0.0
 
@@ -34,7 +34,7 @@ class VeoResult:
     prompt: str
     duration_seconds: float
     resolution: str
-    cost_usd: float
+    cost_usd: Decimal
     generation_time_seconds: float
 
 
@@ -43,7 +43,7 @@ class VeoClipsResult:
     """Resultado de geracao de multiplos clips."""
 
     clips: list[VeoResult]
-    total_cost_usd: float
+    total_cost_usd: Decimal
     total_generation_time_seconds: float
     failed_prompts: list[str]
 
@@ -197,7 +197,7 @@ class VeoTools:
         clips = [r for r in results if r is not None]
 
         total_time = time.time() - start_time
-        total_cost = sum(c.cost_usd for c in clips)
+        total_cost = sum((c.cost_usd for c in clips), Decimal("0"))
 
         return VeoClipsResult(
             clips=clips,
@@ -215,11 +215,11 @@ class VeoTools:
             with open(output_path, "wb") as f:
                 f.write(response.content)
 
-    def _calculate_cost(self, mode: str) -> float:
+    def _calculate_cost(self, mode: str) -> Decimal:
         """Calcula custo da geracao."""
         if mode == "test":
-            return float(settings.cost_veo_test)
-        return float(settings.cost_veo_production)
+            return settings.cost_veo_test
+        return settings.cost_veo_production
 
     def estimate_cost(
         self,
@@ -237,7 +237,7 @@ class VeoTools:
         """
         mode = mode or settings.veo_mode
         cost_per_clip = self._calculate_cost(mode)
-        return cost_per_clip * num_clips
+        return float(cost_per_clip * num_clips)
 
     @staticmethod
     def optimize_prompt(prompt: str) -> str:
@@ -86,6 +86,64 @@ class TestTrendHunterAgent:
         assert virality_score > 0
         assert virality_score <= 10  # Max score
 
+    @pytest.mark.asyncio
+    async def test_save_trends_inserts_updates_and_merges_batch(self, db_session):
+        """Test _save_trends updates existing rows, inserts new ones and merges repeated keys."""
+        from sqlalchemy import select
+        from src.agents.trend_hunter_agent import DetectedTrend, TrendHunterAgent
+
+        existing = Trend(
+            name="#old",
+            platform=Platform.TIKTOK,
+            trend_type=TrendType.HASHTAG,
+            status=TrendStatus.EMERGING,
+            score_history=[{"date": "2025-01-01T00:00:00", "score": 10.0, "volume": 1}],
+        )
+        db_session.add(existing)
+        await db_session.commit()
+
+        trends = [
+            DetectedTrend(
+                name="#old", trend_type=TrendType.HASHTAG, platform=Platform.TIKTOK,
+                score=40.0, velocity=0.5, volume=8,
+            ),
+            DetectedTrend(
+                name="#new", trend_type=TrendType.HASHTAG, platform=Platform.TIKTOK,
+                score=60.0, velocity=0.2, volume=5,
+            ),
+            # Mesma chave repetida no lote: atualiza a linha criada acima
+            DetectedTrend(
+                name="#new", trend_type=TrendType.HASHTAG, platform=Platform.TIKTOK,
+                score=70.0, velocity=-0.1, volume=7,
+            ),
+        ]
+
+        def save(sync_session):
+            with patch("src.agents.trend_hunter_agent.get_sync_db", return_value=sync_session):
+                return TrendHunterAgent()._save_trends(trends)
+
+        saved = await db_session.run_sync(save)
+        assert saved == 1
+
+        result = await db_session.execute(
+            select(Trend).execution_options(populate_existing=True)
+        )
+        rows = {trend.name: trend for trend in result.scalars()}
+        assert set(rows) == {"#old", "#new"}
+
+        old = rows["#old"]
+        assert old.id == existing.id
+        assert old.current_score == Decimal("40")
+        assert old.volume == 8
+        assert old.status == TrendStatus.RISING
+        assert [h["score"] for h in old.score_history] == [10.0, 40.0]
+
+        new = rows["#new"]
+        assert new.current_score == Decimal("70")
+        assert new.volume == 7
+        assert new.status == TrendStatus.DECLINING
+        assert [h["score"] for h in new.score_history] == [60.0, 70.0]
+
     def test_trend_type_classification(self):
         """Test trend type classification."""
         trend_types = ["audio", "challenge", "meme", "format", "topic"]
@@ -174,6 +232,57 @@ class TestStyleClonerAgent:
 
         assert emoji_density == 0.6  # 3 emojis / 5 words
 
+    @pytest.mark.asyncio
+    async def test_save_profile_relearn_updates_existing(self, db_session):
+        """Test _save_profile upserts by name: re-learning keeps one row and its id."""
+        from sqlalchemy import func, select
+        from src.agents.style_cloner_agent import StyleClonerAgent
+
+        agent = StyleClonerAgent()
+        first = {
+            "name": "Meu Estilo",
+            "primary_tone": "casual",
+            "sample_count": 10,
+            "confidence_score": 0.5,
+        }
+        second = {**first, "primary_tone": "humorous", "sample_count": 40}
+
+        first_id = await db_session.run_sync(lambda s: agent._save_profile(first, s))
+        second_id = await db_session.run_sync(lambda s: agent._save_profile(second, s))
+
+        assert first_id is not None
+        assert second_id == first_id
+
+        count = await db_session.scalar(
+            select(func.count(StyleProfile.id)).where(StyleProfile.name == "Meu Estilo")
+        )
+        assert count == 1
+
+        profile = await db_session.get(StyleProfile, first_id, populate_existing=True)
+        assert profile.primary_tone == "humorous"
+        assert profile.sample_count == 40
+
+    def test_matched_keywords_hyperscan_matches_fallback(self, monkeypatch):
+        """Test hyperscan keyword scan returns the same keywords as the plain fallback."""
+        pytest.importorskip("hyperscan")
+        from src.agents import style_cloner_agent
+
+        texts = [
+            "",
+            "oi galera, bora aprender? dica rapida: como fazer passo a passo",
+            "kkkkk haha que zueira, engraçado demais rsrs",
+            "prezado senhor, conforme solicitado, segue o tutorial. cordialmente",
+            "nunca desista do seu sonho! acredite, voce consegue: foco na meta 🔥",
+            "showtopmassa sem espacos: legalmente tipografia",
+        ]
+        with_hyperscan = [style_cloner_agent._matched_keywords(t) for t in texts]
+
+        monkeypatch.setattr(style_cloner_agent, "_KEYWORD_DB", None)
+        without_hyperscan = [style_cloner_agent._matched_keywords(t) for t in texts]
+
+        assert with_hyperscan == without_hyperscan
+        assert "engraçado" in with_hyperscan[2]
+
 
 # ============================================================================
 # PERFORMANCE TRACKER AGENT TESTS
@@ -318,6 +427,84 @@ class TestSchedulerAgent:
         assert queue_item.status == "published"
         assert queue_item.published_at is not None
 
+    @pytest.mark.asyncio
+    async def test_publish_content_claim_reaches_final_status(self, db_engine, db_session):
+        """Test publish_content claims a row and always moves it out of PROCESSING."""
+        import asyncio
+        from contextlib import contextmanager
+        from unittest.mock import AsyncMock
+        from sqlalchemy import create_engine, select
+        from sqlalchemy.orm import sessionmaker
+        from src.agents.scheduler_agent import ContentScheduler
+
+        # publish_content usa sessao sincrona e asyncio.run: roda numa thread
+        sync_engine = create_engine(db_engine.url.set(drivername="postgresql+psycopg2"))
+        SyncSession = sessionmaker(sync_engine, expire_on_commit=False)
+
+        @contextmanager
+        def sync_session():
+            with SyncSession() as session:
+                yield session
+
+        due = datetime.now() - timedelta(minutes=5)
+        published = ContentQueue(
+            title="Ok", target_platforms=["instagram"],
+            scheduled_at=due, status=ContentStatus.SCHEDULED,
+        )
+        failed = ContentQueue(
+            title="Falha", target_platforms=["instagram"],
+            scheduled_at=due, status=ContentStatus.SCHEDULED,
+        )
+        in_flight = ContentQueue(
+            title="Em publicacao", target_platforms=["instagram"],
+            scheduled_at=due, status=ContentStatus.PROCESSING,
+        )
+        db_session.add_all([published, failed, in_flight])
+        await db_session.commit()
+
+        scheduler = ContentScheduler()
+        with patch("src.agents.scheduler_agent.sync_db_session", sync_session):
+            # Listar nao reserva nada
+            due_ids = {c.id for c in await asyncio.to_thread(scheduler.get_due_content)}
+            assert due_ids == {published.id, failed.id}
+
+            with patch.object(
+                scheduler, "_publish_to_platform", AsyncMock(return_value="https://x/1")
+            ):
+                ok = await asyncio.to_thread(scheduler.publish_content, published.id)
+                # Ja reservado por outro chamador: nao publica de novo
+                skipped = await asyncio.to_thread(scheduler.publish_content, in_flight.id)
+
+            with patch.object(
+                scheduler, "_publish_to_platform", AsyncMock(side_effect=RuntimeError("api"))
+            ):
+                ko = await asyncio.to_thread(scheduler.publish_content, failed.id)
+
+            rescheduled = await asyncio.to_thread(
+                scheduler.reschedule, failed.id, datetime.now() + timedelta(hours=1)
+            )
+
+        sync_engine.dispose()
+
+        assert ok.success and ok.published_urls == {"instagram": "https://x/1"}
+        assert not skipped.success
+        assert not ko.success
+        assert rescheduled
+
+        statuses = {
+            content.id: content.status
+            for content in (
+                await db_session.execute(
+                    select(ContentQueue).execution_options(populate_existing=True)
+                )
+            ).scalars()
+        }
+        assert statuses == {
+            published.id: ContentStatus.PUBLISHED,
+            failed.id: ContentStatus.SCHEDULED,
+            in_flight.id: ContentStatus.PROCESSING,
+        }
+
     def test_optimal_posting_time_selection(self):
         """Test optimal posting time selection."""
         # Best posting times by day
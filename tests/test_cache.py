@@ -0,0 +1,50 @@
+"""Tests for the in-memory TTL cache."""
+
+from unittest.mock import patch
+
+from src.core.cache import TTLCache
+
+
+class TestTTLCache:
+    """Tests for TTLCache."""
+
+    def test_get_returns_stored_value(self):
+        """Test stored values are returned before expiring."""
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set(("report", 7), {"total": 10})
+
+        assert cache.get(("report", 7)) == {"total": 10}
+        assert cache.get(("report", 30)) is None
+
+    def test_entries_expire_after_ttl(self):
+        """Test entries are dropped once their TTL has passed."""
+        cache = TTLCache(maxsize=4, ttl=10)
+
+        with patch("src.core.cache.time.monotonic", return_value=100.0):
+            cache.set("key", "value")
+        with patch("src.core.cache.time.monotonic", return_value=105.0):
+            assert cache.get("key") == "value"
+        with patch("src.core.cache.time.monotonic", return_value=111.0):
+            assert cache.get("key", "expired") == "expired"
+
+        assert len(cache) == 0
+
+    def test_least_recently_used_is_evicted(self):
+        """Test the least recently used entry is evicted when full."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_clear(self):
+        """Test clear removes every entry."""
+        cache = TTLCache()
+        cache.set("a", 1)
+        cache.clear()
+
+        assert cache.get("a") is None